@@ -0,0 +1,116 @@
+"""
+Benchmark and validation: the in-memory pipeline (load_scraped_data +
+clean_and_process_data + calculate_mii_scores) vs the chunked out-of-core
+mode (iter_scraped_chunks + calculate_mii_scores_chunked).
+
+    python benchmarks/bench_chunked.py [--rows N] [--chunk-rows N] [csv ...]
+
+Writes bat/cnb scrapes to a temporary directory (Parquet when pyarrow is
+installed, CSV otherwise) and runs each mode in its own process, so peak
+RSS is that mode's alone. (Linux carries the parent's high-water mark
+into a forked child, so the scrapes are written by a process of their own
+as well.) The chunked scores must equal the in-memory ones exactly; a
+difference makes the script exit non-zero.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import pickle
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+
+
+def prepare(directory: str, rows: int, csv: list):
+    """Writes the bat/cnb scrapes into directory."""
+    import updated_MII_Windsor as mii_mod
+    from mii_fixtures import load_auctions
+
+    raw = load_auctions(csv, rows=rows)
+    for source, name in mii_mod.SOURCES.items():
+        part = raw[raw["data_source"] == source].drop(columns="data_source")
+        if mii_mod.HAS_PARQUET:
+            part.to_csv(os.path.join(directory, "tmp.csv"), index=False)
+            with contextlib.redirect_stdout(io.StringIO()):
+                mii_mod.convert_csv_to_parquet(os.path.join(directory, "tmp.csv"),
+                                               os.path.join(directory, f"{name}.parquet"))
+            os.remove(os.path.join(directory, "tmp.csv"))
+        else:
+            part.to_csv(os.path.join(directory, f"{name}.csv"), index=False)
+    print(f"{len(raw):,} raw rows as {'Parquet' if mii_mod.HAS_PARQUET else 'CSV'}")
+
+
+def child(mode: str, directory: str, out: str, chunk_rows: int):
+    import updated_MII_Windsor as mii_mod
+
+    os.chdir(directory)
+    base = mii_mod.peak_rss_mb()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        if mode == "memory":
+            clean = mii_mod.clean_and_process_data(mii_mod.load_scraped_data())
+            scores = mii_mod.calculate_mii_scores(clean)
+        else:
+            scores = mii_mod.calculate_mii_scores_chunked(mii_mod.iter_scraped_chunks(chunk_rows))
+    seconds = time.perf_counter() - start
+    with open(out, "wb") as f:
+        pickle.dump(scores.drop(columns="calculation_date").reset_index(drop=True), f)
+    print(json.dumps({"seconds": seconds, "peak_mb": mii_mod.peak_rss_mb(), "base_mb": base}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("csv", nargs="*", help="raw scrape CSVs (default: synthetic rows)")
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--chunk-rows", type=int, default=100000)
+    parser.add_argument("--child", nargs=3, metavar=("MODE", "DIR", "OUT"), help=argparse.SUPPRESS)
+    parser.add_argument("--prepare", metavar="DIR", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.prepare:
+        return prepare(args.prepare, args.rows, args.csv)
+    if args.child:
+        return child(*args.child, args.chunk_rows)
+
+    import pandas as pd
+
+    work = tempfile.mkdtemp(prefix="mii_chunked_")
+    try:
+        proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--rows", str(args.rows),
+                               "--prepare", work, *args.csv], capture_output=True, text=True, check=True)
+        print(f"{proc.stdout.strip()}, chunks of {args.chunk_rows:,}")
+
+        results = {}
+        for mode in ("memory", "chunked"):
+            out = os.path.join(work, f"{mode}.pkl")
+            proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--chunk-rows", str(args.chunk_rows),
+                                   "--child", mode, work, out], capture_output=True, text=True, check=True)
+            stats = json.loads(proc.stdout.strip().splitlines()[-1])
+            with open(out, "rb") as f:
+                results[mode] = pickle.load(f)
+            print(f"{mode:<10} {stats['seconds']:7.2f}s  peak RSS {stats['peak_mb']:7.0f} MB "
+                  f"({stats['peak_mb'] - stats['base_mb']:6.0f} MB above imports)")
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+    memory, chunked = results["memory"], results["chunked"]
+    for df in (memory, chunked):
+        for c in df.columns:
+            if isinstance(df[c].dtype, pd.CategoricalDtype):
+                df[c] = df[c].astype(object)
+    try:
+        pd.testing.assert_frame_equal(memory, chunked, check_dtype=False, rtol=0, atol=0)
+    except AssertionError as e:
+        print(f"   MISMATCH {str(e)[:300]}")
+        sys.exit(1)
+    print(f"outputs identical ({len(memory):,} scored rows)")
+
+
+if __name__ == "__main__":
+    main()
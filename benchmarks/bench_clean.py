@@ -0,0 +1,83 @@
+"""
+Benchmark and validation: clean_and_process_data, row-wise (the original
+implementation) vs vectorized.
+
+    python benchmarks/bench_clean.py [--rows N] [CSV ...]
+
+Runs both engines on the given scrapes (bat.csv / cnb.csv), or on synthetic
+rows from mii_fixtures, and compares every output column. Any difference is
+printed and makes the script exit non-zero. With --model-cache the vectorized
+run reuses (and updates) that ModelNameCache file; run twice to see a warm
+cache.
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from mii_fixtures import load_auctions  # noqa: E402
+from updated_MII_Windsor import ModelNameCache, clean_and_process_data  # noqa: E402
+
+
+def timed(fn, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def compare(expected: pd.DataFrame, actual: pd.DataFrame) -> list:
+    """Human-readable differences between two cleaned frames ([] when equal)."""
+    problems = []
+    if list(expected.columns) != list(actual.columns):
+        problems.append(f"columns differ:\n  rowwise    {list(expected.columns)}\n  vectorized {list(actual.columns)}")
+    if not expected.index.equals(actual.index):
+        problems.append(f"rows differ: {len(expected)} rowwise vs {len(actual)} vectorized")
+        return problems
+    for col in expected.columns.intersection(actual.columns):
+        a, b = expected[col].astype(object), actual[col].astype(object)
+        same = (a == b) | (a.isna() & b.isna())
+        if not same.all():
+            idx = same[~same].index[:3]
+            sample = ", ".join(f"{i}: {a[i]!r} vs {b[i]!r}" for i in idx)
+            problems.append(f"{col}: {(~same).sum()} rows differ ({sample})")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("csv", nargs="*", help="raw scrape CSVs (default: synthetic rows)")
+    parser.add_argument("--rows", type=int, default=20000, help="synthetic rows when no CSV is given")
+    parser.add_argument("--model-cache", help="ModelNameCache JSON file for the vectorized run")
+    args = parser.parse_args()
+
+    raw = load_auctions(args.csv, rows=args.rows)
+    rowwise, t_row = timed(clean_and_process_data, raw, engine="rowwise")
+    cache = ModelNameCache(args.model_cache)
+    cached_titles = len(cache.entries)
+    vectorized, t_vec = timed(clean_and_process_data, raw, engine="vectorized", model_cache=cache)
+    cache.save()
+
+    print(f"{len(raw):,} raw rows -> {len(vectorized):,} cleaned")
+    print(f"rowwise    {t_row:8.2f}s")
+    print(f"vectorized {t_vec:8.2f}s  ({t_row / t_vec if t_vec else float('inf'):.1f}x)")
+    lookups = cache.hits + cache.misses
+    print(f"model names: {lookups:,} unique titles, {cache.hits:,} from cache "
+          f"({cache.hits / lookups if lookups else 0:.0%}, {cached_titles:,} titles cached before the run)")
+
+    problems = compare(rowwise, vectorized)
+    for p in problems:
+        print(f"MISMATCH {p}")
+    if problems:
+        sys.exit(1)
+    print("outputs identical")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark: calculate_mii_scores' per-group kernels (winsorize, robust z,
+0-100 index), groupby.apply per metric (legacy_mii.py) vs the single-pass
+transforms, on 10k to 10M grouped rows.
+
+    python benchmarks/bench_group_kernels.py [--sizes 10000,100000,1000000,10000000]
+                                             [--legacy-max 1000000]
+
+Both versions must agree (to 1e-9) wherever the legacy one runs; it is
+skipped above --legacy-max rows, where it takes minutes.
+"""
+import argparse
+import os
+import resource
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from legacy_mii import legacy_index_by_group, legacy_robust_z_by_groups, legacy_winsorize_by_groups  # noqa: E402
+from mii_fixtures import SCORE_METRICS, grouped_rows  # noqa: E402
+from updated_MII_Windsor import index_by_group, robust_z_by_groups, winsorize_by_groups  # noqa: E402
+
+CLIP_METRICS = SCORE_METRICS[:5]
+GROUP_COLS = ["quarter", "cohort"]
+
+
+def run_new(df):
+    out = winsorize_by_groups(df, GROUP_COLS, CLIP_METRICS)
+    z = robust_z_by_groups(out, GROUP_COLS, SCORE_METRICS)
+    index = index_by_group(z.mean(axis=1), out["quarter"])
+    return out, z, index
+
+
+def run_legacy(df):
+    out = legacy_winsorize_by_groups(df, GROUP_COLS, CLIP_METRICS)
+    z = legacy_robust_z_by_groups(out, GROUP_COLS, SCORE_METRICS)
+    zcols = [f"z_{m}" for m in SCORE_METRICS]
+    z = z.assign(MII_Score=z[zcols].mean(axis=1))
+    index = legacy_index_by_group(z)["MII_Index"]
+    return out, z[zcols].loc[out.index], index.loc[out.index]
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def agree(new, old) -> bool:
+    new, old = (new[0][SCORE_METRICS], *new[1:]), (old[0][SCORE_METRICS], *old[1:])
+    return all(np.allclose(n.to_numpy(dtype=float), o.to_numpy(dtype=float), rtol=1e-9, atol=1e-9, equal_nan=True)
+               for n, o in zip(new, old))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,100000,1000000,10000000")
+    parser.add_argument("--legacy-max", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    print(f"{'rows':>11} {'legacy s':>9} {'new s':>8} {'speedup':>8} {'new rows/s':>12}  peak RSS")
+    failed = False
+    for rows in (int(s) for s in args.sizes.split(",")):
+        df = grouped_rows(rows)
+        new, t_new = timed(run_new, df)
+        legacy_s = speedup = "-"
+        if rows <= args.legacy_max:
+            old, t_old = timed(run_legacy, df)
+            legacy_s, speedup = f"{t_old:.2f}", f"{t_old / t_new:.1f}x"
+            if not agree(new, old):
+                legacy_s += " MISMATCH"
+                failed = True
+        rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        print(f"{rows:>11,} {legacy_s:>9} {t_new:>8.2f} {speedup:>8} {rows / t_new:>12,.0f}  {rss_mb:,.0f} MB")
+        del df, new
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Benchmark and validation: full calculate_mii_scores vs the incremental
+per-quarter mode (calculate_mii_scores_incremental).
+
+    python benchmarks/bench_incremental.py [--rows N] [--store DIR]
+
+Times a full run, a cold incremental run (empty store), a warm one (nothing
+changed), a routine refresh where only the latest quarter gained rows, and
+a run after an edit to the get_instagram_estimates table, which must not
+reuse partitions scored with the old estimates.
+Each incremental result must match the full calculation on the same data;
+a difference makes the script exit non-zero. Partitions are Parquet when
+pyarrow is installed, CSV otherwise.
+"""
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import updated_MII_Windsor  # noqa: E402
+from mii_fixtures import load_auctions  # noqa: E402
+from updated_MII_Windsor import (HAS_PARQUET, calculate_mii_scores,  # noqa: E402
+                                 calculate_mii_scores_incremental, clean_and_process_data)
+
+
+def timed(fn, *args):
+    with contextlib.redirect_stdout(io.StringIO()) as out:
+        start = time.perf_counter()
+        result = fn(*args)
+    return result, time.perf_counter() - start, out.getvalue().strip().splitlines()[-1]
+
+
+def same(full: pd.DataFrame, incremental: pd.DataFrame) -> bool:
+    a = full.drop(columns="calculation_date").reset_index(drop=True)
+    b = incremental.drop(columns="calculation_date").reset_index(drop=True)
+    # CSV partitions read categoricals back as strings and nullable ints as floats
+    plain = {}
+    for c in a.columns:
+        for df in (a, b):
+            if isinstance(df[c].dtype, pd.CategoricalDtype):
+                plain[c] = object
+            elif isinstance(df[c].dtype, pd.api.extensions.ExtensionDtype) and df[c].dtype.kind in "iu":
+                plain.setdefault(c, "float64")
+    a, b = a.astype(plain), b.astype(plain)
+    try:
+        pd.testing.assert_frame_equal(a, b, check_dtype=False, rtol=1e-9, atol=1e-9)
+        return True
+    except AssertionError as e:
+        print(f"   MISMATCH {str(e)[:300]}")
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("csv", nargs="*", help="raw scrape CSVs (default: synthetic rows)")
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--store", help="quarter store directory (default: a temporary one)")
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        clean = clean_and_process_data(load_auctions(args.csv, rows=args.rows))
+    latest = clean["quarter"].astype(str).max()
+    # The routine refresh: the current quarter gains a batch of new auctions
+    refreshed = pd.concat([clean, clean[clean["quarter"] == latest].head(500)], ignore_index=True)
+
+    store = args.store or tempfile.mkdtemp(prefix="mii_quarters_")
+    shutil.rmtree(store, ignore_errors=True)
+    print(f"{len(clean):,} cleaned rows, {clean['quarter'].nunique()} quarters, "
+          f"partitions as {'Parquet' if HAS_PARQUET else 'CSV'} in {store}")
+
+    full, t_full, _ = timed(calculate_mii_scores, clean)
+    print(f"{'full':<28} {t_full:7.2f}s")
+    ok = True
+    for name, data in (("incremental, cold", clean), ("incremental, unchanged", clean),
+                       ("incremental, latest changed", refreshed)):
+        expected = full if data is clean else timed(calculate_mii_scores, data)[0]
+        result, t, summary = timed(calculate_mii_scores_incremental, data, store)
+        ok &= same(expected, result)
+        print(f"{name:<28} {t:7.2f}s  {t / t_full:5.0%} of full  ({summary.split(': ', 1)[-1]})")
+
+    # An edited estimate: the quarters holding that entity must be rescored
+    original = updated_MII_Windsor.get_instagram_estimates
+    entity = "variant_id" if "variant_id" in clean.columns else "model"
+    edited_key = clean[entity].astype(object).value_counts().index[0]
+
+    def edited_estimates(keys):
+        out = original(keys)
+        if edited_key in out:
+            out[edited_key] += 100000
+        return out
+
+    updated_MII_Windsor.get_instagram_estimates = edited_estimates
+    try:
+        expected = timed(calculate_mii_scores, refreshed)[0]
+        result, t, summary = timed(calculate_mii_scores_incremental, refreshed, store)
+    finally:
+        updated_MII_Windsor.get_instagram_estimates = original
+    ok &= same(expected, result)
+    print(f"{'incremental, estimate edited':<28} {t:7.2f}s  {t / t_full:5.0%} of full  ({summary.split(': ', 1)[-1]})")
+
+    if not args.store:
+        shutil.rmtree(store, ignore_errors=True)
+    if not ok:
+        sys.exit(1)
+    print("outputs identical")
+
+
+if __name__ == "__main__":
+    main()
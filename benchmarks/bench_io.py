@@ -0,0 +1,124 @@
+"""
+Benchmark and validation: loading the scrapes from CSV vs Parquet
+(load_scraped_data) and writing the results (write_results, Parquet plus
+the CSV pair, vs the old two to_csv calls).
+
+    python benchmarks/bench_io.py [--rows N] [csv ...]
+
+Writes bat.csv / cnb.csv to a temporary directory (the given scrapes, or
+synthetic rows), converts them with convert_csv_to_parquet and loads both.
+Cleaned rows and MII scores from the Parquet load must match the CSV load,
+and the cleaned rows a plain read_csv of every column; a difference makes the script exit non-zero. Needs pyarrow.
+"""
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import updated_MII_Windsor as mii_mod  # noqa: E402
+from mii_fixtures import load_auctions  # noqa: E402
+
+
+def timed(fn, *args):
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def mb(df: pd.DataFrame) -> float:
+    return df.memory_usage(deep=True).sum() / 1e6
+
+
+def same(name: str, a: pd.DataFrame, b: pd.DataFrame) -> bool:
+    a = a.drop(columns="calculation_date", errors="ignore").reset_index(drop=True)
+    b = b.drop(columns="calculation_date", errors="ignore").reset_index(drop=True)
+    cats = [c for c in a.columns if isinstance(a[c].dtype, pd.CategoricalDtype)
+            or isinstance(b[c].dtype, pd.CategoricalDtype)]
+    a, b = a.astype({c: object for c in cats}), b.astype({c: object for c in cats})
+    try:
+        pd.testing.assert_frame_equal(a, b, check_dtype=False, rtol=1e-9, atol=1e-9)
+        return True
+    except AssertionError as e:
+        print(f"   {name} MISMATCH {str(e)[:300]}")
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("csv", nargs="*", help="raw scrape CSVs (default: synthetic rows)")
+    parser.add_argument("--rows", type=int, default=200000)
+    args = parser.parse_args()
+    if not mii_mod.HAS_PARQUET:
+        sys.exit("pyarrow is not installed")
+
+    raw = load_auctions(args.csv, rows=args.rows)
+    work = tempfile.mkdtemp(prefix="mii_io_")
+    cwd = os.getcwd()
+    try:
+        os.chdir(work)
+        for source, name in mii_mod.SOURCES.items():
+            raw[raw["data_source"] == source].drop(columns="data_source").to_csv(f"{name}.csv", index=False)
+
+        def read_csv_full():  # the loader before columnar storage
+            frames = []
+            for source, name in mii_mod.SOURCES.items():
+                df = pd.read_csv(f"{name}.csv")
+                df["data_source"] = source
+                frames.append(df)
+            return pd.concat(frames, ignore_index=True, sort=False)
+
+        before, t_before = timed(read_csv_full)
+        # CSV only: hide the Parquet reader
+        mii_mod.HAS_PARQUET = False
+        from_csv, t_csv = timed(mii_mod.load_scraped_data)
+        mii_mod.HAS_PARQUET = True
+        _, t_convert = timed(lambda: [mii_mod.convert_csv_to_parquet(f"{n}.csv") for n in mii_mod.SOURCES.values()])
+        from_parquet, t_parquet = timed(mii_mod.load_scraped_data)
+
+        csv_mb = sum(os.path.getsize(f"{n}.csv") for n in mii_mod.SOURCES.values()) / 1e6
+        pq_mb = sum(os.path.getsize(f"{n}.parquet") for n in mii_mod.SOURCES.values()) / 1e6
+        print(f"{len(from_csv):,} raw rows")
+        print(f"{'read_csv, all columns':<22} {t_before:7.2f}s  {csv_mb:7.1f} MB on disk  {mb(before):7.1f} MB in memory")
+        print(f"{'load csv':<22} {t_csv:7.2f}s  {csv_mb:7.1f} MB on disk  {mb(from_csv):7.1f} MB in memory")
+        print(f"{'load parquet':<22} {t_parquet:7.2f}s  {pq_mb:7.1f} MB on disk  {mb(from_parquet):7.1f} MB in memory"
+              f"  ({t_csv / t_parquet:.1f}x; one-time conversion {t_convert:.2f}s)")
+
+        clean_csv, _ = timed(mii_mod.clean_and_process_data, from_csv)
+        clean_pq, _ = timed(mii_mod.clean_and_process_data, from_parquet)
+        clean_before, _ = timed(mii_mod.clean_and_process_data, before)
+        ok = same("cleaned", clean_before[clean_csv.columns], clean_csv)
+        ok &= same("cleaned", clean_csv, clean_pq)
+        scores_csv, _ = timed(mii_mod.calculate_mii_scores, clean_csv)
+        scores_pq, _ = timed(mii_mod.calculate_mii_scores, clean_pq)
+        ok &= same("scores", scores_csv, scores_pq)
+
+        def write_csv_twice():
+            scores_csv.to_csv("old_ts.csv", index=False)
+            scores_csv.to_csv("old_latest.csv", index=False)
+
+        _, t_old = timed(write_csv_twice)
+        written, t_new = timed(mii_mod.write_results, scores_pq, "bench")
+        print(f"{'write 2x csv':<22} {t_old:7.2f}s  {os.path.getsize('old_ts.csv') / 1e6 * 2:7.1f} MB")
+        print(f"{'write_results':<22} {t_new:7.2f}s  {sum(map(os.path.getsize, written)) / 1e6:7.1f} MB  "
+              f"({', '.join(os.path.splitext(p)[1] for p in written[::2])})")
+        ok &= same("written", scores_pq, pd.read_parquet(written[0]))
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(work, ignore_errors=True)
+
+    if not ok:
+        sys.exit(1)
+    print("outputs identical")
+
+
+if __name__ == "__main__":
+    main()
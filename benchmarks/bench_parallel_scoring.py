@@ -0,0 +1,64 @@
+"""
+Benchmark and validation: per-quarter scoring (score_aggregates) in this
+process vs split across a process pool (score_aggregates_parallel).
+
+    python benchmarks/bench_parallel_scoring.py [--rows N] [--quarters N] [--workers 1,2,4,8]
+
+Scores a calculate_mii_scores-shaped aggregate (mii_fixtures.grouped_rows)
+with each worker count. Every parallel result must equal the in-process
+one row for row; a difference makes the script exit non-zero. Speedup is
+bounded by the cores this process may use, printed first.
+"""
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from mii_fixtures import grouped_rows  # noqa: E402
+from updated_MII_Windsor import score_aggregates, score_aggregates_parallel  # noqa: E402
+
+
+def best_of(repeat: int, fn, *args):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2000000)
+    parser.add_argument("--quarters", type=int, default=40)
+    parser.add_argument("--workers", default="1,2,4,8", help="comma-separated worker counts")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    cores = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+    grouped = grouped_rows(args.rows, quarters=args.quarters)
+    print(f"{len(grouped):,} aggregate rows, {args.quarters} quarters, {cores} usable core(s)")
+
+    expected, t_single = best_of(args.repeat, score_aggregates, grouped)
+    print(f"{'in process':<12} {t_single:7.2f}s")
+    ok = True
+    for workers in (int(w) for w in args.workers.split(",")):
+        result, t = best_of(args.repeat, score_aggregates_parallel, grouped, workers)
+        try:
+            pd.testing.assert_frame_equal(expected, result, rtol=0, atol=0)
+        except AssertionError as e:
+            print(f"   MISMATCH {str(e)[:300]}")
+            ok = False
+        print(f"{f'{workers} workers':<12} {t:7.2f}s  {t_single / t:5.2f}x")
+
+    if not ok:
+        sys.exit(1)
+    print("outputs identical")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Benchmark and validation: load_scraped_data against S3, before (download
+each source to a temp file, one after the other, then read_csv) and after
+(concurrent, streamed, ranged Parquet reads).
+
+    python benchmarks/bench_s3_load.py [--rows N] [--latency S] [--bandwidth MB/s] [csv ...]
+
+Runs against local_s3.LocalS3, a filesystem-backed stand-in that charges
+a per-request latency and a transfer rate. The scrapes get `url` and
+`description` columns, as real ones carry, which the pipeline never reads.
+Three bucket layouts are loaded: bat.csv/cnb.csv, bat.parquet/cnb.parquet,
+and Parquet parts under bat/ and cnb/. Each must clean to the same rows as
+the old loader; a difference makes the script exit non-zero. Parquet
+layouts need pyarrow.
+"""
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import updated_MII_Windsor as mii_mod  # noqa: E402
+from local_s3 import LocalS3  # noqa: E402
+from mii_fixtures import load_auctions  # noqa: E402
+
+
+def legacy_load(s3) -> pd.DataFrame:
+    """load_scraped_data before streaming: sequential download_file + read_csv."""
+    frames = []
+    for source, name in mii_mod.SOURCES.items():
+        s3.download_file(mii_mod.S3_BUCKET, f"{name}.csv", f"temp_{name}.csv")
+        df = pd.read_csv(f"temp_{name}.csv")
+        os.remove(f"temp_{name}.csv")
+        df["data_source"] = source
+        frames.append(df)
+    return pd.concat(frames, ignore_index=True, sort=False)
+
+
+def cleaned(raw: pd.DataFrame) -> pd.DataFrame:
+    with contextlib.redirect_stdout(io.StringIO()):
+        df = mii_mod.clean_and_process_data(raw)
+    cols = sorted(c for c in df.columns if c in mii_mod.RAW_COLUMNS or c not in raw.columns or c == "data_source")
+    df = df[cols].reset_index(drop=True)
+    return df.astype({c: object for c in df.columns if isinstance(df[c].dtype, pd.CategoricalDtype)})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("csv", nargs="*", help="raw scrape CSVs (default: synthetic rows)")
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--latency", type=float, default=0.03, help="seconds per request")
+    parser.add_argument("--bandwidth", type=float, default=50, help="MB/s per request")
+    parser.add_argument("--parts", type=int, default=4, help="Parquet parts per source in the partitioned layout")
+    args = parser.parse_args()
+
+    raw = load_auctions(args.csv, rows=args.rows)
+    if "url" not in raw.columns:
+        raw["url"] = [f"https://bringatrailer.com/listing/auction-{i}/" for i in range(len(raw))]
+    if "description" not in raw.columns:
+        raw["description"] = [f"Lot #{i}: one owner, service records, " + "original paint " * 20 for i in range(len(raw))]
+
+    work = tempfile.mkdtemp(prefix="mii_s3_")
+    cwd = os.getcwd()
+    layouts = {"csv": os.path.join(work, "csv")}
+    if mii_mod.HAS_PARQUET:
+        layouts["parquet"] = os.path.join(work, "parquet")
+        layouts["parquet parts"] = os.path.join(work, "parts")
+    try:
+        for root in layouts.values():
+            os.makedirs(root)
+        for source, name in mii_mod.SOURCES.items():
+            rows = raw[raw["data_source"] == source].drop(columns="data_source")
+            rows.to_csv(os.path.join(layouts["csv"], f"{name}.csv"), index=False)
+            if mii_mod.HAS_PARQUET:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    mii_mod.convert_csv_to_parquet(os.path.join(layouts["csv"], f"{name}.csv"),
+                                                   os.path.join(layouts["parquet"], f"{name}.parquet"))
+                full = pd.read_parquet(os.path.join(layouts["parquet"], f"{name}.parquet"))
+                os.makedirs(os.path.join(layouts["parquet parts"], name))
+                step = -(-len(full) // args.parts)
+                for i in range(args.parts):
+                    full.iloc[i * step:(i + 1) * step].to_parquet(
+                        os.path.join(layouts["parquet parts"], name, f"part-{i:03d}.parquet"), index=False)
+
+        os.chdir(work)
+        s3 = LocalS3(layouts["csv"], args.latency, args.bandwidth * 1e6)
+        start = time.perf_counter()
+        before = legacy_load(s3)
+        t_before = time.perf_counter() - start
+        expected = cleaned(before)
+        print(f"{len(before):,} raw rows, {args.latency * 1000:.0f} ms/request, {args.bandwidth:.0f} MB/s")
+        print(f"{'before (csv, temp files)':<28} {t_before:6.2f}s  {s3.requests:4d} requests  "
+              f"{s3.bytes_served / 1e6:7.1f} MB")
+
+        ok = True
+        for layout, root in layouts.items():
+            s3 = LocalS3(root, args.latency, args.bandwidth * 1e6)
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                after = mii_mod.load_scraped_data(s3)
+            t = time.perf_counter() - start
+            print(f"{'after (' + layout + ')':<28} {t:6.2f}s  {s3.requests:4d} requests  "
+                  f"{s3.bytes_served / 1e6:7.1f} MB  ({t_before / t:.1f}x)")
+            try:
+                pd.testing.assert_frame_equal(expected, cleaned(after), check_dtype=False)
+            except AssertionError as e:
+                print(f"   MISMATCH {str(e)[:300]}")
+                ok = False
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(work, ignore_errors=True)
+
+    if not ok:
+        sys.exit(1)
+    print("outputs identical")
+
+
+if __name__ == "__main__":
+    main()
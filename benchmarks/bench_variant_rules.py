@@ -0,0 +1,93 @@
+"""
+Benchmark and validation: VariantRules.generations (one interval join over
+all rules) against applying the same rules one at a time, the way the
+hard-coded if-chain grew, as the rule count goes up.
+
+    python benchmarks/bench_variant_rules.py [--rows N] [--rules 2,50,200,800]
+
+Builds `rows` (make, model_family, year) rows and, for each rule count,
+that many non-overlapping generation rules spread over makes and
+families. Both ways must label every row the same; a difference makes
+the script exit non-zero.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from updated_MII_Windsor import DEFAULT_VARIANT_RULES, VariantRules  # noqa: E402
+
+MAKES = ["Mercedes-Benz", "BMW", "Porsche", "Ferrari", "Toyota", "Land Rover", "Chevrolet", "Honda", "Lotus", "Audi"]
+
+
+def synthetic_rules(n: int, families_per_make: int = 20) -> dict:
+    """n generation rules: 6-year bands per (make, family), from 1960 on."""
+    rules = []
+    for i in range(n):
+        make = MAKES[i % len(MAKES)]
+        family = f"F{(i // len(MAKES)) % families_per_make}"
+        band = i // (len(MAKES) * families_per_make)
+        rules.append({"make": make, "family": family, "from": 1960 + 6 * band, "to": 1965 + 6 * band,
+                      "generation": f"{make[:3].upper()}-{family}-G{band}"})
+    return {**DEFAULT_VARIANT_RULES, "generations": DEFAULT_VARIANT_RULES["generations"] + rules}
+
+
+def rule_by_rule(rules: dict, makes: pd.Series, families: pd.Series, years: pd.Series) -> pd.Series:
+    """Each rule as its own masked assignment over every row (the if-chain approach)."""
+    out = pd.Series(rules["other"], index=years.index, dtype=object)
+    make_text = makes.astype(str)
+    make_masks = {}
+    for r in rules["generations"]:
+        lo = r["from"] if r["from"] is not None else 0
+        hi = r["to"] if r["to"] is not None else 9999
+        if r["make"] not in make_masks:
+            make_masks[r["make"]] = make_text.str.startswith(r["make"])
+        hit = make_masks[r["make"]] & (families == r["family"]) & years.between(lo, hi)
+        out[hit] = r["generation"]
+    out[years.isna()] = rules["unknown"]
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--rules", default="2,50,200,800", help="comma-separated rule counts")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    makes = pd.Series(np.array(MAKES, dtype=object)[rng.integers(0, len(MAKES), args.rows)])
+    families = pd.Series(np.array([f"F{i}" for i in range(25)] + ["SL63"], dtype=object)[rng.integers(0, 26, args.rows)])
+    years = pd.Series(rng.integers(1955, 2026, args.rows).astype(float))
+    years[rng.random(args.rows) < 0.1] = np.nan
+    print(f"{args.rows:,} rows")
+
+    ok = True
+    for n in (int(x) for x in args.rules.split(",")):
+        rules = DEFAULT_VARIANT_RULES if n <= len(DEFAULT_VARIANT_RULES["generations"]) else synthetic_rules(n)
+        count = len(rules["generations"])
+        start = time.perf_counter()
+        compiled = VariantRules(rules)
+        t_compile = time.perf_counter() - start
+        start = time.perf_counter()
+        joined = compiled.generations(makes, families, years)
+        t_join = time.perf_counter() - start
+        start = time.perf_counter()
+        expected = rule_by_rule(rules, makes, families, years)
+        t_chain = time.perf_counter() - start
+        same = (joined == expected).all()
+        ok &= bool(same)
+        print(f"{count:5d} rules  interval join {t_join:6.3f}s (+{t_compile * 1000:.1f} ms compile)  "
+              f"rule by rule {t_chain:7.3f}s  {'' if same else 'MISMATCH'}")
+
+    if not ok:
+        sys.exit(1)
+    print("outputs identical")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""
+The per-group kernels calculate_mii_scores used before the single-pass
+versions, kept for benchmarks/bench_group_kernels.py.
+
+Identical to the old code except that the robust-z and index applies select
+their columns explicitly, which keeps the group keys inside each group on
+pandas 3 (where groupby.apply otherwise drops them).
+"""
+import pandas as pd
+
+from updated_MII_Windsor import WINSOR_HI, WINSOR_LO, Z_CAP, robust_z, winsorize_series
+
+
+def legacy_winsorize_by_groups(df: pd.DataFrame, group_cols, metric_cols, lower=WINSOR_LO, upper=WINSOR_HI):
+    df = df.copy()
+    for m in metric_cols:
+        df[m] = df.groupby(group_cols, group_keys=False)[m].apply(
+            lambda x: winsorize_series(x, lower, upper)
+        )
+    return df
+
+
+def legacy_robust_z_by_groups(df: pd.DataFrame, group_cols, metric_cols, cap=Z_CAP) -> pd.DataFrame:
+    def apply_robust_z(g):
+        for m in metric_cols:
+            zcol = f'z_{m}'
+            g[zcol] = robust_z(g[m]) if m in g.columns else 0
+            g[zcol] = g[zcol].clip(-cap, cap)
+        return g
+    return df.groupby(group_cols, group_keys=False)[list(df.columns)].apply(apply_robust_z)
+
+
+def legacy_index_by_group(df: pd.DataFrame, score_col: str = 'MII_Score', key: str = 'quarter') -> pd.DataFrame:
+    def to_index(g):
+        mx, mn = g[score_col].max(), g[score_col].min()
+        g['MII_Index'] = 100 * (g[score_col] - mn) / (mx - mn) if mx > mn else 50
+        return g
+    return df.groupby(key, group_keys=False)[list(df.columns)].apply(to_index)
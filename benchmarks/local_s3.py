@@ -0,0 +1,75 @@
+"""
+A filesystem-backed stand-in for the boto3 S3 client calls the MII loader
+makes: list_objects_v2, head_object, get_object (with Range) and
+download_file, over files under `root` (the bucket name is ignored).
+
+Each request sleeps `latency` seconds plus its size over `bandwidth`
+bytes/second, so sequential and concurrent loaders compare the way they
+would against S3. Requests and bytes served are counted.
+"""
+import io
+import os
+import shutil
+import threading
+import time
+
+
+class LocalS3:
+    def __init__(self, root: str, latency: float = 0.03, bandwidth: float = 50e6, page_size: int = 1000):
+        self.root = root
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.page_size = page_size
+        self.requests = 0
+        self.bytes_served = 0
+        self._lock = threading.Lock()
+
+    def _served(self, nbytes: int):
+        with self._lock:
+            self.requests += 1
+            self.bytes_served += nbytes
+        time.sleep(self.latency + nbytes / self.bandwidth)
+
+    def _path(self, key: str) -> str:
+        path = os.path.join(self.root, *key.split("/"))
+        if not os.path.isfile(path):
+            raise FileNotFoundError(f"NoSuchKey: {key}")
+        return path
+
+    def list_objects_v2(self, Bucket, Prefix="", ContinuationToken=None):
+        keys = []
+        for dirpath, _, files in os.walk(self.root):
+            for f in files:
+                key = os.path.relpath(os.path.join(dirpath, f), self.root).replace(os.sep, "/")
+                if key.startswith(Prefix):
+                    keys.append(key)
+        keys.sort()
+        start = int(ContinuationToken or 0)
+        page = keys[start:start + self.page_size]
+        self._served(0)
+        out = {"Contents": [{"Key": k, "Size": os.path.getsize(self._path(k))} for k in page],
+               "IsTruncated": start + self.page_size < len(keys)}
+        if out["IsTruncated"]:
+            out["NextContinuationToken"] = str(start + self.page_size)
+        return out
+
+    def head_object(self, Bucket, Key):
+        size = os.path.getsize(self._path(Key))
+        self._served(0)
+        return {"ContentLength": size}
+
+    def get_object(self, Bucket, Key, Range=None):
+        with open(self._path(Key), "rb") as f:
+            if Range:
+                first, last = Range.removeprefix("bytes=").split("-")
+                f.seek(int(first))
+                data = f.read(int(last) - int(first) + 1)
+            else:
+                data = f.read()
+        self._served(len(data))
+        return {"Body": io.BytesIO(data), "ContentLength": len(data)}
+
+    def download_file(self, Bucket, Key, Filename):
+        path = self._path(Key)
+        self._served(os.path.getsize(path))
+        shutil.copyfile(path, Filename)
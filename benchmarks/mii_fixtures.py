@@ -0,0 +1,163 @@
+"""
+Auction fixtures for the MII pipeline benchmarks.
+
+load_auctions() reads a real scrape (bat.csv / cnb.csv, or any CSV with the
+same columns) when given a path; otherwise synthetic_auctions() builds one
+with the mess the cleaning step has to cope with: titles with and without
+a leading year or make, "(1989-1994)" suffixes, bare "AMG" models, counts
+as "1,234 views" text, sale amounts as "$45,000" / "Bid to $12,500.00",
+mixed date formats, missing, future and pre-1990 dates.
+"""
+import random
+
+import pandas as pd
+
+MAKES = ["Mercedes-Benz", "BMW", "Porsche", "Ferrari", "Toyota", "Land Rover", "Chevrolet", "Honda", "Lotus"]
+MODELS = {
+    "Mercedes-Benz": ["SL63 AMG", "C63 AMG", "E63 AMG", "AMG GT", "AMG", "190E 2.3-16", "G63 AMG", "SL55 AMG"],
+    "BMW": ["M3", "E30 M3", "Z8", "2002tii", "M5 (1988-1993)"],
+    "Porsche": ["911 Carrera", "911 Turbo S", "Boxster S", "Cayman GT4", "964 Carrera 4 (1989-1994)"],
+    "Ferrari": ["F355 Spider", "308 GTS", "458 Italia"],
+    "Toyota": ["Supra Turbo", "Land Cruiser FJ40", "MR2"],
+    "Land Rover": ["Range Rover Sport", "Defender 110"],
+    "Chevrolet": ["Corvette Z06", "Camaro SS"],
+    "Honda": ["S2000", "NSX", "Civic Type R"],
+    "Lotus": ["Elise", "Esprit Turbo"],
+}
+MAKE_SPELLINGS = {"Mercedes-Benz": ["Mercedes-Benz", "Mercedes", "mercedes-benz"], "Chevrolet": ["Chevrolet", "Chevy"]}
+
+
+def _title(rng, make, model, year):
+    shown = rng.choice(MAKE_SPELLINGS.get(make, [make]))
+    style = rng.random()
+    if style < 0.5:
+        return f"{year} {shown} {model}"
+    if style < 0.7:
+        return f"{shown} {model}"
+    if style < 0.8:
+        return f"{shown}-{model}"
+    if style < 0.9:
+        return f"{year}  {shown}   {model}  "
+    return model
+
+
+def _count(rng, hi):
+    n = rng.randint(0, hi)
+    style = rng.random()
+    if style < 0.5:
+        return n
+    if style < 0.7:
+        return f"{n:,} views"
+    if style < 0.8:
+        return f"{n:,}"
+    if style < 0.9:
+        return None
+    return "n/a"
+
+
+def _sale(rng):
+    amount = rng.randint(5, 400) * 1000
+    style = rng.random()
+    if style < 0.4:
+        return f"${amount:,}"
+    if style < 0.55:
+        return f"Bid to ${amount:,}.00"
+    if style < 0.65:
+        return str(amount)
+    if style < 0.7:
+        return f"${amount * 100 + 10:,}"  # the "000" scrape glitch clean_sale_amount undoes
+    if style < 0.8:
+        return None
+    if style < 0.85:
+        return ""
+    if style < 0.9:
+        return "$50"
+    return f"${amount:,}.5.1"
+
+
+def _date(rng):
+    ts = pd.Timestamp("2019-01-01") + pd.Timedelta(days=rng.randint(0, 2600))
+    style = rng.random()
+    if style < 0.4:
+        return ts.strftime("%Y-%m-%d")
+    if style < 0.55:
+        return ts.strftime("%m/%d/%Y")
+    if style < 0.65:
+        return ts.strftime("%B %d, %Y")
+    if style < 0.7:
+        return "1985-06-01"
+    if style < 0.75:
+        return "2099-01-01"
+    if style < 0.85:
+        return None
+    return "not a date"
+
+
+def synthetic_auctions(rows: int = 20000, seed: int = 0) -> pd.DataFrame:
+    """A BaT + C&B shaped raw frame, as load_scraped_data() returns it."""
+    rng = random.Random(seed)
+    records = []
+    for _ in range(rows):
+        make = rng.choice(MAKES)
+        model = rng.choice(MODELS[make])
+        year = rng.randint(1960, 2025)
+        source = "BAT" if rng.random() < 0.7 else "CNB"
+        records.append({
+            "make": make if rng.random() < 0.95 else None,
+            "model": _title(rng, make, model, year) if rng.random() < 0.98 else None,
+            "year": year if rng.random() < 0.8 else (None if rng.random() < 0.5 else str(year)),
+            "views": _count(rng, 60000),
+            "bids": _count(rng, 90),
+            "comments": _count(rng, 400),
+            "sale_amount": _sale(rng),
+            "scraped_date": _date(rng) if source == "CNB" else None,
+            "sale_date": _date(rng),
+            "end_date": _date(rng),
+            "data_source": source,
+        })
+    return pd.DataFrame.from_records(records)
+
+
+def load_auctions(paths=None, rows: int = 20000, seed: int = 0) -> pd.DataFrame:
+    """The CSVs at `paths` concatenated (tagged by file name), or synthetic rows."""
+    if not paths:
+        return synthetic_auctions(rows, seed)
+    frames = []
+    for path in paths:
+        df = pd.read_csv(path)
+        if "data_source" not in df.columns:
+            df["data_source"] = "CNB" if "cnb" in path.lower() else "BAT"
+        if "model" not in df.columns and "title" in df.columns:
+            df["model"] = df["title"]
+        frames.append(df)
+    return pd.concat(frames, ignore_index=True, sort=False)
+
+
+SCORE_METRICS = ["views_numeric", "bids_numeric", "comments_numeric", "sale_amount_numeric",
+                 "instagram_mentions", "total_auctions", "car_age"]
+
+
+def grouped_rows(rows: int, quarters: int = 40, seed: int = 0) -> pd.DataFrame:
+    """
+    A calculate_mii_scores-shaped aggregate (one row per variant × quarter ×
+    cohort) with `rows` rows, for benchmarking the per-group kernels. Small
+    integer metrics (total_auctions, instagram_mentions) make many groups'
+    MAD zero, so the std fallback is exercised too.
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    labels = [f"{2016 + i // 4}Q{i % 4 + 1}" for i in range(quarters)]
+    cohorts = ["Pre-1970", "1970–1999", "2000–2014", "2015+"]
+    return pd.DataFrame({
+        "variant_id": rng.integers(0, max(1, rows // quarters), rows).astype(str),
+        "quarter": np.array(labels, dtype=object)[rng.integers(0, quarters, rows)],
+        "cohort": np.array(cohorts, dtype=object)[rng.integers(0, len(cohorts), rows)],
+        "views_numeric": rng.lognormal(8, 1, rows),
+        "bids_numeric": rng.lognormal(3, 0.8, rows),
+        "comments_numeric": rng.lognormal(4, 1, rows),
+        "sale_amount_numeric": rng.lognormal(11, 0.9, rows),
+        "instagram_mentions": rng.choice([8000, 12000, 20000, 45000, 84000], rows).astype(float),
+        "total_auctions": np.minimum(rng.geometric(0.7, rows), 20),
+        "car_age": rng.integers(0, 60, rows),
+    })
@@ -1,16 +1,203 @@
 import os
 import json
+import codecs
+import contextlib
+import gzip
+import hashlib
+import heapq
+import io
 import re
 import time
 import random
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime, timedelta, timezone
+from urllib.parse import urlparse
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Optional S3 backend for the page cache
+try:
+    import boto3
+    HAS_BOTO = True
+except Exception:
+    HAS_BOTO = False
 
 # -------- ENV --------
 SUPABASE_URL = os.getenv("SUPABASE_URL", "").rstrip("/")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY", "")
 
+# -------- FETCH ENGINE CONFIG --------
+# Listings scraped in flight at once. The run is network-bound (a BaT page is
+# a full round trip plus a multi-hundred-KB body), so a handful of workers
+# turns most of the billed idle time into useful fetches. 1 = the old serial
+# behaviour.
+FINALIZE_CONCURRENCY = max(1, int(os.getenv("FINALIZE_CONCURRENCY", "4")))
+
+# Politeness towards bringatrailer.com, shared by every worker: at most
+# BAT_RATE_PER_SEC requests per second on average, with bursts of BAT_BURST.
+# The default matches the old 0.3-0.8s sleep between serial requests.
+BAT_RATE_PER_SEC = float(os.getenv("BAT_RATE_PER_SEC", "2"))
+BAT_BURST = max(1, int(os.getenv("BAT_BURST", "2")))
+
+# Wall-clock budget when there is no Lambda context (local runs).
+FINALIZE_BUDGET_SEC = float(os.getenv("FINALIZE_BUDGET_SEC", "600"))
+
+# -------- HTTP CLIENT CONFIG --------
+# Keep-alive connections kept per host. Must be at least FINALIZE_CONCURRENCY
+# or workers queue up behind each other for a socket.
+HTTP_POOL_SIZE = max(FINALIZE_CONCURRENCY, int(os.getenv("HTTP_POOL_SIZE", "10")))
+
+# Retries for 429 and 5xx, with exponential backoff (0.5s, 1s, 2s, ...).
+# Retry-After on a 429 is honoured.
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "3"))
+HTTP_BACKOFF = float(os.getenv("HTTP_BACKOFF", "0.5"))
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Bounds on the retrying, so one call cannot outlive the run: Retry-After is
+# honoured up to HTTP_RETRY_AFTER_MAX seconds, and HTTP_RETRY_BUDGET_SEC after
+# a request first failed its next failure is final.
+HTTP_RETRY_AFTER_MAX = float(os.getenv("HTTP_RETRY_AFTER_MAX", "10"))
+HTTP_RETRY_BUDGET_SEC = float(os.getenv("HTTP_RETRY_BUDGET_SEC", "10"))
+
+# Per-attempt timeouts for a listing page and for a bulk result write.
+LISTING_TIMEOUT_SEC = 15
+DB_WRITE_TIMEOUT_SEC = 30
+
+# Stop starting new listings this long before Lambda would kill the run, so
+# the listings in flight and the final bulk write can still land. The default
+# is the worst case for each of those calls: an attempt timing out, retries
+# for HTTP_RETRY_BUDGET_SEC, then a last attempt timing out too. Results are
+# also written as they arrive once the margin is reached. An invocation with
+# less than twice the margin left gets half its time as the margin instead
+# (logged), so a short Lambda timeout still finalizes something.
+_WORST_LISTING_SEC = LISTING_TIMEOUT_SEC + (HTTP_RETRY_BUDGET_SEC + LISTING_TIMEOUT_SEC if HTTP_RETRIES else 0)
+_WORST_WRITE_SEC = DB_WRITE_TIMEOUT_SEC + (HTTP_RETRY_BUDGET_SEC + DB_WRITE_TIMEOUT_SEC if HTTP_RETRIES else 0)
+FINALIZE_DEADLINE_MARGIN_SEC = float(os.getenv("FINALIZE_DEADLINE_MARGIN_SEC",
+                                               str(_WORST_LISTING_SEC + _WORST_WRITE_SEC)))
+
+# The listing's own result banner, located with a plain substring search so
+# the regex passes only have to look at a few hundred bytes of the page. In
+# preference order: the banner span itself, then its container.
+RESULT_REGION_MARKERS = ("info-value noborder-tiny", "listing-available-info")
+RESULT_REGION_BYTES = int(os.getenv("RESULT_REGION_BYTES", "2000"))
+
+# Listing pages are streamed: reading stops once the result block has arrived
+# and parsed, so the comment thread below it (often most of the page) is never
+# downloaded. Pages are never read past MAX_PAGE_BYTES. STREAM_EARLY_STOP=0
+# reads every page to the end (still capped).
+STREAM_EARLY_STOP = os.getenv("STREAM_EARLY_STOP", "1") == "1"
+STREAM_CHUNK_BYTES = int(os.getenv("STREAM_CHUNK_BYTES", "16384"))
+MAX_PAGE_BYTES = int(os.getenv("MAX_PAGE_BYTES", "4000000"))
+
+# Listing page cache: ETag/Last-Modified plus the last parse result per URL,
+# so a re-check is a conditional GET and a 304 skips download and parsing.
+# Kept in PAGE_CACHE_DIR (/tmp survives warm invocations only) or, when
+# PAGE_CACHE_S3_BUCKET is set, in S3. An entry is deleted once its listing
+# resolves; entries not rewritten for PAGE_CACHE_MAX_AGE_DAYS (listings that
+# left the queue unresolved) are pruned each run, at most
+# PAGE_CACHE_PRUNE_SCAN of them looked at per run in S3.
+PAGE_CACHE_DIR = os.getenv("PAGE_CACHE_DIR", "/tmp/bat_page_cache")
+PAGE_CACHE_S3_BUCKET = os.getenv("PAGE_CACHE_S3_BUCKET", "")
+PAGE_CACHE_S3_PREFIX = os.getenv("PAGE_CACHE_S3_PREFIX", "bat-page-cache/")
+PAGE_CACHE_MAX_AGE_DAYS = float(os.getenv("PAGE_CACHE_MAX_AGE_DAYS", "14"))
+PAGE_CACHE_PRUNE_SCAN = int(os.getenv("PAGE_CACHE_PRUNE_SCAN", "1000"))
+
+# A listing that failed to resolve is re-checked after RECHECK_BASE_MINUTES,
+# then twice as long after each further failure, up to RECHECK_MAX_HOURS.
+# Attempts come from finalize_attempts (supabase_migration_finalize_attempts.sql)
+# or the cache, whichever is higher.
+RECHECK_BASE_MINUTES = float(os.getenv("RECHECK_BASE_MINUTES", "60"))
+RECHECK_MAX_HOURS = float(os.getenv("RECHECK_MAX_HOURS", "48"))
+
+# Finalize queue: rows per PostgREST page (keyset-paginated, so the whole
+# backlog is reachable, not just the first 100 rows).
+QUEUE_PAGE_SIZE = int(os.getenv("QUEUE_PAGE_SIZE", "100"))
+
+# Results buffered before a bulk write to finalize_auctions_batch
+# (supabase_migration_finalize_batch.sql).
+WRITE_BATCH_SIZE = max(1, int(os.getenv("WRITE_BATCH_SIZE", "50")))
+
+# -------- HTML ARCHIVE CONFIG --------
+# With HTML_ARCHIVE_DIR (or HTML_ARCHIVE_S3_BUCKET) set, the HTML of every
+# listing that resolves is kept, gzip-compressed and stored once per distinct
+# page, so a parser change can be checked against past results with
+# --reextract instead of re-scraping BaT. A page that stopped streaming early
+# is archived as far as it was read, which includes its result block.
+HTML_ARCHIVE_DIR = os.getenv("HTML_ARCHIVE_DIR", "")
+HTML_ARCHIVE_S3_BUCKET = os.getenv("HTML_ARCHIVE_S3_BUCKET", "")
+HTML_ARCHIVE_S3_PREFIX = os.getenv("HTML_ARCHIVE_S3_PREFIX", "bat-html-archive/")
+
+# Archived listings per --reextract work item.
+REEXTRACT_BATCH = int(os.getenv("REEXTRACT_BATCH", "200"))
+
+# -------- RESULTS INDEX CONFIG --------
+# Before fetching listings one at a time, page through BaT's completed-auction
+# results (newest first, dozens of results per page) and resolve every
+# scheduled auction found there; only the misses are fetched individually.
+# {page} in RESULTS_INDEX_URL is the 1-based page number. Paging stops once
+# every scheduled auction has been seen, a page reaches past the oldest of
+# them that ended within RESULTS_INDEX_LOOKBACK_HOURS (older backlog rows are
+# fetched one at a time instead of forcing every page), after
+# RESULTS_INDEX_MAX_PAGES, or once RESULTS_INDEX_TIME_SHARE of the run's time
+# has gone on it. HARVEST_RESULTS=0 fetches every listing, as before.
+HARVEST_RESULTS = os.getenv("HARVEST_RESULTS", "1") == "1"
+RESULTS_INDEX_URL = os.getenv(
+    "RESULTS_INDEX_URL",
+    "https://bringatrailer.com/wp-json/bringatrailer/1.0/data/listings-filter"
+    "?page={page}&per_page=60&get_items=1&get_stats=0&sort=td",
+)
+RESULTS_INDEX_MAX_PAGES = int(os.getenv("RESULTS_INDEX_MAX_PAGES", "10"))
+RESULTS_INDEX_LOOKBACK_HOURS = float(os.getenv("RESULTS_INDEX_LOOKBACK_HOURS", "72"))
+RESULTS_INDEX_TIME_SHARE = float(os.getenv("RESULTS_INDEX_TIME_SHARE", "0.1"))
+
+# -------- EVENT MODE CONFIG --------
+# watch_handler (or `python bat_scraper_finalize.py --watch`) keeps the
+# unfinalized auctions ending within EVENT_HORIZON_HOURS in a timer queue and
+# finalizes each one EVENT_SETTLE_MINUTES after it ends, instead of on the
+# next cron run after the 2-hour buffer. The window, reaching back
+# EVENT_LOOKBACK_HOURS for recent misses, is re-read every
+# EVENT_REFRESH_MINUTES for new auctions and changed end times. Listings that
+# do not resolve are re-queued with the cron's re-check back-off.
+EVENT_SETTLE_MINUTES = float(os.getenv("EVENT_SETTLE_MINUTES", "10"))
+EVENT_HORIZON_HOURS = float(os.getenv("EVENT_HORIZON_HOURS", "6"))
+EVENT_LOOKBACK_HOURS = float(os.getenv("EVENT_LOOKBACK_HOURS", "48"))
+EVENT_REFRESH_MINUTES = float(os.getenv("EVENT_REFRESH_MINUTES", "60"))
+
+# -------- SCHEDULER CONFIG --------
+# Each run reads up to SCHEDULE_MAX_ROWS queue rows, scores them and works
+# through them best-first until the deadline; the rest stay unfinalized and
+# are scored again next run. Ordering needs every row read before the first
+# fetch, so reading (queue pages and league lookups) also stops once
+# SCHEDULE_READ_SHARE of the run's time has gone on it.
+SCHEDULE_MAX_ROWS = int(os.getenv("SCHEDULE_MAX_ROWS", "2000"))
+SCHEDULE_READ_SHARE = float(os.getenv("SCHEDULE_READ_SHARE", "0.2"))
+
+# Freshness is 1 / (1 + hours since close / SCHEDULE_AGE_SCALE_HOURS):
+# 0.5 a day after close, ~0.07 after two weeks.
+SCHEDULE_AGE_SCALE_HOURS = float(os.getenv("SCHEDULE_AGE_SCALE_HOURS", "24"))
+
+# Score multiplier for auctions a league depends on (drafted into a garage,
+# a league's bonus auction, or in league_auctions).
+SCHEDULE_LEAGUE_WEIGHT = float(os.getenv("SCHEDULE_LEAGUE_WEIGHT", "4"))
+
+# How often the finalizer is invoked (the EventBridge rate), for the backlog ETA.
+FINALIZE_RUN_INTERVAL_MIN = float(os.getenv("FINALIZE_RUN_INTERVAL_MIN", "60"))
+
+# -------- METRICS CONFIG --------
+# Per-stage timings are logged at the end of each run as CloudWatch Embedded
+# Metric Format lines (one per stage, dimension "Stage") under
+# METRICS_NAMESPACE; with METRICS_EMF=0 the same JSON is logged without the
+# "_aws" envelope, so nothing is published as a metric.
+METRICS_NAMESPACE = os.getenv("METRICS_NAMESPACE", "GarageDraft/Finalizer")
+METRICS_EMF = os.getenv("METRICS_EMF", "1") == "1"
+
+# Latency histogram bucket upper bounds, in milliseconds.
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
 # User agent pool
 USER_AGENTS = [
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0 Safari/537.36",
@@ -19,11 +206,497 @@ USER_AGENTS = [
     "Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.0 Mobile/15E148 Safari/604.1",
 ]
 
+# -------- RUN COUNTERS --------
+class RunCounters:
+    """Thread-safe named counters for one handler run."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = {}
+
+    def incr(self, name: str, n: int = 1):
+        with self.lock:
+            self.counts[name] = self.counts.get(name, 0) + n
+
+    def reset(self) -> dict:
+        """Return the counts so far and start again from zero."""
+        with self.lock:
+            counts, self.counts = self.counts, {}
+        return counts
+
+
+RUN_COUNTERS = RunCounters()
+
+
+# -------- STAGE METRICS --------
+class StageMetrics:
+    """
+    Thread-safe latency samples and bytes per stage for one handler run.
+
+    Stages recorded:
+        queue_fetch, league_lookup       Supabase reads
+        cache_read, cache_write          PageCache
+        archive_write                    HtmlArchive, bytes compressed
+        rate_wait                        time blocked on the per-host token bucket
+        index_fetch                      one results index page
+        index_parse                      one results index item's result line
+        http_headers                     BaT request sent → response headers
+        http_body                        reading the body (parsing excluded)
+        parse_raw, parse_stripped,       the three extract_price_from_html passes
+        parse_strong
+        db_write, db_write_row,          finalize_auctions_batch, the per-row
+        db_attempts                      PATCH fallback, bump_finalize_attempts
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = {}
+        self.bytes = {}
+
+    def record(self, stage: str, seconds: float, nbytes: int = 0):
+        with self.lock:
+            self.samples.setdefault(stage, []).append(seconds)
+            if nbytes:
+                self.bytes[stage] = self.bytes.get(stage, 0) + nbytes
+
+    def reset(self) -> dict:
+        """Return {stage: summary} (see stage_summary) and start again."""
+        with self.lock:
+            samples, self.samples = self.samples, {}
+            nbytes, self.bytes = self.bytes, {}
+        return {stage: stage_summary(values, nbytes.get(stage, 0)) for stage, values in sorted(samples.items())}
+
+
+STAGE_METRICS = StageMetrics()
+
+
+def _percentile(ordered: list, q: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    return ordered[min(len(ordered) - 1, max(0, int(-(-q * len(ordered) // 1)) - 1))]
+
+
+def stage_summary(seconds: list, nbytes: int = 0) -> dict:
+    """
+    {"count", "p50_ms", "p95_ms", "max_ms", "total_ms", "bytes", "histogram"}
+    where histogram maps each LATENCY_BUCKETS_MS bound ("le_<ms>", plus
+    "le_inf") to the number of samples at or below it and above the previous one.
+    """
+    ordered = sorted(s * 1000 for s in seconds)
+    histogram = dict.fromkeys([f"le_{b}" for b in LATENCY_BUCKETS_MS] + ["le_inf"], 0)
+    for ms in ordered:
+        bound = next((b for b in LATENCY_BUCKETS_MS if ms <= b), None)
+        histogram[f"le_{bound}" if bound is not None else "le_inf"] += 1
+    return {
+        "count": len(ordered),
+        "p50_ms": round(_percentile(ordered, 0.50), 2),
+        "p95_ms": round(_percentile(ordered, 0.95), 2),
+        "max_ms": round(ordered[-1], 2),
+        "total_ms": round(sum(ordered), 1),
+        "bytes": nbytes,
+        "histogram": {k: v for k, v in histogram.items() if v},
+    }
+
+
+def emit_stage_metrics(stages: dict):
+    """One JSON log line per stage, in CloudWatch EMF when METRICS_EMF is on."""
+    timestamp = int(time.time() * 1000)
+    for stage, m in stages.items():
+        line = {
+            "Stage": stage,
+            "LatencyP50": m["p50_ms"],
+            "LatencyP95": m["p95_ms"],
+            "LatencyMax": m["max_ms"],
+            "Count": m["count"],
+            "Bytes": m["bytes"],
+            "histogram_ms": m["histogram"],
+        }
+        if METRICS_EMF:
+            line["_aws"] = {
+                "Timestamp": timestamp,
+                "CloudWatchMetrics": [{
+                    "Namespace": METRICS_NAMESPACE,
+                    "Dimensions": [["Stage"]],
+                    "Metrics": [
+                        {"Name": "LatencyP50", "Unit": "Milliseconds"},
+                        {"Name": "LatencyP95", "Unit": "Milliseconds"},
+                        {"Name": "LatencyMax", "Unit": "Milliseconds"},
+                        {"Name": "Count", "Unit": "Count"},
+                        {"Name": "Bytes", "Unit": "Bytes"},
+                    ],
+                }],
+            }
+        print(json.dumps(line))
+
+
+def publish_run_metrics() -> tuple:
+    """
+    Closes a metrics window: resets RUN_COUNTERS and STAGE_METRICS, emits the
+    stage metrics and returns (counters, stages) for the caller's summary.
+    """
+    counters = RUN_COUNTERS.reset()
+    stages = STAGE_METRICS.reset()
+    emit_stage_metrics(stages)
+    return counters, stages
+
+
+# -------- HTTP SESSIONS --------
+# One pooled session per upstream, created on first use and kept at module
+# level so warm Lambda invocations reuse the open TLS connections.
+_SESSIONS = {}
+_SESSIONS_LOCK = threading.Lock()
+
+
+class BoundedRetry(Retry):
+    """
+    urllib3 Retry that stops HTTP_RETRY_BUDGET_SEC after a request first
+    failed: a later failure is final, and no backoff or Retry-After wait runs
+    past that point. Retry-After is capped at HTTP_RETRY_AFTER_MAX here
+    rather than with retry_after_max, which urllib3 1.x does not have.
+    """
+    give_up_at = None
+
+    def new(self, **kw):
+        retry = super().new(**kw)
+        retry.give_up_at = self.give_up_at
+        return retry
+
+    def increment(self, *args, **kwargs):
+        if self.give_up_at is not None and time.monotonic() >= self.give_up_at:
+            return Retry.increment(self.new(total=0), *args, **kwargs)
+        retry = super().increment(*args, **kwargs)
+        if retry.give_up_at is None:
+            retry.give_up_at = time.monotonic() + HTTP_RETRY_BUDGET_SEC
+        return retry
+
+    def _remaining(self) -> float:
+        return float("inf") if self.give_up_at is None else max(0.0, self.give_up_at - time.monotonic())
+
+    def get_backoff_time(self) -> float:
+        return min(super().get_backoff_time(), self._remaining())
+
+    def parse_retry_after(self, retry_after) -> float:
+        return min(super().parse_retry_after(retry_after), HTTP_RETRY_AFTER_MAX, self._remaining())
+
+
+def http_session(name: str, retries: bool = True) -> requests.Session:
+    """
+    Pooled session for "bat" (bringatrailer.com) or "supabase" (PostgREST).
+    retries=False gives a separate session (reported as "<name>_once") that
+    sends every request exactly once, for calls that must not be replayed.
+    """
+    key = name if retries else f"{name}_once"
+    with _SESSIONS_LOCK:
+        session = _SESSIONS.get(key)
+        if session is None:
+            retry = 0 if not retries else BoundedRetry(
+                total=HTTP_RETRIES,
+                backoff_factor=HTTP_BACKOFF,
+                status_forcelist=RETRY_STATUSES,
+                # Replayed writes must be idempotent. The PATCHes set absolute
+                # values, and so does the one POST sent here, the
+                # finalize_auctions_batch RPC. bump_finalize_attempts does not,
+                # and goes through retries=False.
+                allowed_methods=frozenset({"GET", "HEAD", "PATCH", "POST"}),
+                respect_retry_after_header=True,
+                raise_on_status=False,
+            )
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_SIZE, max_retries=retry)
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            if name == "supabase":
+                session.headers.update({
+                    "apikey": SUPABASE_KEY,
+                    "Authorization": f"Bearer {SUPABASE_KEY}",
+                    "Content-Type": "application/json",
+                })
+            _SESSIONS[key] = session
+        return session
+
+
+def connection_counters() -> dict:
+    """
+    Cumulative {session: {"requests", "new_connections"}} read from the urllib3
+    pools. Take one snapshot at the start of a run and diff with
+    connection_report() at the end.
+    """
+    counters = {}
+    with _SESSIONS_LOCK:
+        sessions = dict(_SESSIONS)
+    for name, session in sessions.items():
+        reqs = conns = 0
+        for adapter in {id(a): a for a in session.adapters.values()}.values():
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is not None:
+                    reqs += pool.num_requests
+                    conns += pool.num_connections
+        counters[name] = {"requests": reqs, "new_connections": conns}
+    return counters
+
+
+def connection_report(before: dict) -> dict:
+    """Per-session requests, new handshakes and reused connections since `before`."""
+    report = {}
+    for name, now in connection_counters().items():
+        prev = before.get(name, {"requests": 0, "new_connections": 0})
+        reqs = now["requests"] - prev["requests"]
+        conns = now["new_connections"] - prev["new_connections"]
+        report[name] = {"requests": reqs, "new_connections": conns, "reused": max(0, reqs - conns)}
+    return report
+
+
+# -------- RATE LIMITING --------
+class TokenBucket:
+    """
+    Thread-safe token bucket. acquire() blocks until a token is available and
+    returns the seconds spent waiting.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> float:
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+_HOST_LIMITERS = {}
+_HOST_LIMITERS_LOCK = threading.Lock()
+
+
+def host_limiter(url: str) -> TokenBucket:
+    """One bucket per host, so every worker shares the same politeness budget."""
+    host = (urlparse(url).hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    with _HOST_LIMITERS_LOCK:
+        bucket = _HOST_LIMITERS.get(host)
+        if bucket is None:
+            bucket = _HOST_LIMITERS[host] = TokenBucket(BAT_RATE_PER_SEC, BAT_BURST)
+        return bucket
+
+
 # -------- HTML PARSING --------
-def extract_price_from_html(html_content: str):
+# Smallest believable car price/high bid. Anything below this is almost
+# certainly a stray match against unrelated page text (e.g. a "$10/month"
+# membership promo), so we reject it.
+MIN_PLAUSIBLE_PRICE = 100
+
+# SOLD signals only. NOTE: "Bid to X" is NOT a sale — it's BaT's label for
+# reserve-not-met, so it lives in HIGH_BID_PATTERNS below.
+SALE_PATTERNS = [
+    (r"Sold\s+for\s+(?:USD\s+)?\$\s*([\d,]+)", "USD"),
+    (r"Winning\s+bid\s+(?:of\s+)?(?:USD\s+)?\$\s*([\d,]+)", "USD"),
+    (r"Sold\s+for\s+EUR\s*€?\s*([\d,\.]+)", "EUR"),
+    (r"Winning\s+bid\s+(?:of\s+)?EUR\s*€?\s*([\d,\.]+)", "EUR"),
+    (r"Sold\s+for\s+GBP\s*£?\s*([\d,]+)", "GBP"),
+    (r"Winning\s+bid\s+(?:of\s+)?GBP\s*£?\s*([\d,]+)", "GBP"),
+    (r"Sold\s+for\s+CAD\s*\$?\s*([\d,]+)", "CAD"),
+    (r"Sold\s+for\s+AUD\s*\$?\s*([\d,]+)", "AUD"),
+    (r"Sold\s+for\s+CHF\s*([\d,\']+)", "CHF"),
+    (r"Sold\s+for\s+€\s*([\d,\.]+)", "EUR"),
+    (r"Sold\s+for\s+£\s*([\d,]+)", "GBP"),
+]
+
+# RESERVE-NOT-MET (no sale). "Bid to X" = high bid, reserve not met.
+HIGH_BID_PATTERNS = [
+    (r"Bid\s+to\s+(?:USD\s+)?\$\s*([\d,]+)", "USD"),
+    (r"Bid\s+to\s+EUR\s*€?\s*([\d,\.]+)", "EUR"),
+    (r"Bid\s+to\s+GBP\s*£?\s*([\d,]+)", "GBP"),
+    (r"Bid\s+to\s+CAD\s*\$?\s*([\d,]+)", "CAD"),
+    (r"Bid\s+to\s+AUD\s*\$?\s*([\d,]+)", "AUD"),
+    (r"Bid\s+to\s+CHF\s*([\d,\']+)", "CHF"),
+    (r"Bid\s+to\s+€\s*([\d,\.]+)", "EUR"),
+    (r"Bid\s+to\s+£\s*([\d,]+)", "GBP"),
+    (r"High\s+Bid\s+(?:USD\s+)?\$\s*([\d,]+)", "USD"),
+    (r"High\s+Bid\s+EUR\s*€?\s*([\d,\.]+)", "EUR"),
+    (r"High\s+Bid\s+GBP\s*£?\s*([\d,]+)", "GBP"),
+    # Bounded gap keeps this anchored to the bid next to the label rather
+    # than leaping across the page to an unrelated amount (e.g. a "$10").
+    (r"Reserve\s+Not\s+Met[^$]{0,40}\$\s*([\d,]+)", "USD"),
+]
+
+# Bare <strong>-wrapped amounts (pass 3).
+STRONG_PATTERNS = [
+    (r"<strong>\s*(?:USD\s+)?\$\s*([\d,]+)\s*</strong>", "USD"),
+    (r"<strong>\s*EUR\s*€?\s*([\d,\.]+)\s*</strong>", "EUR"),
+    (r"<strong>\s*GBP\s*£?\s*([\d,]+)\s*</strong>", "GBP"),
+]
+
+
+def _compile(patterns):
+    return [(re.compile(p, re.IGNORECASE), currency) for p, currency in patterns]
+
+
+_SALE_RES = _compile(SALE_PATTERNS)
+_HIGH_BID_RES = _compile(HIGH_BID_PATTERNS)
+_STRONG_RES = _compile(STRONG_PATTERNS)
+
+# Every result pattern starts with one of five labels. One scan finds each
+# place a label starts, and only the patterns for that label are tried there
+# (anchored) — instead of a full-document re.search per pattern.
+# Key: label -> [(status, index into its pattern list), ...].
+_PATTERNS_BY_LABEL = {}
+for _status, _res in (("sold", _SALE_RES), ("no_sale", _HIGH_BID_RES)):
+    for _i, (_rx, _) in enumerate(_res):
+        _label = re.match(r"[A-Za-z]+", _rx.pattern).group(0).lower()
+        _PATTERNS_BY_LABEL.setdefault(_label, []).append((_status, _i))
+
+# The anchor is the label plus the word after it ("bid to", not every "bid"
+# in the comment thread). The scan runs case-sensitively over text.lower(),
+# which is several times faster than an IGNORECASE scan. That is only
+# equivalent while the text has none of the characters IGNORECASE also folds
+# onto these letters (long s, dotless i, dotted capital I); otherwise the
+# slower IGNORECASE scan is used.
+_LABEL_PHRASES = {
+    "sold": r"sold\s+for",
+    "winning": r"winning\s+bid",
+    "bid": r"bid\s+to",
+    "high": r"high\s+bid",
+    "reserve": r"reserve\s+not\s+met",
+}
+_LABELS_RE = re.compile("|".join(_LABEL_PHRASES.values()))
+_LABEL_BY_INITIAL = {label[0]: label for label in _LABEL_PHRASES}
+_FOLD_SPECIALS = ("\u017f", "\u0131", "\u0130")
+_LABEL_ANCHOR = re.compile(
+    "|".join(f"(?=(?P<{label}>{phrase}))" for label, phrase in _LABEL_PHRASES.items()),
+    re.IGNORECASE,
+)
+
+# Patterns in precedence order: sale patterns first, then high-bid ones.
+_PRECEDENCE = [("sold", i) for i in range(len(_SALE_RES))] + [("no_sale", i) for i in range(len(_HIGH_BID_RES))]
+
+_STRONG_ANCHOR = re.compile(r"<strong>", re.IGNORECASE)
+_TAG_RE = re.compile(r"<[^>]+>")
+_SPACES_RE = re.compile(r"\s{2,}")
+_BID_CONTEXT_RE = re.compile(r"(?:bid\s+to|high\s+bid|current\s+bid|reserve\s+not\s+met)[\s:]*$", re.IGNORECASE)
+_AMOUNT_RE = re.compile(r"[\$€£][\d,\.]+")
+
+
+def strip_tags(html: str) -> str:
+    return _SPACES_RE.sub(" ", _TAG_RE.sub(" ", html))
+
+
+def clean_price(price_str: str, currency: str):
+    if currency == "EUR" and "." in price_str and "," in price_str:
+        price_str = price_str.replace(".", "").replace(",", ".")  # 120.000,00 -> 120000
+    elif currency == "CHF" and "'" in price_str:
+        price_str = price_str.replace("'", "")                    # 120'000 -> 120000
+    else:
+        price_str = price_str.replace(",", "")                    # 120,000 -> 120000
+    if "." in price_str:
+        price_str = price_str.split(".")[0]
+    try:
+        price = int(price_str)
+    except ValueError:
+        return None
+    return price if price >= MIN_PLAUSIBLE_PRICE else None
+
+
+def _label_positions(text: str):
+    """Yield (pos, label) for every place a result label starts, in order."""
+    if any(ch in text for ch in _FOLD_SPECIALS):
+        for m in _LABEL_ANCHOR.finditer(text):
+            yield m.start(), m.lastgroup
+        return
+    low = text.lower()
+    m = _LABELS_RE.search(low)
+    while m:
+        pos = m.start()
+        yield pos, _LABEL_BY_INITIAL[low[pos]]
+        # Resume one past the start, not at the end: labels can overlap
+        # ("high bid to $...").
+        m = _LABELS_RE.search(low, pos + 1)
+
+
+def match_text(text: str):
+    """
+    (price, status, currency) from the sale/high-bid patterns, or None.
+
+    Same result as running re.search for each pattern in _PRECEDENCE order and
+    taking the first whose first match has a plausible price — but the text is
+    scanned once, and the scan stops as soon as every pattern ahead of a
+    plausible match has been seen.
+    """
+    found = {}
+    settled = 0  # _PRECEDENCE[:settled] have all been found
+    for pos, label in _label_positions(text):
+        for key in _PATTERNS_BY_LABEL[label]:
+            if key in found:
+                continue
+            status, i = key
+            rx, currency = (_SALE_RES if status == "sold" else _HIGH_BID_RES)[i]
+            m = rx.match(text, pos)
+            if m:
+                found[key] = clean_price(m.group(1), currency)
+        while settled < len(_PRECEDENCE) and _PRECEDENCE[settled] in found:
+            if found[_PRECEDENCE[settled]]:
+                break
+            settled += 1
+        if settled < len(_PRECEDENCE) and found.get(_PRECEDENCE[settled]):
+            break
+
+    for status, i in _PRECEDENCE:
+        price = found.get((status, i))
+        if price:
+            currency = (_SALE_RES if status == "sold" else _HIGH_BID_RES)[i][1]
+            if status == "sold":
+                print(f"   💰 Found: {currency} {price:,} (sold)")
+            else:
+                print(f"   ⚠️ Found: {currency} {price:,} (reserve not met)")
+            return price, status, currency
+    return None
+
+
+def match_strong(html_content: str):
+    """Pass 3: first plausible bare <strong>-wrapped amount, or None."""
+    found = {}
+    for anchor in _STRONG_ANCHOR.finditer(html_content):
+        for i, (rx, _) in enumerate(_STRONG_RES):
+            if i not in found:
+                m = rx.match(html_content, anchor.start())
+                if m:
+                    found[i] = m
+        if len(found) == len(_STRONG_RES):
+            break
+
+    for i, (_, currency) in enumerate(_STRONG_RES):
+        m = found.get(i)
+        if m:
+            price = clean_price(m.group(1), currency)
+            if not price:
+                continue
+            context = strip_tags(html_content[max(0, m.start() - 300):m.start()])[-80:]
+            if _BID_CONTEXT_RE.search(context):
+                print(f"   ⚠️ Found: {currency} {price:,} (reserve not met, via <strong>)")
+                return price, "no_sale", currency
+            print(f"   💰 Found: {currency} {price:,} (sold, via <strong>)")
+            return price, "sold", currency
+    return None
+
+
+def extract_price_from_html(html_content: str, record: bool = True):
     """
     Extracts a closing price from a BaT listing HTML.
-    Supports multiple currencies and formats.
+    Supports multiple currencies and formats. Each pass is timed under its
+    parse_* stage unless record=False (results index items, which are timed
+    as index_parse instead).
 
     Returns:
         (price:int|None, status:str, currency:str|None)
@@ -36,79 +709,11 @@ def extract_price_from_html(html_content: str):
     rare; an admin can mark them manually from the Finalize tab.
     """
 
-    # Smallest believable car price/high bid. Anything below this is almost
-    # certainly a stray match against unrelated page text (e.g. a "$10/month"
-    # membership promo), so we reject it.
-    MIN_PLAUSIBLE_PRICE = 100
-
-    def clean_price(price_str, currency):
-        if currency == "EUR" and "." in price_str and "," in price_str:
-            price_str = price_str.replace(".", "").replace(",", ".")  # 120.000,00 -> 120000
-        elif currency == "CHF" and "'" in price_str:
-            price_str = price_str.replace("'", "")                    # 120'000 -> 120000
-        else:
-            price_str = price_str.replace(",", "")                    # 120,000 -> 120000
-        if "." in price_str:
-            price_str = price_str.split(".")[0]
-        try:
-            price = int(price_str)
-        except ValueError:
-            return None
-        return price if price >= MIN_PLAUSIBLE_PRICE else None
-
-    # SOLD signals only. NOTE: "Bid to X" is NOT a sale — it's BaT's label for
-    # reserve-not-met, so it lives in high_bid_patterns below.
-    sale_patterns = [
-        (r"Sold\s+for\s+(?:USD\s+)?\$\s*([\d,]+)", "USD"),
-        (r"Winning\s+bid\s+(?:of\s+)?(?:USD\s+)?\$\s*([\d,]+)", "USD"),
-        (r"Sold\s+for\s+EUR\s*€?\s*([\d,\.]+)", "EUR"),
-        (r"Winning\s+bid\s+(?:of\s+)?EUR\s*€?\s*([\d,\.]+)", "EUR"),
-        (r"Sold\s+for\s+GBP\s*£?\s*([\d,]+)", "GBP"),
-        (r"Winning\s+bid\s+(?:of\s+)?GBP\s*£?\s*([\d,]+)", "GBP"),
-        (r"Sold\s+for\s+CAD\s*\$?\s*([\d,]+)", "CAD"),
-        (r"Sold\s+for\s+AUD\s*\$?\s*([\d,]+)", "AUD"),
-        (r"Sold\s+for\s+CHF\s*([\d,\']+)", "CHF"),
-        (r"Sold\s+for\s+€\s*([\d,\.]+)", "EUR"),
-        (r"Sold\s+for\s+£\s*([\d,]+)", "GBP"),
-    ]
-
-    # RESERVE-NOT-MET (no sale). "Bid to X" = high bid, reserve not met.
-    high_bid_patterns = [
-        (r"Bid\s+to\s+(?:USD\s+)?\$\s*([\d,]+)", "USD"),
-        (r"Bid\s+to\s+EUR\s*€?\s*([\d,\.]+)", "EUR"),
-        (r"Bid\s+to\s+GBP\s*£?\s*([\d,]+)", "GBP"),
-        (r"Bid\s+to\s+CAD\s*\$?\s*([\d,]+)", "CAD"),
-        (r"Bid\s+to\s+AUD\s*\$?\s*([\d,]+)", "AUD"),
-        (r"Bid\s+to\s+CHF\s*([\d,\']+)", "CHF"),
-        (r"Bid\s+to\s+€\s*([\d,\.]+)", "EUR"),
-        (r"Bid\s+to\s+£\s*([\d,]+)", "GBP"),
-        (r"High\s+Bid\s+(?:USD\s+)?\$\s*([\d,]+)", "USD"),
-        (r"High\s+Bid\s+EUR\s*€?\s*([\d,\.]+)", "EUR"),
-        (r"High\s+Bid\s+GBP\s*£?\s*([\d,]+)", "GBP"),
-        # Bounded gap keeps this anchored to the bid next to the label rather
-        # than leaping across the page to an unrelated amount (e.g. a "$10").
-        (r"Reserve\s+Not\s+Met[^$]{0,40}\$\s*([\d,]+)", "USD"),
-    ]
-
-    def match_text(text):
-        for pattern, currency in sale_patterns:
-            m = re.search(pattern, text, re.IGNORECASE)
-            if m:
-                price = clean_price(m.group(1), currency)
-                if price:
-                    print(f"   💰 Found: {currency} {price:,} (sold)")
-                    return price, "sold", currency
-        for pattern, currency in high_bid_patterns:
-            m = re.search(pattern, text, re.IGNORECASE)
-            if m:
-                price = clean_price(m.group(1), currency)
-                if price:
-                    print(f"   ⚠️ Found: {currency} {price:,} (reserve not met)")
-                    return price, "no_sale", currency
-        return None
-
     # Pass 1: raw HTML text.
+    started = time.perf_counter()
     result = match_text(html_content)
+    if record:
+        STAGE_METRICS.record("parse_raw", time.perf_counter() - started)
     if result:
         return result
 
@@ -116,44 +721,134 @@ def extract_price_from_html(html_content: str):
     # fallback: BaT wraps the result amount in a tag ("Bid to <strong>EUR
     # €7,000</strong>"), so only the stripped text reveals whether the amount
     # is a sale price or a reserve-not-met high bid.
-    stripped = re.sub(r"\s{2,}", " ", re.sub(r"<[^>]+>", " ", html_content))
-    result = match_text(stripped)
+    started = time.perf_counter()
+    result = match_text(strip_tags(html_content))
+    if record:
+        STAGE_METRICS.record("parse_stripped", time.perf_counter() - started)
     if result:
         return result
 
     # Pass 3: bare <strong>-wrapped amount. Ambiguous on its own — the same
     # markup carries both sale prices and high bids — so check the text right
     # before the tag and only report "sold" when nothing marks it as a bid.
-    strong_patterns = [
-        (r"<strong>\s*(?:USD\s+)?\$\s*([\d,]+)\s*</strong>", "USD"),
-        (r"<strong>\s*EUR\s*€?\s*([\d,\.]+)\s*</strong>", "EUR"),
-        (r"<strong>\s*GBP\s*£?\s*([\d,]+)\s*</strong>", "GBP"),
-    ]
-    for pattern, currency in strong_patterns:
-        m = re.search(pattern, html_content, re.IGNORECASE)
-        if m:
-            price = clean_price(m.group(1), currency)
-            if not price:
-                continue
-            context = re.sub(r"<[^>]+>", " ", html_content[max(0, m.start() - 300):m.start()])
-            context = re.sub(r"\s{2,}", " ", context)[-80:]
-            if re.search(r"(?:bid\s+to|high\s+bid|current\s+bid|reserve\s+not\s+met)[\s:]*$", context, re.IGNORECASE):
-                print(f"   ⚠️ Found: {currency} {price:,} (reserve not met, via <strong>)")
-                return price, "no_sale", currency
-            print(f"   💰 Found: {currency} {price:,} (sold, via <strong>)")
-            return price, "sold", currency
+    started = time.perf_counter()
+    result = match_strong(html_content)
+    if record:
+        STAGE_METRICS.record("parse_strong", time.perf_counter() - started)
+    if result:
+        return result
 
     return None, None, None
 
 
-def scrape_auction_price(auction_url: str):
+def find_result_region(html_content: str):
     """
-    Fetch a BaT page and extract final price.
-    Returns (price, status, currency, error)
+    (start, end) of the listing's result block, or None. Runs from the tag
+    holding the first marker to the end of its container, capped at
+    RESULT_REGION_BYTES.
+    """
+    for marker in RESULT_REGION_MARKERS:
+        idx = html_content.find(marker)
+        if idx == -1:
+            continue
+        start = html_content.rfind("<", 0, idx)
+        start = idx if start == -1 else start
+        end = html_content.find("</div>", idx, start + RESULT_REGION_BYTES)
+        return start, (start + RESULT_REGION_BYTES if end == -1 else end)
+    return None
+
+
+def extract_result(html_content: str):
+    """
+    extract_price_from_html, run on the listing's result block first.
+
+    Parsing the whole page is both slow and where the false matches come
+    from (comments, related-listing tiles, the "$10/month" promo), so the
+    full-document passes only run when the block is missing. A block with
+    no result in it (a live or withdrawn listing) gives (None, None, None):
+    anything the rest of the page says belongs to other auctions.
+    Counts which path was taken in RUN_COUNTERS (parse_region,
+    parse_region_empty, parse_no_region).
+    """
+    region = find_result_region(html_content)
+    if region:
+        price, status, currency = extract_price_from_html(html_content[region[0]:region[1]])
+        RUN_COUNTERS.incr("parse_region" if status else "parse_region_empty")
+        return price, status, currency
+    else:
+        RUN_COUNTERS.incr("parse_no_region")
+    return extract_price_from_html(html_content)
+
+
+def read_listing(resp):
+    """
+    Read a streamed listing response.
+
+    The body is decoded chunk by chunk. At doubling sizes (32KB, 64KB, ...) the
+    text so far is checked for a complete result block; once one is found,
+    reading stops there and the connection is closed, with the block's
+    result or, for an empty block, none (see extract_result). Otherwise the
+    page is read to the end or MAX_PAGE_BYTES and parsed with extract_result.
+
+    Returns (html, (price, status, currency), bytes_read, how) where how is
+    "early", "complete" or "capped".
+    """
+    decoder = codecs.getincrementaldecoder(resp.encoding or "utf-8")(errors="replace")
+    chunks = []
+    chars = 0
+    nbytes = 0
+    next_check = 32 * 1024
+    how = "complete"
+    started = time.perf_counter()
+    parse_sec = 0.0
+
+    for raw in resp.iter_content(STREAM_CHUNK_BYTES):
+        nbytes += len(raw)
+        text = decoder.decode(raw)
+        chunks.append(text)
+        chars += len(text)
+
+        if STREAM_EARLY_STOP and chars >= next_check:
+            next_check *= 2
+            check_started = time.perf_counter()
+            html = "".join(chunks)
+            region = find_result_region(html)
+            if region and region[1] < len(html):
+                price, status, currency = extract_price_from_html(html[region[0]:region[1]])
+                RUN_COUNTERS.incr("parse_region" if status else "parse_region_empty")
+                how = "early"
+            parse_sec += time.perf_counter() - check_started
+            if how == "early":
+                break
+
+        if nbytes >= MAX_PAGE_BYTES:
+            how = "capped"
+            break
+
+    wire_bytes = getattr(resp.raw, "tell", lambda: nbytes)() or nbytes
+    STAGE_METRICS.record("http_body", time.perf_counter() - started - parse_sec, wire_bytes)
+    if how == "early":
+        return html, (price, status, currency), wire_bytes, how
+
+    chunks.append(decoder.decode(b"", final=True))
+    html = "".join(chunks)
+    return html, extract_result(html), wire_bytes, how
+
+
+def fetch_listing(auction_url: str, cached: dict | None = None) -> dict:
+    """
+    Fetch a BaT page and extract final price. With a PageCache entry in
+    `cached`, the request is conditional and a 304 returns the cached result
+    without downloading or parsing anything.
+
+    Returns {"price", "status", "currency", "error", "etag", "last_modified",
+    "not_modified", "html"}; html is the page as read, when one was.
     """
+    out = {"etag": None, "last_modified": None, "not_modified": False, "html": None}
     try:
-        # Reduced delay - still polite but faster
-        time.sleep(random.uniform(0.3, 0.8))
+        # Polite delay, shared across workers: the per-host token bucket
+        # replaces the old fixed 0.3-0.8s sleep before every request.
+        STAGE_METRICS.record("rate_wait", host_limiter(auction_url).acquire())
 
         headers = {
             "User-Agent": random.choice(USER_AGENTS),
@@ -162,94 +857,659 @@ def scrape_auction_price(auction_url: str):
             "Accept-Encoding": "gzip, deflate",
             "Connection": "keep-alive",
         }
+        if cached and cached.get("result"):
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
 
         print(f"   🌐 Fetching: {auction_url}")
-        resp = requests.get(auction_url, headers=headers, timeout=15)
+        started = time.perf_counter()
+        with http_session("bat").get(auction_url, headers=headers, timeout=LISTING_TIMEOUT_SEC, stream=True) as resp:
+            STAGE_METRICS.record("http_headers", time.perf_counter() - started)
+            if resp.status_code == 304 and cached and cached.get("result"):
+                print("   ♻️ 304 Not Modified - reusing last result")
+                RUN_COUNTERS.incr("not_modified")
+                price, status, currency, err = cached["result"]
+                out.update(etag=cached.get("etag"), last_modified=cached.get("last_modified"), not_modified=True)
+            else:
+                price, status, currency, err, out["html"] = _parse_listing_response(resp)
+                # Validators only mean something for a real page, not a 403/404.
+                if resp.status_code == 200:
+                    out.update(etag=resp.headers.get("ETag"), last_modified=resp.headers.get("Last-Modified"))
 
-        if resp.status_code == 403:
-            print("   ⚠️ 403 Forbidden - might be blocked")
-            return None, None, None, "403 Forbidden"
+    except requests.exceptions.Timeout:
+        price, status, currency, err = None, None, None, "Timeout"
+    except Exception as e:
+        price, status, currency, err = None, None, None, str(e)[:200]
 
-        if resp.status_code == 404:
-            # Don't auto-mark as withdrawn — BaT returns 404 transiently for
-            # valid listings (Cloudflare interstitials, geo blocks, slug edits).
-            # Leave for retry; admin can manually mark withdrawn if needed.
-            print("   ⚠️ 404 Not Found - will retry next run")
-            return None, None, None, "404 Not Found"
+    out.update(price=price, status=status, currency=currency, error=err)
+    return out
+
+
+def scrape_auction_price(auction_url: str):
+    """
+    Fetch a BaT page and extract final price.
+    Returns (price, status, currency, error)
+    """
+    r = fetch_listing(auction_url)
+    return r["price"], r["status"], r["currency"], r["error"]
 
+
+def _parse_listing_response(resp):
+    """(price, status, currency, error, html) from a streamed BaT response."""
+    if resp.status_code == 403:
+        print("   ⚠️ 403 Forbidden - might be blocked")
+        return None, None, None, "403 Forbidden", None
+
+    if resp.status_code == 404:
+        # Don't auto-mark as withdrawn — BaT returns 404 transiently for
+        # valid listings (Cloudflare interstitials, geo blocks, slug edits).
+        # Leave for retry; admin can manually mark withdrawn if needed.
+        print("   ⚠️ 404 Not Found - will retry next run")
+        return None, None, None, "404 Not Found", None
+
+    if resp.status_code != 200:
+        print(f"   ⚠️ HTTP {resp.status_code}")
+        return None, None, None, f"HTTP {resp.status_code}", None
+
+    html, (price, status, currency), nbytes, how = read_listing(resp)
+    RUN_COUNTERS.incr("bytes_downloaded", nbytes)
+    RUN_COUNTERS.incr(f"pages_{how}")
+    note = {"early": "stopped after result block", "complete": "full page", "capped": "hit MAX_PAGE_BYTES"}[how]
+    print(f"   📦 {nbytes / 1024:,.0f} KB downloaded ({note})")
+
+    if price and price > 0:
+        return price, status, currency, None, html
+
+    # Debug: show sample dollar amounts found
+    dollar_matches = _AMOUNT_RE.findall(html)
+    unique_amounts = list(set(dollar_matches))[:5]
+    if unique_amounts:
+        print(f"   ⚠️ Found amounts but couldn't parse: {unique_amounts}")
+    else:
+        print("   ❌ No price patterns found")
+
+    return None, None, None, "No price found", html
+
+
+# -------- RESULTS INDEX --------
+# The results page embeds its first page of items as JSON in a script tag.
+_INITIAL_DATA_RE = re.compile(r"auctionsCompletedInitialData\s*=\s*(\{.*?\})\s*;\s*$", re.S | re.M)
+
+
+def listing_key(url: str) -> str:
+    """A listing URL as host + path, lower-cased, without scheme, www., query or trailing slash."""
+    parts = urlparse((url or "").strip())
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port:
+        host = f"{host}:{parts.port}"
+    return f"{host}{parts.path.rstrip('/').lower()}"
+
+
+def results_index_items(resp) -> list:
+    """The result items on one index page: the JSON API's "items", or those embedded in the HTML page."""
+    try:
+        data = resp.json()
+    except ValueError:
+        match = _INITIAL_DATA_RE.search(resp.text)
+        try:
+            data = json.loads(match.group(1)) if match else {}
+        except ValueError:
+            data = {}
+    items = data.get("items") if isinstance(data, dict) else data
+    return [i for i in items if isinstance(i, dict) and i.get("url")] if isinstance(items, list) else []
+
+
+def harvest_results(auctions, max_pages: int = RESULTS_INDEX_MAX_PAGES, url_template: str = RESULTS_INDEX_URL,
+                    until: float | None = None) -> dict:
+    """
+    Read RESULTS_INDEX_URL pages until every auction in `auctions` has been
+    seen, a page reaches back past the oldest of them that ended within
+    RESULTS_INDEX_LOOKBACK_HOURS, `max_pages`, or time.monotonic() passes
+    `until`.
+
+    Each item's result line ("Sold for USD $28,055 on 7/5/25", "Bid to ...")
+    goes through extract_price_from_html, timed as one index_parse sample
+    per item rather than under the listing parse stages. Returns {listing_key(url): (price,
+    status, currency)} for every item that resolved, pending or not; a page
+    that cannot be read ends the harvest with what it has.
+    """
+    pending = {listing_key(a["url"]) for a in auctions if a.get("url")}
+    cutoff = time.time() - RESULTS_INDEX_LOOKBACK_HOURS * 3600
+    ends = [e for e in (_epoch(a.get("timestamp_end")) for a in auctions) if e and e >= cutoff]
+    oldest = min(ends) if ends else cutoff
+    index = {}
+    pages = 0
+
+    while pending and pages < max_pages:
+        if until is not None and time.monotonic() >= until:
+            print(f"   ⚠️ Results index stopped after {pages} pages - out of time")
+            break
+        url = url_template.format(page=pages + 1)
+        STAGE_METRICS.record("rate_wait", host_limiter(url).acquire())
+        started = time.perf_counter()
+        try:
+            resp = http_session("bat").get(url, timeout=20, headers={
+                "User-Agent": random.choice(USER_AGENTS),
+                "Accept": "application/json,text/html;q=0.9,*/*;q=0.8",
+            })
+        except Exception as e:
+            print(f"   ⚠️ Results index page {pages + 1} failed: {str(e)[:100]}")
+            break
+        STAGE_METRICS.record("index_fetch", time.perf_counter() - started, len(resp.content))
         if resp.status_code != 200:
-            print(f"   ⚠️ HTTP {resp.status_code}")
-            return None, None, None, f"HTTP {resp.status_code}"
+            print(f"   ⚠️ Results index page {pages + 1}: HTTP {resp.status_code}")
+            break
+        items = results_index_items(resp)
+        if not items:
+            break
+        pages += 1
+        RUN_COUNTERS.incr("index_items", len(items))
 
-        price, status, currency = extract_price_from_html(resp.text)
+        page_ends = []
+        # The parser logs every match; a page of results would bury the run log.
+        with contextlib.redirect_stdout(io.StringIO()):
+            for item in items:
+                end = _epoch(item.get("timestamp_end"))
+                if end:
+                    page_ends.append(end)
+                started = time.perf_counter()
+                price, status, currency = extract_price_from_html(str(item.get("sold_text") or ""), record=False)
+                STAGE_METRICS.record("index_parse", time.perf_counter() - started)
+                if status == "no_sale" or (status == "sold" and price and price > 0):
+                    key = listing_key(item["url"])
+                    index[key] = (price, status, currency)
+                    pending.discard(key)
+        if page_ends and min(page_ends) < oldest:
+            break
 
-        if price and price > 0:
-            return price, status, currency, None
+    RUN_COUNTERS.incr("index_pages", pages)
+    RUN_COUNTERS.incr("index_results", len(index))
+    print(f"📇 Results index: {len(index)} results from {pages} pages, "
+          f"{len(auctions) - len(pending)} of {len(auctions)} scheduled auctions found")
+    return index
 
-        # Debug: show sample dollar amounts found
-        dollar_matches = re.findall(r'[\$€£][\d,\.]+', resp.text)
-        unique_amounts = list(set(dollar_matches))[:5]
-        if unique_amounts:
-            print(f"   ⚠️ Found amounts but couldn't parse: {unique_amounts}")
+
+# -------- PAGE CACHE --------
+class PageCache:
+    """
+    Per-listing cache entries, one JSON object per URL (keyed by its SHA-256):
+        {"url", "etag", "last_modified", "result": [price, status, currency, error],
+         "attempts", "checked_at"}
+    Stored under PAGE_CACHE_DIR, or in S3 when a bucket is given.
+    """
+
+    def __init__(self, directory: str = PAGE_CACHE_DIR, bucket: str = "", prefix: str = PAGE_CACHE_S3_PREFIX):
+        self.directory = directory
+        self.bucket = bucket if bucket and HAS_BOTO else ""
+        self.prefix = prefix
+        if self.bucket:
+            self.s3 = boto3.client("s3")
         else:
-            print("   ❌ No price patterns found")
+            os.makedirs(directory, exist_ok=True)
 
-        return None, None, None, "No price found"
+    @staticmethod
+    def key(url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
 
-    except requests.exceptions.Timeout:
-        return None, None, None, "Timeout"
+    def get(self, url: str):
+        started = time.perf_counter()
+        try:
+            if self.bucket:
+                obj = self.s3.get_object(Bucket=self.bucket, Key=f"{self.prefix}{self.key(url)}.json")
+                return json.loads(obj["Body"].read())
+            with open(os.path.join(self.directory, f"{self.key(url)}.json")) as f:
+                return json.load(f)
+        except Exception:
+            return None
+        finally:
+            STAGE_METRICS.record("cache_read", time.perf_counter() - started)
+
+    def get_many(self, urls, until: float | None = None, workers: int = HTTP_POOL_SIZE) -> dict:
+        """
+        {url: entry or None} for `urls`, read `workers` at a time. Batches
+        stop being started once time.monotonic() passes `until`; the urls
+        left are missing from the result, not None.
+        """
+        urls = list(dict.fromkeys(urls))
+        found = {}
+        batch = workers * 4
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for i in range(0, len(urls), batch):
+                if until is not None and time.monotonic() >= until:
+                    break
+                part = urls[i:i + batch]
+                found.update(zip(part, pool.map(self.get, part)))
+        return found
+
+    def put(self, url: str, entry: dict):
+        body = json.dumps(entry)
+        started = time.perf_counter()
+        try:
+            if self.bucket:
+                self.s3.put_object(Bucket=self.bucket, Key=f"{self.prefix}{self.key(url)}.json", Body=body)
+                return
+            path = os.path.join(self.directory, f"{self.key(url)}.json")
+            with open(f"{path}.tmp", "w") as f:
+                f.write(body)
+            os.replace(f"{path}.tmp", path)
+        except Exception as e:
+            print(f"   ⚠️ Page cache write failed: {str(e)[:100]}")
+        finally:
+            STAGE_METRICS.record("cache_write", time.perf_counter() - started, len(body))
+
+    def delete(self, url: str):
+        try:
+            if self.bucket:
+                self.s3.delete_object(Bucket=self.bucket, Key=f"{self.prefix}{self.key(url)}.json")
+            else:
+                os.remove(os.path.join(self.directory, f"{self.key(url)}.json"))
+        except Exception:
+            pass
+
+    def prune(self, max_age_days: float = PAGE_CACHE_MAX_AGE_DAYS, scan: int = PAGE_CACHE_PRUNE_SCAN) -> int:
+        """
+        Delete entries last written more than `max_age_days` ago. In S3 one
+        listing of up to `scan` keys is looked at, from a random point in the
+        (hash-ordered) key space, so successive runs cover all of it.
+        Returns the number deleted.
+        """
+        cutoff = time.time() - max_age_days * 86400
+        removed = 0
+        try:
+            if self.bucket:
+                listing = self.s3.list_objects_v2(Bucket=self.bucket, Prefix=self.prefix, MaxKeys=min(scan, 1000),
+                                                  StartAfter=f"{self.prefix}{random.randrange(256):02x}")
+                old = [{"Key": o["Key"]} for o in listing.get("Contents", [])
+                       if o["LastModified"].timestamp() < cutoff]
+                if old:
+                    self.s3.delete_objects(Bucket=self.bucket, Delete={"Objects": old, "Quiet": True})
+                removed = len(old)
+            else:
+                for name in os.listdir(self.directory):
+                    path = os.path.join(self.directory, name)
+                    if name.endswith(".json") and os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                        removed += 1
+        except Exception as e:
+            print(f"   ⚠️ Page cache prune failed: {str(e)[:100]}")
+        if removed:
+            print(f"🧹 Page cache: {removed} entries older than {max_age_days:g} days removed")
+        return removed
+
+
+def open_page_cache():
+    """The configured PageCache, or None when it cannot be opened."""
+    try:
+        return PageCache(PAGE_CACHE_DIR, PAGE_CACHE_S3_BUCKET, PAGE_CACHE_S3_PREFIX)
     except Exception as e:
-        return None, None, None, str(e)[:200]
+        print(f"⚠️ Page cache disabled: {str(e)[:100]}")
+        return None
+
+
+def recheck_delay(attempts: int) -> float:
+    """Seconds to wait before re-checking a listing that has failed `attempts` times."""
+    if attempts <= 0:
+        return 0.0
+    minutes = RECHECK_BASE_MINUTES * 2 ** min(attempts - 1, 20)
+    return min(minutes * 60, RECHECK_MAX_HOURS * 3600)
+
+
+def _epoch(value):
+    """Epoch seconds from a number or a PostgREST timestamptz string."""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+def failed_attempts(auction: dict, entry: dict | None) -> tuple:
+    """(attempts, last attempt epoch) from the row's finalize_attempts and the cache."""
+    attempts = int(auction.get("finalize_attempts") or 0)
+    last = _epoch(auction.get("last_finalize_attempt"))
+    if entry and entry.get("attempts", 0) >= attempts:
+        attempts = entry["attempts"]
+        last = entry.get("checked_at", last)
+    return attempts, last
+
+
+def recheck_due(auction: dict, entry: dict | None, now: float | None = None) -> bool:
+    """False while a previously failed listing is still inside its back-off."""
+    attempts, last = failed_attempts(auction, entry)
+    if not attempts or last is None:
+        return True
+    return (now or time.time()) >= last + recheck_delay(attempts)
+
+
+# -------- HTML ARCHIVE --------
+class HtmlArchive:
+    """
+    The HTML behind finalized results. Pages are gzip-compressed and stored
+    once under the SHA-256 of their text, so re-archiving an unchanged page
+    costs nothing:
+        pages/<sha[:2]>/<sha>.html.gz
+    Each listing URL has one record (keyed by the URL's SHA-256, as in
+    PageCache) naming its page and the result written from it:
+        listings/<key>.json  {"url", "auction_ids", "sha256", "result": [price, status, currency], "archived_at"}
+    Stored under HTML_ARCHIVE_DIR, or in S3 when a bucket is given.
+    """
+
+    def __init__(self, directory: str = HTML_ARCHIVE_DIR, bucket: str = "", prefix: str = HTML_ARCHIVE_S3_PREFIX):
+        self.directory = directory
+        self.bucket = bucket if bucket and HAS_BOTO else ""
+        self.prefix = prefix
+        if self.bucket:
+            self.s3 = boto3.client("s3")
+        else:
+            os.makedirs(os.path.join(directory, "pages"), exist_ok=True)
+            os.makedirs(os.path.join(directory, "listings"), exist_ok=True)
+
+    @property
+    def location(self) -> tuple:
+        """What a worker process needs to open the same archive."""
+        return self.directory, self.bucket, self.prefix
+
+    @staticmethod
+    def page_key(sha: str) -> str:
+        return f"pages/{sha[:2]}/{sha}.html.gz"
+
+    def _write(self, key: str, body: bytes, only_new: bool = False):
+        if self.bucket:
+            if only_new:
+                try:
+                    self.s3.head_object(Bucket=self.bucket, Key=f"{self.prefix}{key}")
+                    return
+                except Exception:
+                    pass
+            self.s3.put_object(Bucket=self.bucket, Key=f"{self.prefix}{key}", Body=body)
+            return
+        path = os.path.join(self.directory, *key.split("/"))
+        if only_new and os.path.exists(path):
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(body)
+        os.replace(tmp, path)
+
+    def _read(self, key: str) -> bytes:
+        if self.bucket:
+            return self.s3.get_object(Bucket=self.bucket, Key=f"{self.prefix}{key}")["Body"].read()
+        with open(os.path.join(self.directory, *key.split("/")), "rb") as f:
+            return f.read()
+
+    def put(self, url: str, auction_ids: list, html: str, result):
+        started = time.perf_counter()
+        try:
+            raw = html.encode("utf-8")
+            sha = hashlib.sha256(raw).hexdigest()
+            body = gzip.compress(raw, compresslevel=6)
+            self._write(self.page_key(sha), body, only_new=True)
+            self._write(f"listings/{PageCache.key(url)}.json", json.dumps({
+                "url": url,
+                "auction_ids": [a for a in auction_ids if a],
+                "sha256": sha,
+                "result": list(result),
+                "archived_at": time.time(),
+            }).encode("utf-8"))
+            STAGE_METRICS.record("archive_write", time.perf_counter() - started, len(body))
+        except Exception as e:
+            print(f"   ⚠️ HTML archive write failed: {str(e)[:100]}")
+
+    def page(self, sha: str) -> str:
+        return gzip.decompress(self._read(self.page_key(sha))).decode("utf-8", errors="replace")
+
+    def records(self):
+        """Every listing record."""
+        if self.bucket:
+            pages = self.s3.get_paginator("list_objects_v2").paginate(Bucket=self.bucket, Prefix=f"{self.prefix}listings/")
+            keys = (o["Key"][len(self.prefix):] for p in pages for o in p.get("Contents", []))
+        else:
+            keys = (f"listings/{n}" for n in sorted(os.listdir(os.path.join(self.directory, "listings"))))
+        for key in keys:
+            if key.endswith(".json"):
+                yield json.loads(self._read(key))
+
+
+def open_html_archive():
+    """The configured HtmlArchive, or None when archiving is off or it cannot be opened."""
+    if not HTML_ARCHIVE_DIR and not HTML_ARCHIVE_S3_BUCKET:
+        return None
+    try:
+        return HtmlArchive(HTML_ARCHIVE_DIR or "/tmp/bat_html_archive", HTML_ARCHIVE_S3_BUCKET, HTML_ARCHIVE_S3_PREFIX)
+    except Exception as e:
+        print(f"⚠️ HTML archive disabled: {str(e)[:100]}")
+        return None
+
+
+_WORKER_ARCHIVES = {}
+
+
+def _reextract_batch(job):
+    """Pool worker: extract_result for each record in a batch, or an error string."""
+    location, records = job
+    archive = _WORKER_ARCHIVES.get(location)
+    if archive is None:
+        archive = _WORKER_ARCHIVES[location] = HtmlArchive(*location)
+    results = []
+    # The parser logs every match.
+    with contextlib.redirect_stdout(io.StringIO()):
+        for record in records:
+            try:
+                results.append(list(extract_result(archive.page(record["sha256"]))))
+            except Exception as e:
+                results.append(f"{type(e).__name__}: {str(e)[:100]}")
+    return results
+
+
+def reextract_archive(archive: HtmlArchive, workers: int | None = None, batch: int = REEXTRACT_BATCH) -> dict:
+    """
+    Re-run extract_result over every archived page on a pool of `workers`
+    processes (os.cpu_count() by default) and compare with the results that
+    were written.
+
+    Returns {"checked", "unchanged", "changed", "lost", "unreadable"}:
+    "changed" lists records whose page now parses to a different resolved
+    result (with "new" added), "lost" those that no longer parse to any
+    result, "unreadable" those whose page could not be read.
+    """
+    records = list(archive.records())
+    jobs = [(archive.location, records[i:i + batch]) for i in range(0, len(records), batch)]
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs) or 1))
+    if workers == 1:
+        outputs = map(_reextract_batch, jobs)
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        outputs = pool.map(_reextract_batch, jobs)
+
+    report = {"checked": len(records), "unchanged": 0, "changed": [], "lost": [], "unreadable": []}
+    try:
+        for (_, batch_records), results in zip(jobs, outputs):
+            for record, new in zip(batch_records, results):
+                if isinstance(new, str):
+                    report["unreadable"].append({**record, "error": new})
+                elif new == list(record["result"]):
+                    report["unchanged"] += 1
+                elif new[1] == "no_sale" or (new[1] == "sold" and new[0] and new[0] > 0):
+                    report["changed"].append({**record, "new": new})
+                else:
+                    report["lost"].append({**record, "new": new})
+    finally:
+        if workers > 1:
+            pool.shutdown()
+    return report
+
+
+def _sql_value(value) -> str:
+    if value is None:
+        return "NULL"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, int):
+        return str(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def write_corrections(changed: list, path: str) -> int:
+    """
+    Write the "changed" records of reextract_archive as one SQL UPDATE over
+    every affected auction row (sold: final_price set, reserve_not_met
+    false; reserve not met: final_price NULL, reserve_not_met true and the
+    high bid as current_bid). Unlike finalize_auctions_batch this can clear a
+    wrongly written price. Returns the number of rows in the update.
+    """
+    values = []
+    notes = []
+    for record in changed:
+        old_price, old_status, old_currency = record["result"]
+        price, status, currency = record["new"]
+        if status == "sold":
+            row = (price, False, None)
+        else:
+            row = (None, True, price if price else None)
+        for auction_id in record["auction_ids"]:
+            values.append(f"  ({_sql_value(auction_id)}, {', '.join(_sql_value(v) for v in row)})")
+            notes.append(f"-- {auction_id}: {old_status} {old_currency or ''} {old_price} -> "
+                         f"{status} {currency or ''} {price}  {record['url']}")
+
+    with open(path, "w") as f:
+        f.write(f"-- Corrections from re-extracting archived BaT listings, {datetime.utcnow().isoformat()}Z\n")
+        f.write(f"-- {len(values)} auction rows\n")
+        f.write("\n".join(notes) + "\n" if notes else "")
+        if values:
+            f.write("\nUPDATE auctions a\n"
+                    "   SET final_price     = c.final_price::bigint,\n"
+                    "       reserve_not_met = c.reserve_not_met::boolean,\n"
+                    "       current_bid     = COALESCE(c.current_bid::bigint, a.current_bid)\n"
+                    "  FROM (VALUES\n" + ",\n".join(values) + "\n"
+                    "       ) AS c(auction_id, final_price, reserve_not_met, current_bid)\n"
+                    " WHERE a.auction_id = c.auction_id;\n")
+    return len(values)
 
 
 # -------- SUPABASE I/O --------
-def get_auctions_to_finalize():
+# Only the columns the finalizer reads. The attempt columns arrive with
+# supabase_migration_finalize_attempts.sql and are dropped if it has not run.
+QUEUE_COLUMNS = "auction_id,url,title,timestamp_end"
+QUEUE_ATTEMPT_COLUMNS = "finalize_attempts,last_finalize_attempt"
+
+
+def _pgrst_value(value) -> str:
+    """Quote a value for a PostgREST logic tree (or=/and=)."""
+    return '"' + str(value).replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+class AuctionQueue:
     """
-    Get auctions that have ended and still have final_price = NULL.
-    Only fetches BaT listings (excludes manual auctions).
+    Auctions that have ended and still have final_price = NULL.
+    Only BaT listings (excludes manual auctions) — both filters run in
+    PostgREST, not here.
+
+    Pages through the whole backlog, most recently ended first, with keyset
+    pagination on (timestamp_end, auction_id). The first page is fetched on
+    construction (with an exact count in `total`); iterating yields rows and
+    fetches each further page only when the previous one has been consumed.
+
+    `ends_before` (epoch seconds) replaces the min_age_hours cutoff and
+    `ends_after` adds a lower bound, for reading a window of end times.
+    `failed` is set when a page could not be read.
     """
-    # 2 hours buffer after close
-    cutoff_dt = datetime.now(timezone.utc) - timedelta(hours=2)
-    cutoff_epoch = int(cutoff_dt.timestamp())
 
-    # Don't process auctions older than 14 days (likely archived/changed)
-    old_cutoff_dt = datetime.now(timezone.utc) - timedelta(days=14)
-    old_cutoff_epoch = int(old_cutoff_dt.timestamp())
+    def __init__(self, page_size: int = QUEUE_PAGE_SIZE, min_age_hours: float = 2,
+                 ends_after: float | None = None, ends_before: float | None = None):
+        if ends_before is None:
+            # 2 hours buffer after close
+            self.cutoff_dt = datetime.now(timezone.utc) - timedelta(hours=min_age_hours)
+        else:
+            self.cutoff_dt = datetime.fromtimestamp(ends_before, timezone.utc)
+        self.cutoff_epoch = int(self.cutoff_dt.timestamp())
+        self.ends_after = int(ends_after) if ends_after is not None else None
+        self.page_size = page_size
+        self.columns = f"{QUEUE_COLUMNS},{QUEUE_ATTEMPT_COLUMNS}"
+        self.total = None
+        self.pages = 0
+        self.after = None  # (timestamp_end, auction_id) of the last row seen
+        self.done = False
+        self.failed = False
 
-    url = f"{SUPABASE_URL}/rest/v1/auctions"
-    headers = {
-        "apikey": SUPABASE_KEY,
-        "Authorization": f"Bearer {SUPABASE_KEY}",
-        "Content-Type": "application/json",
-    }
+        print("📡 Fetching auctions from Supabase...")
+        print(f"   Cutoff: {self.cutoff_dt.isoformat()} ({self.cutoff_epoch})")
+        self.first_page = self._fetch_page()
+        if self.total is not None:
+            print(f"   Found {self.total} BaT auctions to process")
 
-    params = {
-        "select": "*",
-        "final_price": "is.null",
-        "reserve_not_met": "is.false",  # Skip confirmed reserve-not-met auctions
-        "timestamp_end": f"lt.{cutoff_epoch}",
-        "limit": "100",
-        "order": "timestamp_end.desc",  # Process most recent first
-    }
+    def _params(self) -> dict:
+        params = {
+            "select": self.columns,
+            "final_price": "is.null",
+            "reserve_not_met": "is.false",  # Skip confirmed reserve-not-met auctions
+            "timestamp_end": f"lt.{self.cutoff_epoch}" if self.ends_after is None
+            else [f"lt.{self.cutoff_epoch}", f"gte.{self.ends_after}"],
+            "url": "like.*bringatrailer.com*",
+            "auction_id": "not.like.manual_*",
+            "order": "timestamp_end.desc,auction_id.desc",  # Process most recent first
+            "limit": str(self.page_size),
+        }
+        if self.after:
+            te, aid = self.after
+            params["or"] = (
+                f"(timestamp_end.lt.{te},"
+                f"and(timestamp_end.eq.{te},auction_id.lt.{_pgrst_value(aid)}))"
+            )
+        return params
+
+    def _fetch_page(self) -> list:
+        url = f"{SUPABASE_URL}/rest/v1/auctions"
+        headers = {"Prefer": "count=exact"} if self.total is None else {}
+        started = time.perf_counter()
+        r = http_session("supabase").get(url, params=self._params(), headers=headers, timeout=20)
 
-    print("📡 Fetching auctions from Supabase...")
-    print(f"   Cutoff: {cutoff_dt.isoformat()} ({cutoff_epoch})")
+        if r.status_code == 400 and QUEUE_ATTEMPT_COLUMNS in self.columns:
+            print(f"   ⚠️ Attempt tracking unavailable ({r.text[:120]}) — run supabase_migration_finalize_attempts.sql")
+            self.columns = QUEUE_COLUMNS
+            r = http_session("supabase").get(url, params=self._params(), headers=headers, timeout=20)
+        STAGE_METRICS.record("queue_fetch", time.perf_counter() - started, len(r.content))
 
-    r = requests.get(url, headers=headers, params=params, timeout=20)
+        if r.status_code not in (200, 206):
+            print(f"   ❌ Error: {r.status_code} - {r.text[:200]}")
+            self.done = True
+            self.failed = True
+            return []
 
-    if r.status_code == 200:
-        auctions = r.json()
-        # Filter out manual auctions and non-BaT URLs
-        bat_auctions = [
-            a for a in auctions
-            if a.get("url") and "bringatrailer.com" in a.get("url", "")
-            and not a.get("auction_id", "").startswith("manual_")
-        ]
-        print(f"   Found {len(bat_auctions)} BaT auctions to process (filtered from {len(auctions)})")
-        return bat_auctions
+        if self.total is None:
+            count = r.headers.get("Content-Range", "").rpartition("/")[2]
+            self.total = int(count) if count.isdigit() else None
 
-    print(f"   ❌ Error: {r.status_code} - {r.text[:200]}")
-    return []
+        rows = r.json()
+        self.pages += 1
+        if len(rows) < self.page_size:
+            self.done = True
+        if rows:
+            self.after = (rows[-1]["timestamp_end"], rows[-1]["auction_id"])
+        return rows
+
+    def __iter__(self):
+        rows, self.first_page = self.first_page, []
+        while True:
+            yield from rows
+            if self.done:
+                return
+            rows = self._fetch_page()
+
+
+def get_auctions_to_finalize():
+    """
+    Get auctions that have ended and still have final_price = NULL.
+    Only fetches BaT listings (excludes manual auctions).
+    """
+    return list(AuctionQueue())
 
 
 def update_auction_price(auction_id: str, final_price: int, currency: str = "USD") -> bool:
@@ -258,19 +1518,16 @@ def update_auction_price(auction_id: str, final_price: int, currency: str = "USD
     """
     url = f"{SUPABASE_URL}/rest/v1/auctions"
     params = {"auction_id": f"eq.{auction_id}"}
-    headers = {
-        "apikey": SUPABASE_KEY,
-        "Authorization": f"Bearer {SUPABASE_KEY}",
-        "Content-Type": "application/json",
-        "Prefer": "return=minimal",
-    }
+    headers = {"Prefer": "return=minimal"}
 
     # Store price in USD equivalent (you could add currency conversion here)
     # For now, we store the raw price with a note about currency
     data = {"final_price": final_price}
 
     try:
-        resp = requests.patch(url, headers=headers, params=params, json=data, timeout=20)
+        started = time.perf_counter()
+        resp = http_session("supabase").patch(url, headers=headers, params=params, json=data, timeout=20)
+        STAGE_METRICS.record("db_write_row", time.perf_counter() - started)
         if resp.status_code in (200, 204):
             print(f"   ✅ Updated {auction_id}: {currency} ${final_price:,}")
             return True
@@ -290,18 +1547,15 @@ def mark_reserve_not_met(auction_id: str, high_bid: int | None) -> bool:
     """
     url = f"{SUPABASE_URL}/rest/v1/auctions"
     params = {"auction_id": f"eq.{auction_id}"}
-    headers = {
-        "apikey": SUPABASE_KEY,
-        "Authorization": f"Bearer {SUPABASE_KEY}",
-        "Content-Type": "application/json",
-        "Prefer": "return=minimal",
-    }
+    headers = {"Prefer": "return=minimal"}
     data = {"reserve_not_met": True}
     if high_bid:
         data["current_bid"] = high_bid
 
     try:
-        resp = requests.patch(url, headers=headers, params=params, json=data, timeout=20)
+        started = time.perf_counter()
+        resp = http_session("supabase").patch(url, headers=headers, params=params, json=data, timeout=20)
+        STAGE_METRICS.record("db_write_row", time.perf_counter() - started)
         if resp.status_code in (200, 204):
             bid_note = f" — high bid ${high_bid:,}" if high_bid else ""
             print(f"   ⚠️ Marked reserve not met{bid_note}")
@@ -312,63 +1566,796 @@ def mark_reserve_not_met(auction_id: str, high_bid: int | None) -> bool:
         return False
 
 
-# -------- LAMBDA HANDLER --------
-def lambda_handler(event, context):
-    print("=" * 60)
-    print("🚀 BaT Auction Finalizer v2.0 - Multi-Currency Support")
-    print(f"🕐 Time: {datetime.utcnow().isoformat()}")
-    print("=" * 60)
+class WriteBuffer:
+    """
+    Collects sold prices and reserve-not-met flags and writes them in bulk
+    through the finalize_auctions_batch RPC, one round trip per flush instead
+    of one PATCH per auction. Falls back to the per-row PATCHes when the
+    migration has not been run.
 
-    if not SUPABASE_URL or not SUPABASE_KEY:
-        print("❌ Missing SUPABASE_URL or SUPABASE_KEY")
-        return {"statusCode": 500, "body": json.dumps({"error": "Missing env vars"})}
+    flush() returns the rows that did not get written as
+    (kind, auction_id, title) tuples, kind being "sold" or "no_sale".
+
+    Failed scrapes are counted too: flush() bumps finalize_attempts for them
+    in one bump_finalize_attempts call, which drives the re-check back-off.
+    """
+
+    def __init__(self, batch_size: int = WRITE_BATCH_SIZE):
+        self.batch_size = batch_size
+        self.rows = {}
+        self.attempt_ids = []
+        self.attempt_urls = []
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.rows)
+
+    def add_sold(self, auction_id: str, final_price: int, currency: str = "USD", title: str = ""):
+        with self.lock:
+            self.rows[auction_id] = {
+                "kind": "sold", "title": title, "currency": currency,
+                "row": {"auction_id": auction_id, "final_price": final_price},
+            }
+
+    def add_reserve_not_met(self, auction_id: str, high_bid: int | None, title: str = ""):
+        row = {"auction_id": auction_id, "reserve_not_met": True}
+        if high_bid:
+            row["current_bid"] = high_bid
+        with self.lock:
+            self.rows[auction_id] = {"kind": "no_sale", "title": title, "currency": None, "row": row}
+
+    def add_failed_attempt(self, auction_id: str | None, url: str):
+        with self.lock:
+            if auction_id is not None:
+                self.attempt_ids.append(auction_id)
+            else:
+                self.attempt_urls.append(url)
+
+    def flush(self) -> list:
+        with self.lock:
+            pending, self.rows = list(self.rows.values()), {}
+            ids, self.attempt_ids = self.attempt_ids, []
+            urls, self.attempt_urls = self.attempt_urls, []
+        if ids or urls:
+            self._bump_attempts(ids, urls)
+        if not pending:
+            return []
+
+        written = self._write_batch([p["row"] for p in pending])
+        if written is None:
+            print("   ⚠️ finalize_auctions_batch unavailable — run supabase_migration_finalize_batch.sql; writing row by row")
+            written = {}
+            for p in pending:
+                row = p["row"]
+                if p["kind"] == "sold":
+                    written[row["auction_id"]] = update_auction_price(row["auction_id"], row["final_price"], p["currency"] or "USD")
+                else:
+                    written[row["auction_id"]] = mark_reserve_not_met(row["auction_id"], row.get("current_bid"))
+
+        failed = []
+        for p in pending:
+            auction_id = p["row"]["auction_id"]
+            if not written.get(auction_id):
+                print(f"   ❌ Update failed: {auction_id} ({p['kind']})")
+                failed.append((p["kind"], auction_id, p["title"]))
+        print(f"💾 Wrote {len(pending) - len(failed)}/{len(pending)} results")
+        return failed
+
+    @staticmethod
+    def _bump_attempts(ids: list, urls: list):
+        url = f"{SUPABASE_URL}/rest/v1/rpc/bump_finalize_attempts"
+        started = time.perf_counter()
+        try:
+            # bump_finalize_attempts increments, so a replay after a lost
+            # response would count the same failure twice: no retries.
+            resp = http_session("supabase", retries=False).post(url, json={"p_ids": ids, "p_urls": urls}, timeout=20)
+            STAGE_METRICS.record("db_attempts", time.perf_counter() - started)
+            if resp.status_code != 200:
+                print(f"   ⚠️ Attempt counts not saved ({resp.status_code}) — run supabase_migration_finalize_attempts.sql")
+        except Exception as e:
+            print(f"   ⚠️ Attempt counts not saved: {str(e)[:100]}")
+
+    @staticmethod
+    def _write_batch(rows: list):
+        """{auction_id: updated} from the RPC, or None when it cannot be used."""
+        url = f"{SUPABASE_URL}/rest/v1/rpc/finalize_auctions_batch"
+        started = time.perf_counter()
+        try:
+            resp = http_session("supabase").post(url, json={"p_rows": rows}, timeout=DB_WRITE_TIMEOUT_SEC)
+            STAGE_METRICS.record("db_write", time.perf_counter() - started, len(resp.request.body or b""))
+        except Exception as e:
+            print(f"   ❌ Batch write error: {str(e)}")
+            return {}
+        if resp.status_code == 404:
+            return None
+        if resp.status_code != 200:
+            print(f"   ❌ Batch write failed: {resp.status_code} - {resp.text[:200]}")
+            return {}
+        return {r["auction_id"]: bool(r["updated"]) for r in resp.json()}
+
+
+# -------- SCHEDULER --------
+# How likely a re-check is to resolve, by the listing's last error (prefix
+# match). Timeouts and 5xx usually clear on their own; a 403 means BaT was
+# blocking us; a 404 or a page with no parseable price tends to stay that way.
+ERROR_WEIGHTS = (
+    ("Timeout", 0.8),
+    ("HTTP 5", 0.7),
+    ("403 Forbidden", 0.6),
+    ("404 Not Found", 0.3),
+    ("No price found", 0.25),
+)
+UNKNOWN_ERROR_WEIGHT = 0.5
+
+# (table, column) pairs naming the auctions leagues depend on.
+LEAGUE_REFERENCES = (
+    ("garage_cars", "auction_id"),
+    ("leagues", "bonus_auction_id"),
+    ("league_auctions", "auction_id"),
+)
+
+
+def error_weight(error: str | None) -> float:
+    if not error:
+        return 1.0
+    for prefix, weight in ERROR_WEIGHTS:
+        if error.startswith(prefix):
+            return weight
+    return UNKNOWN_ERROR_WEIGHT
+
+
+def league_auction_ids(auction_ids, chunk: int = 200, until: float | None = None) -> set:
+    """
+    The subset of `auction_ids` some league depends on. A table that cannot
+    be read is skipped (its auctions just get no league boost), as is
+    every lookup once time.monotonic() passes `until`.
+    """
+    ids = list(auction_ids)
+    found = set()
+    for table, column in LEAGUE_REFERENCES:
+        for i in range(0, len(ids), chunk):
+            if until is not None and time.monotonic() >= until:
+                print(f"   ⚠️ League lookups cut short at {table} - out of scheduling time")
+                return found
+            in_list = ",".join(_pgrst_value(a) for a in ids[i:i + chunk])
+            started = time.perf_counter()
+            try:
+                r = http_session("supabase").get(
+                    f"{SUPABASE_URL}/rest/v1/{table}",
+                    params={"select": column, column: f"in.({in_list})"},
+                    timeout=20,
+                )
+                STAGE_METRICS.record("league_lookup", time.perf_counter() - started, len(r.content))
+            except Exception as e:
+                print(f"   ⚠️ League lookup on {table} failed: {str(e)[:100]}")
+                break
+            if r.status_code != 200:
+                print(f"   ⚠️ League lookup on {table}: {r.status_code} - {r.text[:120]}")
+                break
+            found.update(row[column] for row in r.json() if row.get(column))
+    return found
+
+
+def priority_score(auction: dict, entry: dict | None, in_league: bool, now: float) -> float:
+    """
+    Expected value of spending a fetch on this auction now:
+    freshness × 1/(1 + failed attempts) × error weight × league weight.
+    """
+    ended = _epoch(auction.get("timestamp_end"))
+    age_hours = max(0.0, (now - ended) / 3600) if ended else 0.0
+    freshness = 1.0 / (1.0 + age_hours / SCHEDULE_AGE_SCALE_HOURS)
+    attempts, _ = failed_attempts(auction, entry)
+    last_error = entry["result"][3] if entry and entry.get("result") and attempts else None
+    score = freshness / (1 + attempts) * error_weight(last_error)
+    return score * SCHEDULE_LEAGUE_WEIGHT if in_league else score
 
-    auctions = get_auctions_to_finalize()
-    if not auctions:
-        print("📭 No auctions to process")
-        return {"statusCode": 200, "body": json.dumps({"message": "No auctions", "processed": 0})}
 
+def schedule_queue(queue, cache: PageCache | None = None, max_rows: int = SCHEDULE_MAX_ROWS,
+                   now: float | None = None, deadline: float | None = None):
+    """
+    Read up to `max_rows` of `queue` (an AuctionQueue or a list), drop those
+    still inside their re-check back-off, and order the rest by
+    priority_score, highest first. Each row carries its cache entry under
+    "_cache_entry" so finalize_auction does not read it again.
+
+    Ordering the whole read means no listing is fetched until every queue
+    page and league lookup is in, unlike the lazy AuctionQueue on its own.
+    With a `deadline` (time.monotonic()), reading stops once
+    SCHEDULE_READ_SHARE of the time left to it has gone; rows not read
+    count as "unread" and wait for the next run. Cache entries are read
+    in parallel within the same bound; a row whose entry was not reached
+    is scored without it, and finalize_auction reads it instead.
+
+    Returns (rows, plan) where plan counts what was read:
+    {"queued", "scheduled", "waiting", "league", "unread"}.
+    """
+    now = now or time.time()
+    read_until = None
+    if deadline is not None:
+        read_until = time.monotonic() + max(0.0, deadline - time.monotonic()) * SCHEDULE_READ_SHARE
+    rows = []
+    for auction in queue:
+        rows.append(auction)
+        if len(rows) >= max_rows:
+            break
+        if read_until is not None and time.monotonic() >= read_until:
+            print(f"   ⚠️ Queue read stopped at {len(rows)} rows - out of scheduling time")
+            break
+    total = len(queue) if hasattr(queue, "__len__") else getattr(queue, "total", None)
+
+    ids = [a["auction_id"] for a in rows if a.get("auction_id")]
+    league = league_auction_ids(ids, until=read_until) if ids else set()
+    entries = cache.get_many([a["url"] for a in rows if a.get("url")], until=read_until) if cache else {}
+    heap = []
+    waiting = 0
+    for i, auction in enumerate(rows):
+        url = auction.get("url")
+        entry = entries.get(url)
+        if not recheck_due(auction, entry, now):
+            waiting += 1
+            continue
+        if not cache or not url or url in entries:
+            auction["_cache_entry"] = entry
+        score = priority_score(auction, entry, auction.get("auction_id") in league, now)
+        # i breaks ties in queue order (most recently ended first)
+        heapq.heappush(heap, (-score, i, auction))
+
+    ordered = [heapq.heappop(heap)[2] for _ in range(len(heap))]
+    RUN_COUNTERS.incr("rechecks_waiting", waiting)
+    plan = {
+        "queued": total if total is not None else len(rows),
+        "scheduled": len(ordered),
+        "waiting": waiting,
+        "league": sum(1 for a in ordered if a.get("auction_id") in league),
+        "unread": max(0, (total or len(rows)) - len(rows)),
+    }
+    print(f"🗂️ Scheduled {plan['scheduled']} of {plan['queued']} "
+          f"({plan['league']} league, {plan['waiting']} waiting on back-off, {plan['unread']} not read this run)")
+    return ordered, plan
+
+
+def group_by_listing(rows: list) -> list:
+    """
+    One row per distinct listing (listing_key of its url), in the order
+    given. The same listing can sit under several auction rows (one per
+    league, or legacy rows written against the url); the rows after the
+    first ride along under "_duplicates" and finalize_auction gives them
+    the first one's result. Rows without a url are kept as they are.
+    """
+    leads = {}
+    out = []
+    for row in rows:
+        key = listing_key(row["url"]) if row.get("url") else None
+        lead = leads.get(key) if key else None
+        if lead is None:
+            if key:
+                leads[key] = row
+            out.append(row)
+        else:
+            lead.setdefault("_duplicates", []).append(row)
+    return out
+
+
+def backlog_eta(plan: dict, processed: int, deferred: int) -> dict:
+    """
+    Items carried to the next run and, at this run's pace, how many runs
+    (and hours, at FINALIZE_RUN_INTERVAL_MIN) the backlog needs to drain.
+    """
+    remaining = deferred + plan.get("unread", 0)
+    if not remaining:
+        runs = 0
+    elif processed:
+        runs = -(-remaining // processed)
+    else:
+        runs = None
+    return {
+        **plan,
+        "deferred": remaining,
+        "runs_to_drain": runs,
+        "eta_hours": round(runs * FINALIZE_RUN_INTERVAL_MIN / 60, 1) if runs is not None else None,
+    }
+
+
+# -------- FETCH ENGINE --------
+def run_deadline(context) -> float:
+    """
+    time.monotonic() value after which no new listing is started: the Lambda's
+    remaining time minus FINALIZE_DEADLINE_MARGIN_SEC (or minus half of it,
+    when that is less than twice the margin), or FINALIZE_BUDGET_SEC when
+    running outside Lambda.
+    """
+    budget = FINALIZE_BUDGET_SEC
+    if context is not None and hasattr(context, "get_remaining_time_in_millis"):
+        remaining = context.get_remaining_time_in_millis() / 1000
+        margin = FINALIZE_DEADLINE_MARGIN_SEC
+        if remaining < 2 * margin:
+            margin = remaining / 2
+            print(f"⚠️ Only {remaining:.0f}s left for a {FINALIZE_DEADLINE_MARGIN_SEC:.0f}s deadline margin - "
+                  f"using {margin:.0f}s; a slow last fetch or write may not land (raise the Lambda timeout "
+                  f"or set FINALIZE_DEADLINE_MARGIN_SEC)")
+        budget = remaining - margin
+    return time.monotonic() + max(0.0, budget)
+
+
+def finalize_auction(auction: dict, label: str, writes: WriteBuffer, cache: PageCache | None = None,
+                     index: dict | None = None, now: float | None = None, archive: HtmlArchive | None = None):
+    """
+    Scrape one auction and queue its result on `writes`, for the auction and
+    for every row under its "_duplicates" (see group_by_listing). An auction
+    found in `index` (from harvest_results) takes its result from there,
+    unfetched. `now` is the epoch time the re-check back-off is judged at.
+    A fetched page that resolves is kept in `archive`.
+    Returns (outcome, error) where outcome is "success", "no_sale", "failed",
+    or "waiting" when the auction's re-check back-off has not elapsed;
+    "success" is provisional until the buffer has been flushed.
+    """
+    auction_id = auction.get("auction_id")
+    auction_url = auction.get("url")
+    title = (auction.get("title") or "Unknown")[:60]
+    rows = [auction, *auction.get("_duplicates", ())]
+
+    if "_cache_entry" in auction:
+        entry = auction["_cache_entry"]
+    else:
+        entry = cache.get(auction_url) if cache and auction_url else None
+    if not recheck_due(auction, entry, now):
+        return "waiting", None
+
+    print(f"\n{label} {title}")
+    print(f"   ID: {auction_id}")
+    if len(rows) > 1:
+        print(f"   🔗 Shared with {len(rows) - 1} more row(s): {', '.join(str(r.get('auction_id')) for r in rows[1:])}")
+
+    if not auction_url:
+        print("   ❌ No URL")
+        return "failed", f"{title}: No URL"
+
+    hit = index.get(listing_key(auction_url)) if index else None
+    if hit:
+        print("   📇 Result from the results index")
+        RUN_COUNTERS.incr("index_hits")
+        price, status, currency = hit
+        r = {"price": price, "status": status, "currency": currency, "error": None,
+             "etag": None, "last_modified": None, "not_modified": False}
+    else:
+        r = fetch_listing(auction_url, entry)
+        RUN_COUNTERS.incr("fetches_saved", len(rows) - 1)
+    price, status, currency, err = r["price"], r["status"], r["currency"], r["error"]
+    resolved = (status == "sold" and price and price > 0) or status == "no_sale"
+
+    if cache and resolved:
+        # Finalized: nothing will re-check this listing again.
+        if entry:
+            cache.delete(auction_url)
+    elif cache:
+        attempts, _ = failed_attempts(auction, entry)
+        cache.put(auction_url, {
+            "url": auction_url,
+            "etag": r["etag"],
+            "last_modified": r["last_modified"],
+            "result": [price, status, currency, err],
+            "attempts": attempts + 1,
+            "checked_at": time.time(),
+        })
+    if not resolved:
+        for row in rows:
+            writes.add_failed_attempt(row.get("auction_id"), auction_url)
+    elif archive and r.get("html"):
+        archive.put(auction_url, [row.get("auction_id") for row in rows], r["html"], (price, status, currency))
+
+    if status == "sold" and price and price > 0:
+        for row in rows:
+            writes.add_sold(row.get("auction_id"), price, currency or "USD", (row.get("title") or title)[:60])
+        return "success", None
+    if status == "no_sale":
+        # Reserve not met - flag it (with the high bid when found).
+        # Leave final_price NULL so 25% penalty applies in scoring
+        for row in rows:
+            writes.add_reserve_not_met(row.get("auction_id"), price, (row.get("title") or title)[:60])
+        return "no_sale", None
+    return "failed", f"{title}: {err or 'Unknown'}"
+
+
+def run_fetch_engine(auctions, deadline: float, concurrency: int = FINALIZE_CONCURRENCY,
+                     cache: PageCache | None = None, index: dict | None = None,
+                     archive: HtmlArchive | None = None):
+    """
+    Finalize auctions (a list or an AuctionQueue, which is consumed lazily as
+    pages arrive) with up to `concurrency` listings in flight. New work is
+    only started before `deadline`; whatever is left is deferred to the next
+    run (it is still unfinalized, so the next query picks it up again).
+    Results are written in bulk every WRITE_BATCH_SIZE auctions, as they
+    arrive once `deadline` has passed, and at the end.
+    Auctions still inside their re-check back-off are skipped and counted in
+    RUN_COUNTERS["rechecks_waiting"]. `index` and `archive` are passed on to
+    finalize_auction.
+    Stats and deferred count rows, so an auction carrying "_duplicates"
+    counts once for itself and once for each of them.
+
+    Returns (stats, errors, deferred).
+    """
     stats = {
         "success": 0,
         "no_sale": 0,
         "failed": 0,
     }
     errors = []
+    total = len(auctions) if hasattr(auctions, "__len__") else getattr(auctions, "total", None)
+    if hasattr(auctions, "__len__"):
+        total_rows = sum(1 + len(a.get("_duplicates", ())) for a in auctions)
+    else:
+        total_rows = total
+    queue = iter(enumerate(auctions, 1))
+    in_flight = {}
+    started = 0
+    writes = WriteBuffer()
 
-    for i, auction in enumerate(auctions, 1):
-        auction_id = auction.get("auction_id")
-        auction_url = auction.get("url")
-        title = (auction.get("title") or "Unknown")[:60]
+    def flush_writes():
+        # A sold row that could not be written is a failure; a reserve-not-met
+        # flag that could not be written still counts as no_sale (as before),
+        # it will simply be re-scraped next run.
+        for kind, _, title in writes.flush():
+            if kind == "sold":
+                stats["success"] -= 1
+                stats["failed"] += 1
+                errors.append(f"{title}: DB update failed")
 
-        print(f"\n[{i}/{len(auctions)}] {title}")
-        print(f"   ID: {auction_id}")
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        while True:
+            while len(in_flight) < concurrency and time.monotonic() < deadline:
+                nxt = next(queue, None)
+                if nxt is None:
+                    break
+                i, auction = nxt
+                label = f"[{i}/{total}]" if total else f"[{i}]"
+                fut = pool.submit(finalize_auction, auction, label, writes, cache, index, None, archive)
+                in_flight[fut] = 1 + len(auction.get("_duplicates", ()))
+                started += in_flight[fut]
+            if not in_flight:
+                break
+            # Wake at the deadline too, to write what is buffered by then.
+            remaining = deadline - time.monotonic()
+            done, _ = wait(in_flight, timeout=remaining if remaining > 0 else None, return_when=FIRST_COMPLETED)
+            for fut in done:
+                n_rows = in_flight.pop(fut)
+                try:
+                    outcome, err = fut.result()
+                except Exception as e:
+                    outcome, err = "failed", str(e)[:200]
+                if outcome == "waiting":
+                    RUN_COUNTERS.incr("rechecks_waiting", n_rows)
+                    continue
+                stats[outcome] += n_rows
+                if err:
+                    errors.append(err)
+            # Past the deadline every result is written as soon as it lands,
+            # so a run cut short loses at most the listings still in flight.
+            if len(writes) >= writes.batch_size or time.monotonic() >= deadline:
+                flush_writes()
 
-        if not auction_url:
-            print("   ❌ No URL")
-            stats["failed"] += 1
-            errors.append(f"{title}: No URL")
-            continue
+    flush_writes()
+    return stats, errors, max(0, (total_rows or started) - started)
+
+
+# -------- EVENT MODE --------
+class SystemClock:
+    """Epoch-seconds clock for EventFinalizer; tests swap in one they can advance."""
+
+    @staticmethod
+    def now() -> float:
+        return time.time()
+
+    @staticmethod
+    def sleep(seconds: float):
+        time.sleep(seconds)
 
-        price, status, currency, err = scrape_auction_price(auction_url)
 
-        if status == "sold" and price and price > 0:
-            if update_auction_price(auction_id, price, currency or "USD"):
-                stats["success"] += 1
+class TimerQueue:
+    """
+    Min-heap of (due, seq, key). Scheduling a key that is already queued moves
+    it: the old heap entry stays where it is and is skipped when it reaches
+    the top, so schedule, cancel and pop are all O(log n).
+    """
+
+    def __init__(self):
+        self.heap = []
+        self.live = {}  # key -> (due, seq) of its current entry
+        self.seq = 0
+
+    def __len__(self):
+        return len(self.live)
+
+    def __contains__(self, key):
+        return key in self.live
+
+    def schedule(self, key, due: float):
+        self.seq += 1
+        self.live[key] = (due, self.seq)
+        heapq.heappush(self.heap, (due, self.seq, key))
+
+    def cancel(self, key):
+        self.live.pop(key, None)
+
+    def _prune(self):
+        while self.heap and self.live.get(self.heap[0][2]) != self.heap[0][:2]:
+            heapq.heappop(self.heap)
+
+    def next_due(self) -> float | None:
+        self._prune()
+        return self.heap[0][0] if self.heap else None
+
+    def pop_due(self, now: float) -> list:
+        """Every key due at or before `now`, earliest first."""
+        keys = []
+        while self.next_due() is not None and self.heap[0][0] <= now:
+            _, _, key = heapq.heappop(self.heap)
+            del self.live[key]
+            keys.append(key)
+        return keys
+
+
+class EventFinalizer:
+    """
+    Finalizes each auction when it becomes eligible rather than on a polling
+    schedule.
+
+    refresh() reads the unfinalized auctions ending between
+    EVENT_LOOKBACK_HOURS ago and EVENT_HORIZON_HOURS ahead and reconciles
+    them with the timer queue: new rows are queued, rows whose end time moved
+    are re-queued, rows that left the window (finalized elsewhere, or past
+    the lookback) are dropped. An auction is due EVENT_SETTLE_MINUTES after
+    it ends, or when its re-check back-off runs out if that is later. run()
+    sleeps until the next timer or refresh, finalizes whatever is due (a
+    failure bumps the attempt count and re-queues it) and repeats. Stage
+    metrics are published, and RUN_COUNTERS folded into `counters`, at each
+    refresh and when run() returns, so neither grows over a long watch.
+
+    `clock` needs now() and sleep(); see SystemClock.
+    """
+
+    def __init__(self, clock=None, cache: PageCache | None = None, concurrency: int = FINALIZE_CONCURRENCY,
+                 archive: HtmlArchive | None = None):
+        self.clock = clock or SystemClock()
+        self.cache = cache
+        self.archive = archive
+        self.concurrency = concurrency
+        self.timers = TimerQueue()
+        self.rows = {}  # auction_id -> row, for every queued auction
+        self.next_refresh = None
+        self.stats = {"success": 0, "no_sale": 0, "failed": 0}
+        self.counts = {"refreshes": 0, "wakeups": 0, "added": 0, "moved": 0, "dropped": 0, "deferred": 0}
+        self.latencies = []  # seconds from timestamp_end to the write, per finalized auction
+        self.errors = []
+        self.counters = {}  # RUN_COUNTERS totals over the published windows
+
+    @staticmethod
+    def due_at(row: dict, entry: dict | None = None) -> float:
+        due = _epoch(row["timestamp_end"]) + EVENT_SETTLE_MINUTES * 60
+        attempts, last = failed_attempts(row, entry)
+        if attempts and last is not None:
+            due = max(due, last + recheck_delay(attempts))
+        return due
+
+    def publish_metrics(self):
+        counters, _ = publish_run_metrics()
+        for name, n in counters.items():
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def refresh(self):
+        if self.next_refresh is not None:
+            self.publish_metrics()
+        now = self.clock.now()
+        self.next_refresh = now + EVENT_REFRESH_MINUTES * 60
+        self.counts["refreshes"] += 1
+        if self.cache:
+            self.cache.prune()
+        queue = AuctionQueue(ends_after=now - EVENT_LOOKBACK_HOURS * 3600, ends_before=now + EVENT_HORIZON_HOURS * 3600)
+        fresh = {r["auction_id"]: r for r in queue if r.get("auction_id") and _epoch(r.get("timestamp_end"))}
+        if queue.failed:
+            print("   ⚠️ Refresh failed - keeping the current timers")
+            return
+
+        for auction_id, row in fresh.items():
+            known = self.rows.get(auction_id)
+            if known is not None:
+                if known["timestamp_end"] == row["timestamp_end"]:
+                    continue
+                self.counts["moved"] += 1
+                # Attempts made here may not have reached the table yet.
+                if failed_attempts(known, None)[0] > failed_attempts(row, None)[0]:
+                    row = {**row, "finalize_attempts": known.get("finalize_attempts"),
+                           "last_finalize_attempt": known.get("last_finalize_attempt")}
             else:
-                stats["failed"] += 1
-                errors.append(f"{title}: DB update failed")
-        elif status == "no_sale":
-            # Reserve not met - flag it (with the high bid when found).
-            # Leave final_price NULL so 25% penalty applies in scoring
-            mark_reserve_not_met(auction_id, price)
-            stats["no_sale"] += 1
-        else:
-            stats["failed"] += 1
-            errors.append(f"{title}: {err or 'Unknown'}")
+                self.counts["added"] += 1
+            self.rows[auction_id] = row
+            self.timers.schedule(auction_id, self.due_at(row))
+
+        for auction_id in [a for a in self.rows if a not in fresh]:
+            del self.rows[auction_id]
+            self.timers.cancel(auction_id)
+            self.counts["dropped"] += 1
+        print(f"⏰ {len(self.timers)} auctions queued, next due in "
+              f"{max(0.0, (self.timers.next_due() or now) - now) / 60:.0f} min")
+
+    def finalize_due(self, auction_ids: list, until: float | None = None):
+        """
+        Finalizes the given queued auctions now, `concurrency` listings at a
+        time, writing results every WRITE_BATCH_SIZE auctions. No listing is
+        started once the clock passes `until` (run()'s, which watch_handler
+        already sets FINALIZE_DEADLINE_MARGIN_SEC short of the Lambda's end);
+        those go back on the queue unchanged, and failures with the back-off.
+        """
+        now = self.clock.now()
+        # Copies, so group_by_listing's "_duplicates" do not stick to the queued rows.
+        groups = group_by_listing([dict(self.rows[a]) for a in auction_ids])
+        writes = WriteBuffer()
+        finished = []  # (lead, outcome, err) whose writes may still be buffered
+        unwritten = set()
+
+        def attempt(i, auction):
+            try:
+                return finalize_auction(auction, f"[⏰ {i}/{len(groups)}]", writes, self.cache, now=now,
+                                        archive=self.archive)
+            except Exception as e:
+                return "failed", str(e)[:200]
+
+        def settle():
+            # Every finished group's writes were buffered before it finished,
+            # so this flush (or an earlier one) has written them.
+            unwritten.update(auction_id for _, auction_id, _ in writes.flush())
+            done_at = self.clock.now()
+            for lead, outcome, err in finished:
+                if err:
+                    self.errors.append(err)
+                for row in (lead, *lead.get("_duplicates", ())):
+                    auction_id = row["auction_id"]
+                    if outcome in ("success", "no_sale") and auction_id not in unwritten:
+                        self.stats[outcome] += 1
+                        self.latencies.append(done_at - _epoch(row["timestamp_end"]))
+                        del self.rows[auction_id]
+                        continue
+                    queued = self.rows[auction_id]
+                    if outcome == "waiting":
+                        # The page cache knows of failures the row does not.
+                        entry = self.cache.get(queued["url"]) if self.cache and queued.get("url") else None
+                        self.timers.schedule(auction_id, max(self.due_at(queued, entry), done_at + 60))
+                        continue
+                    self.stats["failed"] += 1
+                    queued["finalize_attempts"] = int(queued.get("finalize_attempts") or 0) + 1
+                    queued["last_finalize_attempt"] = done_at
+                    self.timers.schedule(auction_id, self.due_at(queued))
+            finished.clear()
+
+        queue = iter(enumerate(groups, 1))
+        in_flight = {}
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            while True:
+                while len(in_flight) < self.concurrency and (until is None or self.clock.now() < until):
+                    nxt = next(queue, None)
+                    if nxt is None:
+                        break
+                    in_flight[pool.submit(attempt, *nxt)] = nxt[1]
+                if not in_flight:
+                    break
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    finished.append((in_flight.pop(fut), *fut.result()))
+                if len(writes) >= writes.batch_size or (until is not None and self.clock.now() >= until):
+                    settle()
+        settle()
+
+        for _, lead in queue:
+            self.counts["deferred"] += 1 + len(lead.get("_duplicates", ()))
+            for row in (lead, *lead.get("_duplicates", ())):
+                self.timers.schedule(row["auction_id"], self.due_at(self.rows[row["auction_id"]]))
+
+    def run(self, until: float | None = None) -> dict:
+        """Runs until the clock reaches `until` (epoch seconds), or forever. Returns summary()."""
+        RUN_COUNTERS.reset()
+        STAGE_METRICS.reset()
+        while True:
+            now = self.clock.now()
+            if until is not None and now >= until:
+                self.publish_metrics()
+                return self.summary()
+            if self.next_refresh is None or now >= self.next_refresh:
+                self.refresh()
+                continue
+            due = self.timers.pop_due(now)
+            if due:
+                self.counts["wakeups"] += 1
+                self.finalize_due(due, until)
+                continue
+            wake = min(t for t in (self.timers.next_due(), self.next_refresh, until) if t is not None)
+            self.clock.sleep(max(0.0, wake - now))
+
+    def summary(self) -> dict:
+        ordered = sorted(self.latencies)
+        latency = {
+            "p50_min": round(_percentile(ordered, 0.50) / 60, 1) if ordered else None,
+            "p95_min": round(_percentile(ordered, 0.95) / 60, 1) if ordered else None,
+            "max_min": round(ordered[-1] / 60, 1) if ordered else None,
+        }
+        return {**self.stats, **self.counts, "queued": len(self.timers), "latency": latency,
+                "counters": dict(sorted(self.counters.items())), "errors": self.errors[:10]}
+
+
+# -------- LAMBDA HANDLER --------
+def lambda_handler(event, context):
+    print("=" * 60)
+    print("🚀 BaT Auction Finalizer v2.0 - Multi-Currency Support")
+    print(f"🕐 Time: {datetime.utcnow().isoformat()}")
+    print("=" * 60)
+
+    run_started = time.monotonic()
+    deadline = run_deadline(context)
+    connections_before = connection_counters()
+    RUN_COUNTERS.reset()
+    STAGE_METRICS.reset()
+
+    if not SUPABASE_URL or not SUPABASE_KEY:
+        print("❌ Missing SUPABASE_URL or SUPABASE_KEY")
+        return {"statusCode": 500, "body": json.dumps({"error": "Missing env vars"})}
+
+    auctions = AuctionQueue()
+    if not auctions.first_page:
+        print("📭 No auctions to process")
+        return {"statusCode": 200, "body": json.dumps({"message": "No auctions", "processed": 0})}
+
+    cache = open_page_cache()
+    if cache:
+        cache.prune()
+    scheduled, plan = schedule_queue(auctions, cache, deadline=deadline)
+    listings = group_by_listing(scheduled)
+    if len(listings) < len(scheduled):
+        print(f"🔗 {len(scheduled)} rows point at {len(listings)} distinct listings")
+    harvest_until = time.monotonic() + max(0.0, deadline - time.monotonic()) * RESULTS_INDEX_TIME_SHARE
+    index = harvest_results(listings, until=harvest_until) if HARVEST_RESULTS and listings else None
+    print(f"⚙️ Concurrency: {FINALIZE_CONCURRENCY} · budget: {deadline - time.monotonic():.0f}s")
+    stats, errors, deferred = run_fetch_engine(listings, deadline, FINALIZE_CONCURRENCY, cache, index,
+                                               open_html_archive())
 
     # Summary
     total = sum(stats.values())
     success_rate = round(stats["success"] / total * 100, 1) if total else 0
+    elapsed = time.monotonic() - run_started
+    throughput = {
+        "elapsed_sec": round(elapsed, 2),
+        "auctions_per_sec": round(total / elapsed, 3) if elapsed else 0,
+        "concurrency": FINALIZE_CONCURRENCY,
+        "deferred": deferred,
+    }
+    http = connection_report(connections_before)
+    counters, stages = publish_run_metrics()
+    parse_paths = {
+        "region": counters.get("parse_region", 0),
+        "region_empty": counters.get("parse_region_empty", 0),
+        "no_region": counters.get("parse_no_region", 0),
+    }
+    rechecks = {
+        "waiting": counters.get("rechecks_waiting", 0),
+        "not_modified": counters.get("not_modified", 0),
+    }
+    harvest = {
+        "pages": counters.get("index_pages", 0),
+        "items": counters.get("index_items", 0),
+        "results": counters.get("index_results", 0),
+        "hits": counters.get("index_hits", 0),
+    }
+    dedupe = {
+        "rows": len(scheduled),
+        "listings": len(listings),
+        "fetches_saved": counters.get("fetches_saved", 0),
+    }
+    schedule = backlog_eta(plan, total, deferred)
+    pages = sum(counters.get(f"pages_{how}", 0) for how in ("early", "complete", "capped"))
+    bandwidth = {
+        "bytes": counters.get("bytes_downloaded", 0),
+        "bytes_per_page": counters.get("bytes_downloaded", 0) // pages if pages else 0,
+        "stopped_early": counters.get("pages_early", 0),
+        "complete": counters.get("pages_complete", 0),
+        "capped": counters.get("pages_capped", 0),
+    }
 
     print("\n" + "=" * 60)
     print("📊 SUMMARY")
@@ -376,6 +2363,26 @@ def lambda_handler(event, context):
     print(f"   ⚠️  Reserve not met:  {stats['no_sale']}")
     print(f"   ❌ Failed:            {stats['failed']}")
     print(f"   📈 Success rate:      {success_rate}%")
+    print(f"   ⏱️  Throughput:        {throughput['auctions_per_sec']}/s over {throughput['elapsed_sec']}s")
+    if schedule["deferred"]:
+        eta = f"~{schedule['eta_hours']}h ({schedule['runs_to_drain']} runs)" if schedule["eta_hours"] is not None else "unknown"
+        print(f"   ⏭️  Deferred:          {schedule['deferred']} to next run · backlog ETA {eta}")
+    for name, c in http.items():
+        print(f"   🔌 {name}: {c['requests']} requests, {c['new_connections']} new connections, {c['reused']} reused")
+    if index is not None:
+        print(f"   📇 Results index:     {harvest['hits']} resolved from {harvest['pages']} pages "
+              f"({harvest['items']} items, {harvest['results']} results read)")
+    if dedupe["rows"] > dedupe["listings"]:
+        print(f"   🔗 Shared listings:   {dedupe['rows']} rows → {dedupe['listings']} listings, "
+              f"{dedupe['fetches_saved']} fetches saved")
+    print(f"   🔎 Parse paths:       {parse_paths['region']} result block, "
+          f"{parse_paths['region_empty']} empty block, {parse_paths['no_region']} full page")
+    print(f"   📦 Downloaded:        {bandwidth['bytes'] / 1024:,.0f} KB "
+          f"({bandwidth['stopped_early']} pages stopped early, {bandwidth['capped']} capped)")
+    print(f"   ♻️  Re-checks:         {rechecks['waiting']} waiting on back-off, {rechecks['not_modified']} not modified")
+    for stage, m in stages.items():
+        print(f"   ⏱️  {stage:<17} n={m['count']:<5} p50 {m['p50_ms']:>8.1f} ms · p95 {m['p95_ms']:>8.1f} ms "
+              f"· total {m['total_ms'] / 1000:>7.1f}s")
 
     if errors[:5]:
         print("\n🔍 Sample errors:")
@@ -390,13 +2397,68 @@ def lambda_handler(event, context):
             "processed": total,
             "stats": stats,
             "success_rate": success_rate,
+            "throughput": throughput,
+            "http": http,
+            "parse_paths": parse_paths,
+            "harvest": harvest,
+            "dedupe": dedupe,
+            "bandwidth": bandwidth,
+            "rechecks": rechecks,
+            "schedule": schedule,
+            "stages": {
+                stage: {k: m[k] for k in ("count", "p50_ms", "p95_ms", "max_ms", "total_ms", "bytes")}
+                for stage, m in stages.items()
+            },
             "errors": errors[:10],
         }),
     }
 
 
+def watch_handler(event, context):
+    """
+    Event-driven counterpart to lambda_handler for a long invocation (or a
+    container via --watch): runs an EventFinalizer until the deadline.
+    """
+    print("=" * 60)
+    print("⏰ BaT Auction Finalizer - event mode")
+    print(f"🕐 Time: {datetime.utcnow().isoformat()}")
+    print("=" * 60)
+
+    if not SUPABASE_URL or not SUPABASE_KEY:
+        print("❌ Missing SUPABASE_URL or SUPABASE_KEY")
+        return {"statusCode": 500, "body": json.dumps({"error": "Missing env vars"})}
+
+    clock = SystemClock()
+    until = clock.now() + (run_deadline(context) - time.monotonic())
+    summary = EventFinalizer(clock, open_page_cache(), archive=open_html_archive()).run(until)
+    print(f"📊 {summary['success']} sold, {summary['no_sale']} reserve not met, {summary['failed']} failed attempts · "
+          f"{summary['queued']} still queued · latency p50 {summary['latency']['p50_min']} min")
+    return {"statusCode": 200, "body": json.dumps(summary)}
+
+
 # Local testing
 if __name__ == "__main__":
+    # python bat_scraper_finalize.py --watch
+    if sys.argv[1:2] == ["--watch"]:
+        EventFinalizer(cache=open_page_cache(), archive=open_html_archive()).run()
+
+    # python bat_scraper_finalize.py --reextract [corrections.sql] (HTML_ARCHIVE_DIR set)
+    if sys.argv[1:2] == ["--reextract"]:
+        archive = open_html_archive()
+        if archive is None:
+            sys.exit("❌ Set HTML_ARCHIVE_DIR or HTML_ARCHIVE_S3_BUCKET")
+        started = time.monotonic()
+        report = reextract_archive(archive)
+        out = sys.argv[2] if len(sys.argv) > 2 else "corrections.sql"
+        rows = write_corrections(report["changed"], out)
+        print(f"🔁 Re-extracted {report['checked']} archived listings in {time.monotonic() - started:.1f}s: "
+              f"{report['unchanged']} unchanged, {len(report['changed'])} changed, "
+              f"{len(report['lost'])} no longer parse, {len(report['unreadable'])} unreadable")
+        for record in report["lost"][:10]:
+            print(f"   ⚠️ {record['url']}: was {record['result']}, now {record['new']}")
+        print(f"💾 {rows} row corrections written to {out}")
+        sys.exit(0)
+
     # Test the parser with various formats
     test_cases = [
         '<span>Sold for <strong>USD $28,055</strong></span>',
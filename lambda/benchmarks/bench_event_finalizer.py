@@ -0,0 +1,210 @@
+"""
+Simulation and validation: the event-driven finalizer (EventFinalizer)
+over a simulated day and a bit, on a fake clock, against the local
+listing server and mock PostgREST (local_servers.py).
+
+    python lambda/benchmarks/bench_event_finalizer.py [--auctions N] [--hours H] [--late F]
+
+Auctions end spread over the simulated period. A listing shows a live page
+until a few minutes after it ends, or, for a --late share of them, for
+90 minutes, so their first attempts fail and are retried. Part-way through,
+new auctions are inserted and some end times are pushed back, as BaT
+extensions do; the finalizer must pick both up on a refresh.
+
+Finalization latency (end to write) is compared with the cron mode: a run
+every FINALIZE_RUN_INTERVAL_MIN that only takes auctions ended 2 hours
+before. Every auction must end up with the result its page really shows
+(fixtures.expected_results; pages without one are not checked), and no listing may be requested before its final end time plus
+EVENT_SETTLE_MINUTES; anything else makes the script exit non-zero.
+"""
+import argparse
+import bisect
+import contextlib
+import io
+import math
+import os
+import random
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+
+from fixtures import expected_results, load_fixtures  # noqa: E402
+from local_servers import ListingServer, PostgrestServer, start  # noqa: E402
+
+
+class FakeClock:
+    """
+    now() and sleep() for EventFinalizer, in simulated epoch seconds.
+    sleep() returns at once, after running any at() callbacks that fall due
+    on the way, each at its own time.
+    """
+
+    def __init__(self, start: float):
+        self.t = start
+        self.events = []  # sorted (when, seq, fn)
+        self.slept = 0.0
+
+    def now(self) -> float:
+        return self.t
+
+    def sleep(self, seconds: float):
+        target = self.t + seconds
+        self.slept += seconds
+        while self.events and self.events[0][0] <= target:
+            when, _, fn = self.events.pop(0)
+            self.t = max(self.t, when)
+            fn()
+        self.t = target
+
+    def at(self, when: float, fn):
+        bisect.insort(self.events, (when, len(self.events), fn))
+
+
+def percentile(values: list, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", default=os.path.join(HERE, "fixtures"),
+                        help="directory of saved BaT listing pages (*.html / *.html.gz)")
+    parser.add_argument("--comments", type=int, default=200, help="comments per synthetic page")
+    parser.add_argument("--auctions", type=int, default=300, help="auctions in the table at the start")
+    parser.add_argument("--new", type=int, default=40, help="auctions inserted part-way through")
+    parser.add_argument("--extended", type=int, default=15, help="end times pushed back part-way through")
+    parser.add_argument("--hours", type=float, default=24, help="simulated hours over which auctions end")
+    parser.add_argument("--late", type=float, default=0.1, help="share of listings that show a result 90 min late")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--verbose", action="store_true", help="show the finalizer's own log")
+    args = parser.parse_args()
+
+    fixtures = load_fixtures(args.fixtures, comments=args.comments)
+    pages = list(fixtures.values())
+    truth = expected_results(fixtures, args.fixtures)
+    expected = [truth.get(name) for name in fixtures]
+    rng = random.Random(0)
+    t0 = float(int(time.time()))
+    clock = FakeClock(t0)
+    horizon = args.hours * 3600
+
+    live_until = {}
+    listings = start(ListingServer(pages, 0.0, 0.0, {}, 0, clock=clock.now, live_until=live_until))
+    rows = []
+
+    def add_auction(end: float):
+        n = len(rows)
+        rows.append({
+            "auction_id": f"event-{n:05d}",
+            "url": listings.url(n),
+            "title": f"Event listing {n}",
+            "timestamp_end": int(end),
+            "final_price": None,
+            "reserve_not_met": False,
+            "current_bid": None,
+            "finalize_attempts": 0,
+            "last_finalize_attempt": None,
+        })
+        live_until[n] = end + (90 * 60 if rng.random() < args.late else rng.uniform(30, 300))
+        return rows[-1]
+
+    for _ in range(args.auctions):
+        add_auction(t0 + rng.uniform(-3600, horizon))
+    db = start(PostgrestServer(rows, set(), 0.0, clock=clock.now))
+
+    def insert_new():
+        with db.lock:
+            for _ in range(args.new):
+                row = add_auction(clock.now() + rng.uniform(3600, horizon * 0.75))
+                db.rows[row["auction_id"]] = row
+
+    moved = {}
+
+    def extend():
+        later = [r for r in rows if r["timestamp_end"] > clock.now() + 2 * 3600]
+        with db.lock:
+            for row in rng.sample(later, min(args.extended, len(later))):
+                moved[row["auction_id"]] = row["timestamp_end"]
+                row["timestamp_end"] += 30 * 60
+                n = int(row["auction_id"].rsplit("-", 1)[1])
+                live_until[n] += 30 * 60
+
+    clock.at(t0 + horizon * 0.125, extend)
+    clock.at(t0 + horizon * 0.25, insert_new)
+
+    os.environ.update({
+        "SUPABASE_URL": f"http://127.0.0.1:{db.server_port}",
+        "SUPABASE_KEY": "bench",
+        "BAT_RATE_PER_SEC": "1000",
+        "BAT_BURST": str(max(1, args.concurrency)),
+        "HARVEST_RESULTS": "0",
+    })
+    import bat_scraper_finalize as finalizer
+
+    settle = finalizer.EVENT_SETTLE_MINUTES * 60
+    until = t0 + horizon + 12 * 3600
+    started = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(sys.stdout if args.verbose else io.StringIO()):
+            events = finalizer.EventFinalizer(clock, cache=None, concurrency=args.concurrency)
+            summary = events.run(until)
+    finally:
+        listings.shutdown()
+        db.shutdown()
+    wall = time.perf_counter() - started
+
+    # Cron mode on the same end times: runs on the hour, each taking what ended 2h before.
+    interval = finalizer.FINALIZE_RUN_INTERVAL_MIN * 60
+    cron_latency = []
+    for n, row in enumerate(rows):
+        tick = math.ceil(max(row["timestamp_end"] + 2 * 3600, live_until[n]) / interval) * interval
+        cron_latency.append(tick - row["timestamp_end"])
+    cron_runs = int((until - t0) // interval)
+
+    latency = [r["finalized_at"] - r["timestamp_end"] for r in rows if r.get("finalized_at")]
+    print(f"{len(rows)} auctions ({args.new} added, {len(moved)} extended mid-run) over "
+          f"{(until - t0) / 3600:.0f} simulated hours, {wall:.1f}s wall")
+    print(f"{'outcomes':<24} sold {summary['success']}, reserve not met {summary['no_sale']}, "
+          f"failed attempts {summary['failed']}, still queued {summary['queued']}")
+    print(f"{'timer wake-ups':<24} {summary['wakeups']:>6}  ({summary['refreshes']} refreshes, "
+          f"{summary['added']} added, {summary['moved']} moved, {summary['dropped']} dropped)")
+    print(f"{'DB round trips':<24} {sum(db.stats.requests.values()):>6}  {dict(sorted(db.stats.requests.items()))}")
+    print(f"{'cron equivalent':<24} {cron_runs:>6}  runs, each at least one queue read")
+    print(f"{'latency (min)':<24} {'p50':>6} {'p95':>8} {'max':>8}")
+    for name, values in (("event mode", latency), ("cron + 2h buffer", cron_latency)):
+        if values:
+            print(f"  {name:<22} {percentile(values, 0.5) / 60:>6.1f} {percentile(values, 0.95) / 60:>8.1f} "
+                  f"{max(values) / 60:>8.1f}")
+
+    mismatches = []
+    for n, row in enumerate(rows):
+        if expected[n % len(expected)] is None:
+            continue
+        price, status, _ = expected[n % len(expected)]
+        if status == "sold":
+            want = {"final_price": price, "reserve_not_met": False}
+        elif status == "no_sale":
+            want = {"final_price": None, "reserve_not_met": True}
+        else:
+            continue
+        got = {k: row[k] for k in want}
+        if got != want:
+            mismatches.append(f"{row['auction_id']}: got {got}, expected {want}")
+        # Already eligible at the start: fetched on the first pass.
+        due = max(row["timestamp_end"] + settle, t0)
+        first = min(listings.requested_at.get(n, [float("inf")]))
+        if first < due:
+            mismatches.append(f"{row['auction_id']}: requested {(due - first) / 60:.1f} min early")
+        elif first > due + 1:
+            mismatches.append(f"{row['auction_id']}: first requested {first - due:.0f}s after it was due")
+    if mismatches:
+        for m in mismatches[:10]:
+            print(f"   MISMATCH {m}")
+        sys.exit(1)
+    print("outputs identical")
+
+
+if __name__ == "__main__":
+    main()
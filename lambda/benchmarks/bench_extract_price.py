@@ -0,0 +1,72 @@
+"""
+Micro-benchmark: per-page CPU time of extract_price_from_html, before
+(legacy_extract.py) and after the single-pass extractor.
+
+    python lambda/benchmarks/bench_extract_price.py [--fixtures DIR] [--repeat N]
+
+Every page must produce the same (price, status, currency) from both
+extractors; a mismatch is reported and makes the script exit non-zero.
+The "block" column times extract_result, which parses the listing's result
+block first; its result may legitimately differ (that is the point of it),
+so it is shown but not compared.
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bat_scraper_finalize import extract_price_from_html, extract_result  # noqa: E402
+from fixtures import load_fixtures  # noqa: E402
+from legacy_extract import legacy_extract_price_from_html  # noqa: E402
+
+
+def cpu_time(fn, html: str, repeat: int):
+    """(result, mean CPU seconds per call)."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = fn(html)
+        start = time.process_time()
+        for _ in range(repeat):
+            fn(html)
+        elapsed = time.process_time() - start
+    return result, elapsed / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", default=os.path.join(os.path.dirname(__file__), "fixtures"),
+                        help="directory of saved BaT listing pages (*.html / *.html.gz)")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--comments", type=int, default=2000, help="comments per synthetic page")
+    args = parser.parse_args()
+
+    pages = load_fixtures(args.fixtures, comments=args.comments)
+    print(f"{'page':<32} {'KB':>7} {'before ms':>10} {'after ms':>10} {'speedup':>8} {'block ms':>9}  result")
+    total_before = total_after = total_block = 0.0
+    mismatches = 0
+    for name, html in pages.items():
+        old, before = cpu_time(legacy_extract_price_from_html, html, args.repeat)
+        new, after = cpu_time(extract_price_from_html, html, args.repeat)
+        _, block = cpu_time(extract_result, html, args.repeat)
+        total_before += before
+        total_after += after
+        total_block += block
+        flag = "" if old == new else f"  MISMATCH (before {old})"
+        mismatches += old != new
+        print(f"{name[:32]:<32} {len(html) / 1024:>7.0f} {before * 1000:>10.2f} {after * 1000:>10.2f} "
+              f"{before / after if after else float('inf'):>7.1f}x {block * 1000:>9.2f}  {new}{flag}")
+
+    n = len(pages)
+    print(f"\nmean per page: before {total_before / n * 1000:.2f} ms, after {total_after / n * 1000:.2f} ms "
+          f"({total_before / total_after if total_after else float('inf'):.1f}x), "
+          f"result block first {total_block / n * 1000:.2f} ms")
+    if mismatches:
+        print(f"{mismatches} page(s) changed result")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""
+End-to-end benchmark and validation: one lambda_handler run against local
+stand-ins for bringatrailer.com and Supabase, so fetch, parse and write
+regressions show up in numbers without touching either.
+
+    python lambda/benchmarks/bench_finalizer.py [--auctions N] [--concurrency N]
+        [--latency S] [--bandwidth MB/s] [--error-rate F] [--fixtures DIR]
+
+Two local HTTP servers (local_servers.py) are started before the finalizer
+is imported:
+
+  * a listing replay server serving the fixtures (saved pages, or synthetic
+    ones with --comments comments each) at /listing/<n>/, after --latency
+    seconds and at --bandwidth MB/s, with ETag/If-None-Match support. A
+    --error-rate share of listings answers 403 or 404 on every request, and
+    as many again answer 429 (with Retry-After) once before succeeding.
+    /results/?page=<n> is a completed-auction results index, --per-page
+    items a page, newest first, with each listing's result block as its
+    sold_text (--no-harvest turns the finalizer's use of it off).
+    A --duplicates share of extra auction rows point at listings already in
+    the table, through URL variants (no trailing slash, a query string).
+  * a mock PostgREST holding the auctions table: keyset-paginated queue
+    reads with an exact count, the league lookups, and the
+    finalize_auctions_batch / bump_finalize_attempts RPCs, after --db-latency
+    seconds per round trip.
+
+The report has auctions/sec, the handler's per-stage latencies, bytes sent
+by both servers and DB round trips per endpoint. Afterwards every auction
+whose page was served must hold the result that page really shows
+(fixtures.expected_results, not the parser: price for sold,
+reserve_not_met for no sale) and every other one must have had its
+attempt count bumped; anything else makes the script exit non-zero.
+Auctions on saved pages with no expected result are not checked.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+
+from fixtures import expected_results, load_fixtures  # noqa: E402
+from local_servers import ListingServer, PostgrestServer, start  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", default=os.path.join(HERE, "fixtures"),
+                        help="directory of saved BaT listing pages (*.html / *.html.gz)")
+    parser.add_argument("--comments", type=int, default=2000, help="comments per synthetic page")
+    parser.add_argument("--auctions", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.05, help="listing server seconds before headers")
+    parser.add_argument("--bandwidth", type=float, default=5, help="listing server MB/s per response (0 = unlimited)")
+    parser.add_argument("--db-latency", type=float, default=0.02, help="PostgREST seconds per round trip")
+    parser.add_argument("--error-rate", type=float, default=0.05,
+                        help="share of listings answering 403/404 (and as many 429 once)")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds on a 429")
+    parser.add_argument("--per-page", type=int, default=60, help="results index items per page")
+    parser.add_argument("--no-harvest", action="store_true", help="fetch every listing (HARVEST_RESULTS=0)")
+    parser.add_argument("--duplicates", type=float, default=0.2,
+                        help="extra rows, as a share of --auctions, pointing at an existing listing")
+    parser.add_argument("--rate", type=float, default=1000, help="BAT_RATE_PER_SEC for the run")
+    parser.add_argument("--verbose", action="store_true", help="show the handler's own log")
+    args = parser.parse_args()
+
+    fixtures = load_fixtures(args.fixtures, comments=args.comments)
+    pages = list(fixtures.values())
+    truth = expected_results(fixtures, args.fixtures)
+    expected = [truth.get(name) for name in fixtures]
+    rng = random.Random(0)
+    faults = {}
+    for n in range(args.auctions):
+        roll = rng.random()
+        if roll < args.error_rate:
+            faults[n] = rng.choice((403, 404))
+        elif roll < 2 * args.error_rate:
+            faults[n] = 429
+
+    listings = start(ListingServer(pages, args.latency, args.bandwidth * 1e6, faults, args.retry_after,
+                                   args.per_page))
+    now = int(time.time())
+    # listing_of[i] is the listing behind rows[i]; the duplicates come last.
+    listing_of = list(range(args.auctions))
+    listing_of += [rng.randrange(args.auctions) for _ in range(int(args.auctions * args.duplicates))]
+    rows = []
+    for i, n in enumerate(listing_of):
+        url = listings.url(n)
+        if i >= args.auctions:
+            url = url.rstrip("/") if i % 2 else f"{url}?league=dup"
+        rows.append({
+            "auction_id": f"bench-{i:05d}",
+            "url": url,
+            "title": f"Benchmark listing {n}",
+            "timestamp_end": now - 3 * 3600 - n * 60,
+            "final_price": None,
+            "reserve_not_met": False,
+            "current_bid": None,
+            "finalize_attempts": 0,
+            "last_finalize_attempt": None,
+        })
+    league = {r["auction_id"] for r in rows[::7]}
+    db = start(PostgrestServer(rows, league, args.db_latency))
+
+    cache_dir = tempfile.mkdtemp(prefix="bat_bench_cache_")
+    os.environ.update({
+        "SUPABASE_URL": f"http://127.0.0.1:{db.server_port}",
+        "SUPABASE_KEY": "bench",
+        "PAGE_CACHE_DIR": cache_dir,
+        "PAGE_CACHE_S3_BUCKET": "",
+        "FINALIZE_CONCURRENCY": str(args.concurrency),
+        "BAT_RATE_PER_SEC": str(args.rate),
+        "BAT_BURST": str(max(1, args.concurrency)),
+        "METRICS_EMF": "0",
+        "HARVEST_RESULTS": "0" if args.no_harvest else "1",
+        "RESULTS_INDEX_URL": f"http://127.0.0.1:{listings.server_port}/results/?page={{page}}",
+    })
+    import bat_scraper_finalize as finalizer
+
+    regions = [finalizer.find_result_region(p) for p in pages]
+    blocks = [p[r[0]:r[1]] if r else "" for p, r in zip(pages, regions)]
+    listings.index_items = [{"url": r["url"], "title": r["title"], "timestamp_end": r["timestamp_end"],
+                             "sold_text": blocks[n % len(blocks)]} for n, r in enumerate(rows[:args.auctions])]
+
+    try:
+        log = io.StringIO()
+        with contextlib.redirect_stdout(sys.stdout if args.verbose else log):
+            out = finalizer.lambda_handler({}, None)
+    finally:
+        listings.shutdown()
+        db.shutdown()
+        shutil.rmtree(cache_dir, ignore_errors=True)
+    if out["statusCode"] != 200:
+        print(log.getvalue()[-2000:])
+        sys.exit(1)
+    body = json.loads(out["body"])
+
+    served = sum(listings.stats.requests.values())
+    print(f"{len(rows)} auction rows over {args.auctions} listings, {len(pages)} distinct pages ({sum(map(len, listings.pages)) / len(pages) / 1024:.0f} KB avg), "
+          f"concurrency {args.concurrency}, {args.latency * 1000:.0f} ms + {args.bandwidth:g} MB/s per page, "
+          f"{args.db_latency * 1000:.0f} ms per DB round trip")
+    print(f"{'auctions/sec':<24} {body['throughput']['auctions_per_sec']:>10.2f}  "
+          f"({body['processed']} in {body['throughput']['elapsed_sec']}s, {body['throughput']['deferred']} deferred)")
+    print(f"{'outcomes':<24} {body['stats']}")
+    print(f"{'listing requests':<24} {served:>10}  {dict(sorted(listings.stats.requests.items()))}")
+    print(f"{'listing bytes sent':<24} {listings.stats.bytes_sent / 1024:>10,.0f} KB  "
+          f"(handler read {body['bandwidth']['bytes'] / 1024:,.0f} KB, {body['bandwidth']['stopped_early']} pages stopped early)")
+    if "harvest" in body and not args.no_harvest:
+        h = body["harvest"]
+        print(f"{'results index':<24} {h['hits']:>10}  resolved from {h['pages']} pages "
+              f"({body['dedupe']['listings'] - h['hits']} listings left to fetch)")
+    d = body["dedupe"]
+    print(f"{'shared listings':<24} {d['fetches_saved']:>10}  fetches saved ({d['rows']} rows, {d['listings']} listings)")
+    print(f"{'DB round trips':<24} {sum(db.stats.requests.values()):>10}  {dict(sorted(db.stats.requests.items()))}")
+    print(f"{'DB bytes sent':<24} {db.stats.bytes_sent / 1024:>10,.1f} KB")
+    for name, c in body["http"].items():
+        print(f"{name + ' connections':<24} {c['new_connections']:>10}  ({c['reused']} reused)")
+    print(f"{'stage':<18} {'n':>6} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9} {'total s':>8} {'KB':>9}")
+    for stage, m in body["stages"].items():
+        print(f"{stage:<18} {m['count']:>6} {m['p50_ms']:>9.1f} {m['p95_ms']:>9.1f} {m['max_ms']:>9.1f} "
+              f"{m['total_ms'] / 1000:>8.2f} {m['bytes'] / 1024:>9,.0f}")
+
+    mismatches = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        # What the results index resolves on its own, whatever the listing page would answer.
+        indexed = [not args.no_harvest and finalizer.extract_price_from_html(b)[1] is not None for b in blocks]
+    unchecked = 0
+    for n, row in zip(listing_of, rows):
+        if expected[n % len(expected)] is None:
+            unchecked += 1
+            continue
+        price, status, _ = expected[n % len(expected)]
+        blocked = faults.get(n) in (403, 404) and not indexed[n % len(indexed)]
+        if blocked or not status or (status == "sold" and not price):
+            want = {"final_price": None, "reserve_not_met": False, "finalize_attempts": 1}
+        elif status == "sold":
+            want = {"final_price": price, "reserve_not_met": False, "finalize_attempts": 0}
+        else:
+            want = {"final_price": None, "reserve_not_met": True, "finalize_attempts": 0}
+        got = {k: row[k] for k in want}
+        if got != want:
+            mismatches.append(f"{row['auction_id']}: got {got}, expected {want}")
+    if body["throughput"]["deferred"]:
+        mismatches.append(f"{body['throughput']['deferred']} auctions deferred")
+    if unchecked:
+        print(f"{unchecked} auction rows not checked (no expected result for their page)")
+    if mismatches:
+        for m in mismatches[:10]:
+            print(f"   MISMATCH {m}")
+        sys.exit(1)
+    print("outputs identical")
+
+
+if __name__ == "__main__":
+    main()
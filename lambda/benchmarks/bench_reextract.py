@@ -0,0 +1,100 @@
+"""
+Benchmark and validation: --reextract (reextract_archive + write_corrections)
+over an HTML archive, in this process vs on a process pool.
+
+    python lambda/benchmarks/bench_reextract.py [--listings N] [--comments N] [--workers 1,2,4]
+
+Archives `listings` distinct synthetic listing pages with HtmlArchive, each
+recorded with the result the old whole-page parser (legacy_extract.py)
+gives it, as rows finalized before the result-block parser would carry.
+Re-extraction then finds the pages the current extract_result reads
+differently. Every pool size must produce the same report as the
+in-process run, and each correction must match extract_result run on the
+page directly; anything else makes the script exit non-zero. Speedup is
+bounded by the cores this process may use, printed first.
+"""
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+
+from bat_scraper_finalize import HtmlArchive, extract_result, reextract_archive, write_corrections  # noqa: E402
+from fixtures import RESULT_BANNERS, synthetic_listing  # noqa: E402
+from legacy_extract import legacy_extract_price_from_html  # noqa: E402
+
+
+def directory_bytes(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(path) for f in files)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--listings", type=int, default=3000)
+    parser.add_argument("--comments", type=int, default=400, help="comments per synthetic page")
+    parser.add_argument("--workers", default="1,2,4", help="comma-separated pool sizes")
+    args = parser.parse_args()
+
+    work = tempfile.mkdtemp(prefix="bat_archive_")
+    try:
+        archive = HtmlArchive(os.path.join(work, "archive"))
+        raw = 0
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for i in range(args.listings):
+                html = synthetic_listing(RESULT_BANNERS[i % len(RESULT_BANNERS)], comments=args.comments,
+                                         seed=i, wrapped_tiles=bool(i // len(RESULT_BANNERS) % 2))
+                raw += len(html.encode("utf-8"))
+                archive.put(f"https://bringatrailer.com/listing/bench-{i}/", [f"bench-{i}", f"bench-{i}-league"],
+                            html, legacy_extract_price_from_html(html))
+        t_archive = time.perf_counter() - start
+        stored = directory_bytes(archive.directory)
+        cores = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+        print(f"{args.listings:,} listings archived in {t_archive:.1f}s: {raw / 1e6:,.1f} MB of HTML "
+              f"stored as {stored / 1e6:,.1f} MB ({raw / stored:.1f}x), {cores} usable core(s)")
+
+        start = time.perf_counter()
+        expected = reextract_archive(archive, workers=1)
+        t_single = time.perf_counter() - start
+        print(f"{'in process':<12} {t_single:7.2f}s  {args.listings / t_single:8,.0f} pages/s  "
+              f"{expected['unchanged']} unchanged, {len(expected['changed'])} changed, "
+              f"{len(expected['lost'])} lost, {len(expected['unreadable'])} unreadable")
+
+        ok = True
+        for workers in (int(w) for w in args.workers.split(",")):
+            if workers == 1:
+                continue
+            start = time.perf_counter()
+            report = reextract_archive(archive, workers=workers)
+            t = time.perf_counter() - start
+            same = report == expected
+            ok &= same
+            print(f"{f'{workers} workers':<12} {t:7.2f}s  {args.listings / t:8,.0f} pages/s  "
+                  f"{t_single / t:5.2f}x  {'' if same else 'MISMATCH'}")
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            for record in expected["changed"] + expected["lost"]:
+                direct = list(extract_result(archive.page(record["sha256"])))
+                if direct != record["new"]:
+                    print(f"   MISMATCH {record['url']}: {record['new']} vs {direct}", file=sys.stderr)
+                    ok = False
+        out = os.path.join(work, "corrections.sql")
+        rows = write_corrections(expected["changed"], out)
+        ok &= rows == sum(len(r["auction_ids"]) for r in expected["changed"])
+        print(f"corrections.sql: {rows} rows, {os.path.getsize(out) / 1024:,.0f} KB")
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+    if not ok:
+        sys.exit(1)
+    print("outputs identical")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+BaT listing pages for the finalizer benchmarks.
+
+load_fixtures() reads saved listing pages (*.html, or *.html.gz) from a
+directory — save real pages there with e.g.
+    curl -s https://bringatrailer.com/listing/<slug>/ > fixtures/<slug>.html
+When there are none it falls back to synthetic_listing() pages, which copy
+the parts of a BaT listing the parser cares about: the result banner near
+the top, a long comment thread full of bid chatter, and related-listing
+tiles with other auctions' "Sold for" lines below it.
+
+expected_results() gives the result each page really shows, as a check
+that does not go through the parser under test: BANNER_RESULTS for the
+synthetic pages, and for saved ones an expected.json in the same directory
+({"<file name>": [price, "sold" | "no_sale" | null, currency]}).
+"""
+import gzip
+import json
+import os
+import random
+
+RESULT_BANNERS = [
+    'Sold for <strong>USD $28,055</strong> <span class="date">on 7/5/25</span>',
+    'Bid to <strong>USD $41,500</strong> <span class="date">on 7/5/25</span>',
+    'Sold for <strong>EUR €120.000,00</strong> <span class="date">on 6/30/25</span>',
+    'Bid to <strong>EUR €7,000</strong> <span class="date">on 7/5/26</span>',
+    'Sold for <strong>GBP £45,000</strong> <span class="date">on 5/2/25</span>',
+    "Bid to <strong>CHF 89'000</strong> <span class=\"date\">on 4/1/25</span>",
+    "",  # live/withdrawn page: no result banner at all
+]
+
+# What each RESULT_BANNERS entry says, as (price, status, currency).
+BANNER_RESULTS = [
+    (28055, "sold", "USD"),
+    (41500, "no_sale", "USD"),
+    (120000, "sold", "EUR"),
+    (7000, "no_sale", "EUR"),
+    (45000, "sold", "GBP"),
+    (89000, "no_sale", "CHF"),
+    (None, None, None),
+]
+
+_WORDS = (
+    "clean example with service records the paint looks great and the interior "
+    "is original seller responses have been helpful good luck to the bidders "
+    "this one should do well reserve seems high for the mileage congrats"
+).split()
+
+
+def synthetic_listing(banner: str, comments: int = 400, related: int = 12, seed: int = 0,
+                      wrapped_tiles: bool = False) -> str:
+    """
+    A BaT-shaped listing page; ~150 bytes per comment. `wrapped_tiles` puts
+    the related listings' amounts in <strong> tags, so their "Sold for"
+    lines only match on tag-stripped text.
+    """
+    rng = random.Random(seed)
+    parts = [
+        "<!DOCTYPE html><html><head><title>1991 Porsche 964 for sale on BaT Auctions</title>",
+        '<meta property="og:description" content="This 1991 Porsche 964 Carrera 4 is finished in black.">',
+        "</head><body>",
+        '<div class="site-header"><a href="/join">Join BaT Insider for $10/month</a></div>',
+        '<div class="listing-available-info"><span class="info-label">Auction result</span>',
+        f'<span class="info-value noborder-tiny">{banner}</span></div>',
+        '<div class="post-excerpt">',
+    ]
+    for _ in range(20):
+        parts.append("<p>" + " ".join(rng.choice(_WORDS) for _ in range(40)) + "</p>")
+    parts.append('</div><div class="listing-stats"><span>12,345 views</span> <span>678 watchers</span></div>')
+    parts.append('<div id="comments-javascript-enabled">')
+    for i in range(comments):
+        if i % 5 == 0:
+            body = f"<strong>USD ${rng.randint(5, 90) * 1000:,}</strong> bid placed by user{i}"
+        else:
+            body = " ".join(rng.choice(_WORDS) for _ in range(14))
+        parts.append(f'<div class="comment"><span class="user">user{i}</span><p>{body}</p></div>')
+    parts.append('</div><div class="related-listings">')
+    for i in range(related):
+        amount = f"${rng.randint(10, 200) * 1000:,}"
+        if wrapped_tiles:
+            amount = f"<strong>{amount}</strong>"
+        parts.append(
+            f'<div class="tile"><h3>Related listing {i}</h3>'
+            f"<span>Sold for {amount} on 3/{i + 1}/25</span></div>"
+        )
+    parts.append("</div></body></html>")
+    return "\n".join(parts)
+
+
+def load_fixtures(directory: str | None = None, comments: int = 400) -> dict:
+    """{name: html} from `directory`, or synthetic pages when it has none."""
+    pages = {}
+    if directory and os.path.isdir(directory):
+        for name in sorted(os.listdir(directory)):
+            path = os.path.join(directory, name)
+            if name.endswith(".html.gz"):
+                with gzip.open(path, "rt", encoding="utf-8", errors="replace") as f:
+                    pages[name] = f.read()
+            elif name.endswith(".html"):
+                with open(path, encoding="utf-8", errors="replace") as f:
+                    pages[name] = f.read()
+    if not pages:
+        for i, banner in enumerate(RESULT_BANNERS):
+            for wrapped in (False, True):
+                name = f"synthetic-{i}{'-wrapped' if wrapped else ''}"
+                pages[name] = synthetic_listing(banner, comments=comments, seed=i, wrapped_tiles=wrapped)
+    return pages
+
+
+def expected_results(pages: dict, directory: str | None = None) -> dict:
+    """
+    {name: (price, status, currency)} for the pages of load_fixtures() whose
+    real result is known; saved pages missing from expected.json are left out.
+    """
+    known = {}
+    path = os.path.join(directory, "expected.json") if directory else None
+    if path and os.path.exists(path):
+        with open(path) as f:
+            known = {name: tuple(result) for name, result in json.load(f).items()}
+    out = {}
+    for name in pages:
+        if name in known:
+            out[name] = known[name]
+        elif name.startswith("synthetic-"):
+            out[name] = BANNER_RESULTS[int(name.split("-")[1])]
+    return out
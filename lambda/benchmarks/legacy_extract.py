@@ -0,0 +1,133 @@
+"""
+Reference copy of extract_price_from_html as it was before the single-pass
+extractor (one re.search per pattern, per pass). Kept only so the
+benchmarks can time the old path and check the new one returns the same
+result on every page. Not imported by the Lambda.
+"""
+import re
+
+
+def legacy_extract_price_from_html(html_content: str):
+    """
+    Extracts a closing price from a BaT listing HTML.
+    Supports multiple currencies and formats.
+
+    Returns:
+        (price:int|None, status:str, currency:str|None)
+        status: "sold", "no_sale", or None
+
+    NOTE: We deliberately do NOT auto-detect "withdrawn" anymore. The previous
+    regex was matching loose words like "removed" / "cancelled" / "ended early"
+    in unrelated copy (comments, related-listing blurbs) and converting valid
+    reserve-not-met auctions into final_price=0 withdrawns. Withdrawals are
+    rare; an admin can mark them manually from the Finalize tab.
+    """
+
+    # Smallest believable car price/high bid. Anything below this is almost
+    # certainly a stray match against unrelated page text (e.g. a "$10/month"
+    # membership promo), so we reject it.
+    MIN_PLAUSIBLE_PRICE = 100
+
+    def clean_price(price_str, currency):
+        if currency == "EUR" and "." in price_str and "," in price_str:
+            price_str = price_str.replace(".", "").replace(",", ".")  # 120.000,00 -> 120000
+        elif currency == "CHF" and "'" in price_str:
+            price_str = price_str.replace("'", "")                    # 120'000 -> 120000
+        else:
+            price_str = price_str.replace(",", "")                    # 120,000 -> 120000
+        if "." in price_str:
+            price_str = price_str.split(".")[0]
+        try:
+            price = int(price_str)
+        except ValueError:
+            return None
+        return price if price >= MIN_PLAUSIBLE_PRICE else None
+
+    # SOLD signals only. NOTE: "Bid to X" is NOT a sale — it's BaT's label for
+    # reserve-not-met, so it lives in high_bid_patterns below.
+    sale_patterns = [
+        (r"Sold\s+for\s+(?:USD\s+)?\$\s*([\d,]+)", "USD"),
+        (r"Winning\s+bid\s+(?:of\s+)?(?:USD\s+)?\$\s*([\d,]+)", "USD"),
+        (r"Sold\s+for\s+EUR\s*€?\s*([\d,\.]+)", "EUR"),
+        (r"Winning\s+bid\s+(?:of\s+)?EUR\s*€?\s*([\d,\.]+)", "EUR"),
+        (r"Sold\s+for\s+GBP\s*£?\s*([\d,]+)", "GBP"),
+        (r"Winning\s+bid\s+(?:of\s+)?GBP\s*£?\s*([\d,]+)", "GBP"),
+        (r"Sold\s+for\s+CAD\s*\$?\s*([\d,]+)", "CAD"),
+        (r"Sold\s+for\s+AUD\s*\$?\s*([\d,]+)", "AUD"),
+        (r"Sold\s+for\s+CHF\s*([\d,\']+)", "CHF"),
+        (r"Sold\s+for\s+€\s*([\d,\.]+)", "EUR"),
+        (r"Sold\s+for\s+£\s*([\d,]+)", "GBP"),
+    ]
+
+    # RESERVE-NOT-MET (no sale). "Bid to X" = high bid, reserve not met.
+    high_bid_patterns = [
+        (r"Bid\s+to\s+(?:USD\s+)?\$\s*([\d,]+)", "USD"),
+        (r"Bid\s+to\s+EUR\s*€?\s*([\d,\.]+)", "EUR"),
+        (r"Bid\s+to\s+GBP\s*£?\s*([\d,]+)", "GBP"),
+        (r"Bid\s+to\s+CAD\s*\$?\s*([\d,]+)", "CAD"),
+        (r"Bid\s+to\s+AUD\s*\$?\s*([\d,]+)", "AUD"),
+        (r"Bid\s+to\s+CHF\s*([\d,\']+)", "CHF"),
+        (r"Bid\s+to\s+€\s*([\d,\.]+)", "EUR"),
+        (r"Bid\s+to\s+£\s*([\d,]+)", "GBP"),
+        (r"High\s+Bid\s+(?:USD\s+)?\$\s*([\d,]+)", "USD"),
+        (r"High\s+Bid\s+EUR\s*€?\s*([\d,\.]+)", "EUR"),
+        (r"High\s+Bid\s+GBP\s*£?\s*([\d,]+)", "GBP"),
+        # Bounded gap keeps this anchored to the bid next to the label rather
+        # than leaping across the page to an unrelated amount (e.g. a "$10").
+        (r"Reserve\s+Not\s+Met[^$]{0,40}\$\s*([\d,]+)", "USD"),
+    ]
+
+    def match_text(text):
+        for pattern, currency in sale_patterns:
+            m = re.search(pattern, text, re.IGNORECASE)
+            if m:
+                price = clean_price(m.group(1), currency)
+                if price:
+                    print(f"   💰 Found: {currency} {price:,} (sold)")
+                    return price, "sold", currency
+        for pattern, currency in high_bid_patterns:
+            m = re.search(pattern, text, re.IGNORECASE)
+            if m:
+                price = clean_price(m.group(1), currency)
+                if price:
+                    print(f"   ⚠️ Found: {currency} {price:,} (reserve not met)")
+                    return price, "no_sale", currency
+        return None
+
+    # Pass 1: raw HTML text.
+    result = match_text(html_content)
+    if result:
+        return result
+
+    # Pass 2: strip tags and retry. This must run BEFORE the bare <strong>
+    # fallback: BaT wraps the result amount in a tag ("Bid to <strong>EUR
+    # €7,000</strong>"), so only the stripped text reveals whether the amount
+    # is a sale price or a reserve-not-met high bid.
+    stripped = re.sub(r"\s{2,}", " ", re.sub(r"<[^>]+>", " ", html_content))
+    result = match_text(stripped)
+    if result:
+        return result
+
+    # Pass 3: bare <strong>-wrapped amount. Ambiguous on its own — the same
+    # markup carries both sale prices and high bids — so check the text right
+    # before the tag and only report "sold" when nothing marks it as a bid.
+    strong_patterns = [
+        (r"<strong>\s*(?:USD\s+)?\$\s*([\d,]+)\s*</strong>", "USD"),
+        (r"<strong>\s*EUR\s*€?\s*([\d,\.]+)\s*</strong>", "EUR"),
+        (r"<strong>\s*GBP\s*£?\s*([\d,]+)\s*</strong>", "GBP"),
+    ]
+    for pattern, currency in strong_patterns:
+        m = re.search(pattern, html_content, re.IGNORECASE)
+        if m:
+            price = clean_price(m.group(1), currency)
+            if not price:
+                continue
+            context = re.sub(r"<[^>]+>", " ", html_content[max(0, m.start() - 300):m.start()])
+            context = re.sub(r"\s{2,}", " ", context)[-80:]
+            if re.search(r"(?:bid\s+to|high\s+bid|current\s+bid|reserve\s+not\s+met)[\s:]*$", context, re.IGNORECASE):
+                print(f"   ⚠️ Found: {currency} {price:,} (reserve not met, via <strong>)")
+                return price, "no_sale", currency
+            print(f"   💰 Found: {currency} {price:,} (sold, via <strong>)")
+            return price, "sold", currency
+
+    return None, None, None
@@ -0,0 +1,239 @@
+"""
+Local stand-ins for the two upstreams the finalizer talks to, for the
+finalizer benchmarks:
+
+  ListingServer    replays BaT listing pages at /listing/<n>/ (latency,
+                   bandwidth, ETags, 403/404/429 injection) and serves a
+                   completed-auction results index at /results/?page=<n>
+  PostgrestServer  the auctions table behind PostgREST: the finalize queue
+                   (keyset pages, exact count), the league lookups and the
+                   finalize_auctions_batch / bump_finalize_attempts RPCs
+
+Both count requests and bytes sent in `stats`. `clock` (anything with a
+now() returning epoch seconds, time.time by default) dates the attempt
+bumps and writes, and decides when a listing in `live_until` stops
+showing a live page and starts showing its result.
+"""
+import hashlib
+import json
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+# What a listing shows before it ends: no result anywhere on the page.
+LIVE_PAGE = (b'<!DOCTYPE html><html><head><title>Live auction</title></head><body>'
+             b'<div class="listing-available-info"><span class="info-value noborder-tiny">'
+             b'Auction ends soon</span></div></body></html>')
+
+_KEYSET_RE = re.compile(r'timestamp_end\.lt\.(\d+),and\(timestamp_end\.eq\.\d+,auction_id\.lt\."((?:[^"\\]|\\.)*)"\)')
+
+
+class Stats:
+    """Thread-safe request and byte counters for one stand-in server."""
+
+    def __init__(self):
+        self.requests = Counter()
+        self.bytes_sent = 0
+        self.lock = threading.Lock()
+
+    def record(self, name: str, nbytes: int = 0):
+        with self.lock:
+            self.requests[name] += 1
+            self.bytes_sent += nbytes
+
+
+class QuietHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so connection reuse is measured
+
+    def log_message(self, *args):
+        pass
+
+    def send_body(self, code: int, body: bytes, headers: dict | None = None, chunk: int = 16384,
+                  bandwidth: float = 0.0) -> int:
+        """Sends the response; returns the body bytes written before the client hung up."""
+        self.send_response(code)
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        sent = 0
+        try:
+            for i in range(0, len(body), chunk):
+                part = body[i:i + chunk]
+                if bandwidth:
+                    time.sleep(len(part) / bandwidth)
+                self.wfile.write(part)
+                sent += len(part)
+        except ConnectionError:
+            self.close_connection = True
+        return sent
+
+
+class QuietServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # The finalizer drops connections it has stopped reading from.
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+# -------- LISTING REPLAY SERVER --------
+class ListingServer(QuietServer):
+    """Listing <n> is pages[n % len(pages)]; `faults` maps listing numbers to 403, 404 or 429."""
+
+    def __init__(self, pages: list, latency: float, bandwidth: float, faults: dict, retry_after: int,
+                 per_page: int = 60, clock=time.time, live_until: dict | None = None):
+        super().__init__(("127.0.0.1", 0), ListingHandler)
+        self.pages = [p.encode("utf-8") for p in pages]
+        self.etags = [f'"{hashlib.sha1(p).hexdigest()[:16]}"' for p in self.pages]
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.faults = faults
+        self.retry_after = retry_after
+        self.per_page = per_page
+        self.index_items = []  # newest first
+        self.clock = clock
+        self.live_until = live_until if live_until is not None else {}
+        self.requested_at = {}  # listing number -> clock time of every request for it
+        self.hits = Counter()
+        self.stats = Stats()
+
+    def url(self, n: int) -> str:
+        return f"http://127.0.0.1:{self.server_port}/listing/{n}/"
+
+
+class ListingHandler(QuietHandler):
+    def do_GET(self):
+        srv = self.server
+        time.sleep(srv.latency)
+        url = urlsplit(self.path)
+        if url.path.rstrip("/") == "/results":
+            page = int(parse_qs(url.query).get("page", ["1"])[0])
+            items = srv.index_items[(page - 1) * srv.per_page:page * srv.per_page]
+            body = json.dumps({"items": items, "page_current": page}).encode()
+            srv.stats.record("index", self.send_body(200, body, {"Content-Type": "application/json"}))
+            return
+        parts = url.path.strip("/").split("/")
+        if len(parts) != 2 or parts[0] != "listing" or not parts[1].isdigit():
+            srv.stats.record("404")
+            return self.send_body(404, b"not found")
+        n = int(parts[1])
+        with srv.stats.lock:
+            srv.hits[n] += 1
+            first = srv.hits[n] == 1
+            srv.requested_at.setdefault(n, []).append(srv.clock())
+        fault = srv.faults.get(n)
+        if fault in (403, 404) or (fault == 429 and first):
+            srv.stats.record(str(fault))
+            headers = {"Retry-After": str(srv.retry_after)} if fault == 429 else {}
+            return self.send_body(fault, b"<html>blocked</html>", headers)
+
+        if srv.clock() < srv.live_until.get(n, 0):
+            srv.stats.record("live", self.send_body(200, LIVE_PAGE, {"Content-Type": "text/html; charset=utf-8"}))
+            return
+        page = n % len(srv.pages)
+        if self.headers.get("If-None-Match") == srv.etags[page]:
+            srv.stats.record("304")
+            return self.send_body(304, b"", {"ETag": srv.etags[page]})
+        sent = self.send_body(200, srv.pages[page], {"Content-Type": "text/html; charset=utf-8",
+                                                     "ETag": srv.etags[page]}, bandwidth=srv.bandwidth)
+        srv.stats.record("200", sent)
+
+
+# -------- MOCK POSTGREST --------
+class PostgrestServer(QuietServer):
+
+    """
+    `rows` are full auction rows, keyed here by auction_id; writes land in
+    them (with "finalized_at" from `clock`), so they can be checked after a
+    run. Auctions in `league_ids` are found in garage_cars.
+    """
+
+    def __init__(self, rows: list, league_ids: set, latency: float, clock=time.time):
+        super().__init__(("127.0.0.1", 0), PostgrestHandler)
+        self.rows = {r["auction_id"]: r for r in rows}
+        self.league_ids = league_ids
+        self.latency = latency
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.stats = Stats()
+
+
+class PostgrestHandler(QuietHandler):
+    def reply(self, name: str, obj, headers: dict | None = None, code: int = 200):
+        body = json.dumps(obj).encode()
+        self.server.stats.record(name, len(body))
+        self.send_body(code, body, {"Content-Type": "application/json", **(headers or {})})
+
+    def do_GET(self):
+        srv = self.server
+        time.sleep(srv.latency)
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        params = {k: v[-1] for k, v in query.items()}
+        table = url.path.rsplit("/", 1)[-1]
+
+        if table == "auctions":
+            ends = query["timestamp_end"]
+            before = min(int(f[3:]) for f in ends if f.startswith("lt."))
+            after = max((int(f[4:]) for f in ends if f.startswith("gte.")), default=float("-inf"))
+            with srv.lock:
+                queue = [dict(r) for r in srv.rows.values()
+                         if r["final_price"] is None and not r["reserve_not_met"] and after <= r["timestamp_end"] < before]
+            queue.sort(key=lambda r: (r["timestamp_end"], r["auction_id"]), reverse=True)
+            total = len(queue)
+            keyset = _KEYSET_RE.search(params.get("or", ""))
+            if keyset:
+                after = (int(keyset.group(1)), keyset.group(2).replace('\\"', '"').replace("\\\\", "\\"))
+                queue = [r for r in queue if (r["timestamp_end"], r["auction_id"]) < after]
+            columns = params["select"].split(",")
+            page = [{c: r[c] for c in columns} for r in queue[:int(params["limit"])]]
+            headers = {"Content-Range": f"0-{len(page) - 1}/{total if 'count=exact' in (self.headers.get('Prefer') or '') else '*'}"}
+            return self.reply("GET auctions", page, headers)
+
+        column = next((c for c in params if c != "select"), None)
+        if column is None:
+            return self.reply(f"GET {table}", [], code=400)
+        wanted = re.findall(r'"((?:[^"\\]|\\.)*)"', params[column])
+        hits = [{column: a} for a in wanted if table == "garage_cars" and a in srv.league_ids]
+        return self.reply(f"GET {table}", hits)
+
+    def do_POST(self):
+        srv = self.server
+        time.sleep(srv.latency)
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        name = self.path.rsplit("/", 1)[-1]
+
+        if name == "finalize_auctions_batch":
+            out = []
+            with srv.lock:
+                for row in body["p_rows"]:
+                    target = srv.rows.get(row["auction_id"])
+                    if target is not None:
+                        for k, v in row.items():
+                            if k in target and k != "auction_id":
+                                target[k] = v
+                        target["finalized_at"] = srv.clock()
+                    out.append({"auction_id": row["auction_id"], "updated": target is not None})
+            return self.reply(f"RPC {name}", out)
+
+        if name == "bump_finalize_attempts":
+            with srv.lock:
+                for aid in body.get("p_ids") or []:
+                    if aid in srv.rows:
+                        srv.rows[aid]["finalize_attempts"] += 1
+                        srv.rows[aid]["last_finalize_attempt"] = srv.clock()
+            return self.reply(f"RPC {name}", None)
+
+        return self.reply(f"POST {name}", {"message": "unknown rpc"}, code=404)
+
+
+def start(server):
+    """Serves `server` on a daemon thread and returns it."""
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,47 @@
+-- Bulk result writes for the BaT finalizer Lambda.
+--
+-- lambda/bat_scraper_finalize.py used to PATCH one row per finalized auction:
+-- a sold price or a reserve-not-met flag, each its own PostgREST round trip.
+-- A 100-auction run paid up to 100 extra requests for what is one UPDATE.
+--
+-- finalize_auctions_batch takes every result of a run (or of a flush, the
+-- Lambda sends WRITE_BATCH_SIZE rows at a time) as a JSON array and applies
+-- them in one statement. NULL fields leave the stored value untouched, so a
+-- sold row only sets final_price and a reserve-not-met row only sets
+-- reserve_not_met (and current_bid when the high bid was found) — the same
+-- columns the per-row PATCHes wrote.
+--
+-- One row comes back per input row with updated = false when no auction
+-- matched, so the Lambda can still count each failure in stats["failed"].
+--
+-- Until this has been run the Lambda falls back to the per-row PATCHes.
+--
+-- Safe to re-run.
+
+CREATE OR REPLACE FUNCTION public.finalize_auctions_batch(p_rows JSONB)
+RETURNS TABLE (auction_id TEXT, updated BOOLEAN)
+LANGUAGE sql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  WITH input AS (
+    SELECT r.auction_id, r.final_price, r.reserve_not_met, r.current_bid
+      FROM jsonb_to_recordset(p_rows)
+        AS r(auction_id TEXT, final_price BIGINT, reserve_not_met BOOLEAN, current_bid BIGINT)
+  ),
+  changed AS (
+    UPDATE auctions a
+       SET final_price     = COALESCE(i.final_price, a.final_price),
+           reserve_not_met = COALESCE(i.reserve_not_met, a.reserve_not_met),
+           current_bid     = COALESCE(i.current_bid, a.current_bid)
+      FROM input i
+     WHERE a.auction_id = i.auction_id
+    RETURNING a.auction_id
+  )
+  SELECT i.auction_id, (c.auction_id IS NOT NULL) AS updated
+    FROM input i
+    LEFT JOIN changed c ON c.auction_id = i.auction_id;
+$$;
+
+REVOKE ALL ON FUNCTION public.finalize_auctions_batch(JSONB) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.finalize_auctions_batch(JSONB) TO service_role;
@@ -10,11 +10,18 @@
 # - Optional EMA smoothing and S3 upload
 # ---------------------------------------------------------------
 
+import io
 import os
 import re
+import sys
+import shutil
+import json
+import time
+import hashlib
 import datetime
 import pandas as pd
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 # Optional S3 support
 try:
@@ -24,6 +31,13 @@ try:
 except Exception:
     HAS_BOTO = False
 
+# Optional Parquet support (pyarrow)
+try:
+    import pyarrow  # noqa: F401
+    HAS_PARQUET = True
+except Exception:
+    HAS_PARQUET = False
+
 # --------------------------- CONFIG ----------------------------
 WINSOR_LO = 0.025
 WINSOR_HI = 0.975
@@ -35,11 +49,88 @@ MIN_SUPPORT_PER_QUARTER = 3        # if you track per-variant auction counts
 BASE_FLOOR_FOR_PCT = 8.0           # avoid huge % from tiny base
 SMALL_BASE_CAP = 200.0             # cap % change when base < 12 (tune as needed)
 
+# Makes stripped from the front of model names (longest first)
+COMMON_MAKES = ['Mercedes-Benz', 'Mercedes', 'BMW', 'Porsche', 'Audi', 'Ferrari',
+                'Lamborghini', 'McLaren', 'Chevrolet', 'Chevy', 'Ford', 'Dodge', 'Tesla',
+                'Toyota', 'Honda', 'Nissan', 'Lexus', 'Acura', 'Infiniti', 'Jaguar',
+                'Land Rover', 'Range Rover', 'Alfa Romeo', 'Maserati', 'Bentley',
+                'Rolls-Royce', 'Aston Martin', 'Lotus', 'Bugatti']
+
+# Date columns tried in order when assigning a quarter
+DATE_FIELDS = ['scraped_date', 'sale_date', 'end_date']
+
+# Variant splitting rules (see VariantRules): model_family patterns and
+# (make prefix, family, year range) -> generation. Read from this JSON file
+# when it exists, else DEFAULT_VARIANT_RULES.
+VARIANT_RULES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mii_variant_rules.json")
+DEFAULT_VARIANT_RULES = {
+    'families': [   # first match wins: upper-cased model contains -> family
+        {'contains': 'SL63', 'family': 'SL63'},
+        {'contains': 'C63', 'family': 'C63'},
+        {'contains': 'E63', 'family': 'E63'},
+        {'contains': 'AMG GT', 'family': 'AMG GT'},
+    ],
+    'generations': [   # years inclusive, null = open-ended
+        {'make': 'Mercedes', 'family': 'SL63', 'from': 2012, 'to': 2019, 'generation': 'R231'},
+        {'make': 'Mercedes', 'family': 'SL63', 'from': 2022, 'to': None, 'generation': 'R232'},
+    ],
+    'other': 'GEN_OTHER',      # year known, no rule matched
+    'unknown': 'GEN_UNKNOWN',  # no year
+}
+
+# Incremental scoring (opt-in): per-quarter scores are kept in this directory
+# and only quarters whose inputs changed are rescored. None rescores every
+# quarter each run; `--incremental [DIR]` turns it on (DIR default "mii_quarters")
+QUARTER_STORE_DIR = None
+SCORING_VERSION = 1                # bump when score_quarters' logic changes
+
+# Per-quarter scoring on a process pool when > 1 (quarters are independent)
+SCORING_WORKERS = 1
+
+# Columnar storage: each source is read from <name>.parquet when it exists
+# (<name>.csv otherwise), projected to RAW_COLUMNS; results are written as
+# Parquet when pyarrow is installed. convert_csv_to_parquet migrates old CSVs.
+SOURCES = {'BAT': 'bat', 'CNB': 'cnb'}
+RAW_COLUMNS = ['make', 'model', 'title', 'year', 'views', 'bids', 'comments', 'sale_amount'] + DATE_FIELDS
+RAW_DTYPES = {'make': 'category', 'model': str, 'title': str, 'sale_amount': str,
+              **{f: str for f in DATE_FIELDS}}   # counts and year keep CSV inference (text or numbers)
+RAW_CATEGORIES = ['make', 'data_source']
+RESULT_CATEGORIES = ['make', 'quarter', 'cohort']
+
+# S3 reads: objects are streamed into the parser (no temp files), Parquet
+# through ranged GETs so only the footer and the projected columns are
+# fetched; sources (and the parts of a partitioned source) load concurrently
+S3_READ_WORKERS = 8
+S3_RANGE_BLOCK = 1 << 20           # bytes per ranged GET (read-ahead)
+
+# Out-of-core mode: raw auctions are cleaned and reduced to per-group
+# partial aggregates CHUNK_ROWS at a time (None loads everything at once)
+CHUNK_ROWS = None
+
+# Compaction of the cleaned frame: strings with at most this share of
+# distinct values become categoricals; these columns get the narrowest int
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+COMPACT_INT_COLUMNS = ['views_numeric', 'bids_numeric', 'comments_numeric', 'year', 'car_age']
+
+# Normalized model names by title, reused across runs when persisted to this
+# file (opt-in). None keeps them for the run only; `--model-cache [FILE]`
+# turns it on (FILE default "mii_model_cache.json")
+MODEL_CACHE_FILE = None
+
 # Output
 OUTPUT_PREFIX = "mii_results"
 S3_BUCKET = "my-mii-reports"       # change or disable S3 upload below
 
 # ------------------------- UTILITIES ---------------------------
+def peak_rss_mb():
+    """Peak resident set size of this process so far, in MB (None where unavailable)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
 def upload_to_s3(file_name, bucket, object_name=None):
     if not HAS_BOTO:
         print("⚠️  boto3 not installed; skipping S3 upload.")
@@ -67,12 +158,7 @@ def extract_proper_model(model_text, make_text=None):
     # Strip leading year
     model_str = re.sub(r'^\d{4}\s+', '', model_str)
 
-    common_makes = ['Mercedes-Benz', 'Mercedes', 'BMW', 'Porsche', 'Audi', 'Ferrari',
-                    'Lamborghini', 'McLaren', 'Chevrolet', 'Chevy', 'Ford', 'Dodge', 'Tesla',
-                    'Toyota', 'Honda', 'Nissan', 'Lexus', 'Acura', 'Infiniti', 'Jaguar',
-                    'Land Rover', 'Range Rover', 'Alfa Romeo', 'Maserati', 'Bentley',
-                    'Rolls-Royce', 'Aston Martin', 'Lotus', 'Bugatti']
-    common_makes.sort(key=len, reverse=True)
+    common_makes = sorted(COMMON_MAKES, key=len, reverse=True)
     for mk in common_makes:
         pattern = rf'^{re.escape(mk)}[\s-]+'
         model_str = re.sub(pattern, '', model_str, flags=re.IGNORECASE)
@@ -189,48 +275,214 @@ def get_instagram_estimates(all_keys):
     return out
 
 # --------------------- LOADING / CLEANING ----------------------
-def load_scraped_data():
-    """Try to load combined auction data from S3 (bat.csv, cnb.csv) with local fallbacks."""
-    all_data = []
-    if HAS_BOTO:
-        s3 = boto3.client('s3')
-    # Bring a Trailer
-    try:
-        if HAS_BOTO:
-            s3.download_file(S3_BUCKET, 'bat.csv', 'temp_bat.csv')
-            df_bat = pd.read_csv('temp_bat.csv')
-            os.remove('temp_bat.csv')
-        else:
-            df_bat = pd.read_csv('bat.csv')
-        df_bat['data_source'] = 'BAT'
-        if 'model' not in df_bat.columns and 'title' in df_bat.columns:
-            df_bat['model'] = df_bat['title']
-        all_data.append(df_bat)
-        print(f"✅ Loaded {len(df_bat)} BAT records")
-    except Exception as e:
-        print(f"⚠️ Could not load BAT: {e}")
+def read_auctions(source, fmt):
+    """
+    One source's auctions (a path or file object) in RAW_COLUMNS only;
+    fmt is 'parquet' or 'csv'. Text columns stay text and make is a
+    categorical, whichever format it came from.
+    """
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+        present = set(pq.read_schema(source).names)
+        if hasattr(source, 'seek'):
+            source.seek(0)
+        df = pd.read_parquet(source, columns=[c for c in RAW_COLUMNS if c in present])
+        cats = [c for c in RAW_CATEGORIES if c in df.columns and not isinstance(df[c].dtype, pd.CategoricalDtype)]
+        return df.astype({c: 'category' for c in cats})
+    return pd.read_csv(source, usecols=lambda c: c in RAW_COLUMNS, dtype=RAW_DTYPES)
+
+def convert_csv_to_parquet(csv_path, parquet_path=None):
+    """
+    One-time migration of a scrape CSV to Parquet next to it (bat.csv ->
+    bat.parquet). Every column is kept, not just RAW_COLUMNS, with
+    RAW_DTYPES applied. Returns the Parquet path.
+    """
+    if not HAS_PARQUET:
+        raise RuntimeError("pyarrow is required to write Parquet")
+    parquet_path = parquet_path or os.path.splitext(csv_path)[0] + '.parquet'
+    df = pd.read_csv(csv_path, dtype=RAW_DTYPES, low_memory=False)
+    df.to_parquet(parquet_path, index=False)
+    print(f"🗜️  {csv_path} -> {parquet_path}: {len(df):,} rows, "
+          f"{os.path.getsize(csv_path) / 1e6:.1f} MB -> {os.path.getsize(parquet_path) / 1e6:.1f} MB")
+    return parquet_path
+
+class S3RangeFile(io.RawIOBase):
+    """
+    Read-only, seekable view of an S3 object that fetches byte ranges on
+    demand (GetObject with Range). Reads are rounded up to S3_RANGE_BLOCK
+    and the last block is kept, so pyarrow's footer and column-chunk reads
+    cost one request each.
+    """
+    def __init__(self, s3, bucket, key, block=S3_RANGE_BLOCK):
+        self.s3, self.bucket, self.key, self.block = s3, bucket, key, block
+        self.size = s3.head_object(Bucket=bucket, Key=key)['ContentLength']
+        self.pos = 0
+        self._start, self._buf = 0, b''
+        self.requests = self.bytes_fetched = 0
+
+    def readable(self):
+        return True
 
-    # Cars & Bids
-    try:
-        if HAS_BOTO:
-            s3.download_file(S3_BUCKET, 'cnb.csv', 'temp_cnb.csv')
-            df_cnb = pd.read_csv('temp_cnb.csv')
-            os.remove('temp_cnb.csv')
-        else:
-            df_cnb = pd.read_csv('cnb.csv')
-        df_cnb['data_source'] = 'CNB'
-        all_data.append(df_cnb)
-        print(f"✅ Loaded {len(df_cnb)} CNB records")
-    except Exception as e:
-        print(f"⚠️ Could not load CNB: {e}")
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self.pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        self.pos = {io.SEEK_SET: 0, io.SEEK_CUR: self.pos, io.SEEK_END: self.size}[whence] + offset
+        return self.pos
+
+    def read(self, n=-1):
+        end = self.size if n is None or n < 0 else min(self.pos + n, self.size)
+        if end <= self.pos:
+            return b''
+        if not (self._start <= self.pos and end <= self._start + len(self._buf)):
+            stop = min(max(end, self.pos + self.block), self.size)
+            resp = self.s3.get_object(Bucket=self.bucket, Key=self.key, Range=f"bytes={self.pos}-{stop - 1}")
+            self._start, self._buf = self.pos, resp['Body'].read()
+            self.requests += 1
+            self.bytes_fetched += len(self._buf)
+        data = self._buf[self.pos - self._start:end - self._start]
+        self.pos = end
+        return data
+
+def list_source(name, s3=None):
+    """
+    (fmt, keys) holding a source: <name>.parquet, or the *.parquet parts
+    under <name>/, when pyarrow is installed, else <name>.csv. Keys are S3
+    keys when s3 is given, local paths otherwise.
+    """
+    if s3 is None:
+        sep = os.sep
+        keys = [k for k in (f"{name}.parquet", f"{name}.csv") if os.path.exists(k)]
+        if os.path.isdir(name):
+            keys += [os.path.join(name, f) for f in os.listdir(name)]
+    else:
+        sep, keys, token = '/', [], None
+        while True:
+            page = s3.list_objects_v2(Bucket=S3_BUCKET, Prefix=name,
+                                      **({'ContinuationToken': token} if token else {}))
+            keys += [obj['Key'] for obj in page.get('Contents', [])]
+            if not page.get('IsTruncated'):
+                break
+            token = page['NextContinuationToken']
+
+    if HAS_PARQUET:
+        if f"{name}.parquet" in keys:
+            return 'parquet', [f"{name}.parquet"]
+        parts = sorted(k for k in keys if k.startswith(name + sep) and k.endswith('.parquet'))
+        if parts:
+            return 'parquet', parts
+    if f"{name}.csv" in keys:
+        return 'csv', [f"{name}.csv"]
+    raise FileNotFoundError(f"no {name}.parquet, {name}{sep}*.parquet or {name}.csv")
+
+def read_part(key, fmt, s3=None):
+    """One object of a source: from disk, or streamed from S3 straight into the parser."""
+    if s3 is None:
+        return read_auctions(key, fmt)
+    if fmt == 'parquet':
+        return read_auctions(S3RangeFile(s3, S3_BUCKET, key), fmt)
+    return read_auctions(s3.get_object(Bucket=S3_BUCKET, Key=key)['Body'], fmt)
+
+def load_scraped_data(s3=None):
+    """
+    Combined auction data for SOURCES, from S3 when boto3 is available (or
+    `s3` is given) and local files otherwise. Listing and reads for all
+    sources and parts run concurrently.
+    """
+    if s3 is None and HAS_BOTO:
+        s3 = boto3.client('s3')
+    all_data = []
+    with ThreadPoolExecutor(max_workers=S3_READ_WORKERS) as pool:
+        listings = {source: pool.submit(list_source, name, s3) for source, name in SOURCES.items()}
+        reads = {}
+        for source, listing in listings.items():
+            try:
+                fmt, keys = listing.result()
+                reads[source] = [pool.submit(read_part, key, fmt, s3) for key in keys]
+            except Exception as e:
+                print(f"⚠️ Could not load {source}: {e}")
+        for source, parts in reads.items():
+            try:
+                df = pd.concat([part.result() for part in parts], ignore_index=True, sort=False)
+            except Exception as e:
+                print(f"⚠️ Could not load {source}: {e}")
+                continue
+            df['data_source'] = source
+            if 'model' not in df.columns and 'title' in df.columns:
+                df['model'] = df['title']
+            all_data.append(df)
+            print(f"✅ Loaded {len(df)} {source} records")
 
     if not all_data:
         print("❌ No scraped data found!")
         return pd.DataFrame()
 
-    return pd.concat(all_data, ignore_index=True, sort=False)
-
-def clean_and_process_data(df):
+    df = pd.concat(all_data, ignore_index=True, sort=False)
+    # concat of categoricals with different categories falls back to object
+    cats = [c for c in RAW_CATEGORIES if c in df.columns]
+    return df.astype({c: 'category' for c in cats})
+
+def iter_scraped_chunks(chunk_rows=CHUNK_ROWS, s3=None):
+    """
+    The rows load_scraped_data returns, in the same order, as frames of at
+    most chunk_rows: Parquet record batches or read_csv chunks, one source
+    and part at a time.
+    """
+    if s3 is None and HAS_BOTO:
+        s3 = boto3.client('s3')
+    for source, name in SOURCES.items():
+        try:
+            fmt, keys = list_source(name, s3)
+        except Exception as e:
+            print(f"⚠️ Could not load {source}: {e}")
+            continue
+        for key in keys:
+            if fmt == 'parquet':
+                import pyarrow.parquet as pq
+                pf = pq.ParquetFile(key if s3 is None else S3RangeFile(s3, S3_BUCKET, key))
+                columns = [c for c in RAW_COLUMNS if c in pf.schema_arrow.names]
+                chunks = (b.to_pandas() for b in pf.iter_batches(batch_size=chunk_rows, columns=columns))
+            else:
+                stream = key if s3 is None else s3.get_object(Bucket=S3_BUCKET, Key=key)['Body']
+                chunks = pd.read_csv(stream, usecols=lambda c: c in RAW_COLUMNS, dtype=RAW_DTYPES,
+                                     chunksize=chunk_rows)
+            for df in chunks:
+                df['data_source'] = source
+                if 'model' not in df.columns and 'title' in df.columns:
+                    df['model'] = df['title']
+                cats = [c for c in RAW_CATEGORIES if c in df.columns]
+                yield df.astype({c: 'category' for c in cats})
+
+def write_results(mii, prefix=OUTPUT_PREFIX):
+    """
+    <prefix>_<timestamp> and <prefix>_latest as CSV, which downstream
+    readers of <prefix>_latest.csv rely on, plus the same pair as Parquet
+    (RESULT_CATEGORIES stored as dictionary columns) when pyarrow is
+    installed. Each format is serialized once and its latest file copied
+    from it. Returns the paths written, Parquet first.
+    """
+    ts = datetime.datetime.now().strftime('%Y%m%d_%H%M')
+    paths = []
+    for ext in (['parquet'] if HAS_PARQUET else []) + ['csv']:
+        out, latest = f"{prefix}_{ts}.{ext}", f"{prefix}_latest.{ext}"
+        if ext == 'parquet':
+            cats = {c: 'category' for c in RESULT_CATEGORIES if c in mii.columns}
+            mii.astype(cats).to_parquet(out, index=False)
+        else:
+            mii.to_csv(out, index=False)
+        shutil.copyfile(out, latest)
+        paths += [out, latest]
+    return paths
+
+def clean_and_process_data_rowwise(df):
+    """
+    Reference implementation of clean_and_process_data: the original
+    row-by-row version, kept to validate the vectorized one against
+    (clean_and_process_data(df, engine='rowwise')).
+    """
     df = df.copy()
     # Ensure required columns
     for col in ['model','views','bids','data_source']:
@@ -316,6 +568,442 @@ def clean_and_process_data(df):
     print(f"✅ Cleaned: {len(df)} rows, {df['model'].nunique()} unique models")
     return df
 
+# ------------------- VECTORIZED CLEANING ----------------------
+# The same rules as extract_proper_model, clean_sale_amount, validate_quarter,
+# extract_year_from_row, era_cohort and the variant helpers, applied a column
+# at a time with pandas string methods and precompiled patterns.
+_LEADING_YEAR_RE = re.compile(r'^\d{4}\s+')
+# extract_proper_model strips each make in turn, longest first; a chain of
+# optional groups in that order does the same in one anchored match.
+_MAKE_PREFIX_RE = re.compile(
+    '^' + ''.join(rf'(?:{re.escape(mk)}[\s-]+)?' for mk in sorted(COMMON_MAKES, key=len, reverse=True)),
+    re.IGNORECASE,
+)
+_YEAR_RANGE_SUFFIX_RE = re.compile(r'\s*\(\d{4}-\d{4}\)\s*$')
+_WHITESPACE_RE = re.compile(r'\s+')
+_AMG_PREFIX_RE = re.compile(r'([A-Z]+\d+[A-Z]*)\s*AMG', re.IGNORECASE)
+_AMG_SUFFIX_RE = re.compile(r'AMG\s+([A-Z0-9]+(?:\s+[A-Z0-9]+)?)', re.IGNORECASE)
+_FIRST_INT_RE = re.compile(r'(\d+)')
+_INT_LITERAL_RE = re.compile(r'\s*[+-]?\d+\s*')
+
+def _falsy(s: pd.Series) -> pd.Series:
+    """Elements the scalar helpers reject with `not x or pd.isna(x)`."""
+    obj = s.astype(object)
+    return obj.isna() | (obj == '') | (obj == 0)
+
+def _string_mask(s: pd.Series) -> pd.Series:
+    """True where the element is a str (columns can mix str and numbers)."""
+    kind = pd.api.types.infer_dtype(s, skipna=True)
+    if kind == 'string':
+        return s.notna()
+    if kind in ('mixed', 'mixed-integer'):
+        return s.str.len().notna()
+    return pd.Series(False, index=s.index)
+
+def normalize_models(models: pd.Series) -> pd.Series:
+    """extract_proper_model over a column."""
+    blank = _falsy(models)
+    original = models.astype(object).where(~blank, '').astype(str).str.strip()
+    text = original.str.replace(_LEADING_YEAR_RE, '', regex=True)
+    text = text.str.replace(_MAKE_PREFIX_RE, '', regex=True)
+    text = text.str.replace(_YEAR_RANGE_SUFFIX_RE, '', regex=True)
+    text = text.str.replace(_WHITESPACE_RE, ' ', regex=True).str.strip()
+
+    # A bare "AMG" left over: recover the model from the original text
+    amg = text.str.upper() == 'AMG'
+    if amg.any():
+        prefix = original[amg].str.extract(_AMG_PREFIX_RE, expand=False)
+        suffix = original[amg].str.extract(_AMG_SUFFIX_RE, expand=False)
+        text = text.astype(object)
+        text[amg] = np.where(prefix.notna(), prefix + ' AMG',
+                             np.where(suffix.notna(), 'AMG ' + suffix, None))
+    return text.where(~blank & (text != ''), None).infer_objects()
+
+class ModelNameCache:
+    """
+    title -> [model, model_family] for titles already normalized, optionally
+    persisted as JSON at `path` so later runs skip them too. Entries are
+    discarded when the normalization rules (COMMON_MAKES, the patterns and
+    the family rules) change. Counts hits/misses and the average cost of a miss, which
+    normalize_model_names uses to estimate the time saved.
+    """
+    def __init__(self, path=None):
+        self.path = path
+        self.entries = {}
+        self.sec_per_title = 0.0
+        self.hits = 0
+        self.misses = 0
+        if path and os.path.exists(path):
+            try:
+                with open(path) as f:
+                    data = json.load(f)
+                if data.get('rules') == self.rules_fingerprint():
+                    self.entries = data.get('entries', {})
+                    self.sec_per_title = data.get('sec_per_title', 0.0)
+            except Exception as e:
+                print(f"⚠️  Could not read model cache {path}: {e}")
+
+    @staticmethod
+    def rules_fingerprint():
+        rules = [_LEADING_YEAR_RE, _MAKE_PREFIX_RE, _YEAR_RANGE_SUFFIX_RE, _WHITESPACE_RE,
+                 _AMG_PREFIX_RE, _AMG_SUFFIX_RE]
+        patterns = [r.pattern for r in rules] + [variant_rules().fingerprint('families')]
+        return hashlib.sha1('\n'.join(patterns).encode()).hexdigest()
+
+    def save(self):
+        if not self.path:
+            return
+        try:
+            with open(f"{self.path}.tmp", 'w') as f:
+                json.dump({'rules': self.rules_fingerprint(), 'sec_per_title': self.sec_per_title,
+                           'entries': self.entries}, f)
+            os.replace(f"{self.path}.tmp", self.path)
+        except Exception as e:
+            print(f"⚠️  Could not save model cache {self.path}: {e}")
+
+def normalize_model_names(titles: pd.Series, cache: ModelNameCache | None = None):
+    """
+    normalize_models + model_families, run once per distinct title: titles
+    are deduplicated, looked up in `cache`, the rest normalized together and
+    added to it, and the results mapped back onto the rows.
+
+    Returns (models, families, report) where report has rows, unique, hits,
+    misses, hit_rate and est_saved_sec (rows and titles that did not need
+    normalizing, priced at this run's or the cache's cost per title).
+    """
+    cache = cache if cache is not None else ModelNameCache()
+    codes, uniques = pd.factorize(titles.astype(object).where(~_falsy(titles)))
+    keys = [str(u) for u in uniques]
+
+    missing = [k for k in dict.fromkeys(keys) if k not in cache.entries]
+    if missing:
+        started = time.perf_counter()
+        models = normalize_models(pd.Series(missing, dtype=object))
+        families = model_families(models.fillna(''))
+        for key, model, family in zip(missing, models, families):
+            cache.entries[key] = [model, family] if pd.notna(model) else [None, None]
+        cache.sec_per_title = (time.perf_counter() - started) / len(missing)
+    hits = len(keys) - len(missing)
+    cache.hits += hits
+    cache.misses += len(missing)
+
+    table = np.array([cache.entries[k] for k in keys] + [[None, None]], dtype=object)
+    rows = table[codes]  # code -1 (blank title) picks the trailing [None, None]
+    models = pd.Series(rows[:, 0], index=titles.index, dtype=object).infer_objects()
+    families = pd.Series(rows[:, 1], index=titles.index, dtype=object).infer_objects()
+    report = {
+        'rows': len(titles),
+        'unique': len(keys),
+        'hits': hits,
+        'misses': len(missing),
+        'hit_rate': hits / len(keys) if keys else 0.0,
+        'est_saved_sec': (len(titles) - len(missing)) * cache.sec_per_title,
+    }
+    return models, families, report
+
+def parse_counts(values: pd.Series) -> pd.Series:
+    """
+    extract_num over a column: numbers are truncated, text gives its first
+    run of digits (commas ignored), anything else 0.
+    """
+    if pd.api.types.is_numeric_dtype(values):
+        return values.fillna(0).astype('int64')
+    is_str = _string_mask(values)
+    digits = values.where(is_str).str.replace(',', '', regex=False).str.extract(_FIRST_INT_RE, expand=False)
+    counts = pd.to_numeric(digits, errors='coerce')
+    numbers = pd.to_numeric(values.astype(object).where(~is_str), errors='coerce')
+    return counts.where(is_str, numbers).fillna(0).astype('int64')
+
+def clean_sale_amounts(sales: pd.Series) -> pd.Series:
+    """clean_sale_amount over a column (NaN where it returns None)."""
+    blank = _falsy(sales)
+    text = (sales.astype(object).where(~blank, '').astype(str)
+            .str.replace('$', '', regex=False).str.replace(',', '', regex=False).str.strip())
+    one_dot = text.str.count(r'\.') == 1
+    text = text.where(~one_dot, text.str.split('.', n=1).str[0])
+    amount = pd.to_numeric(text.str.extract(_FIRST_INT_RE, expand=False), errors='coerce')
+
+    # Heuristic for "000" issues in scraped data
+    glitch = (amount > 500000) & (amount % 1000).isin([9, 10, 11, 12])
+    amount = amount.where(~glitch, amount // 100)
+
+    keep = ~blank & amount.between(100, 10_000_000)
+    return amount if keep.all() else amount.where(keep)
+
+def assign_quarters(df: pd.DataFrame) -> pd.Series:
+    """
+    "YYYYQn" from the first of DATE_FIELDS that parses to a date no later than
+    now and passes validate_quarter; the current quarter when none does.
+    All date columns are parsed in one pd.to_datetime call.
+    """
+    now = pd.Timestamp.now()
+    quarters = pd.Series(f"{now.year}Q{((now.month-1)//3)+1}", index=df.index, dtype=object)
+    fields = [f for f in DATE_FIELDS if f in df.columns]
+    if not fields or df.empty:
+        return quarters
+
+    stacked = pd.concat([df[f].astype(object) for f in fields], ignore_index=True)
+    dates = pd.to_datetime(stacked, errors='coerce', format='mixed', utc=True).dt.tz_localize(None)
+    # dt <= now already rules out future quarters; validate_quarter adds the 1990 floor
+    usable = (dates.notna() & (dates <= now) & (dates.dt.year >= 1990)).to_numpy()
+    labels = (dates.dt.year.astype('Int64').astype(str) + 'Q'
+              + dates.dt.quarter.astype('Int64').astype(str)).to_numpy(dtype=object)
+
+    n = len(df)
+    out = quarters.to_numpy(dtype=object, copy=True)
+    for i in reversed(range(len(fields))):  # earlier fields overwrite later ones
+        take = usable[i * n:(i + 1) * n]
+        out[take] = labels[i * n:(i + 1) * n][take]
+    return pd.Series(out, index=df.index)
+
+def extract_years(df: pd.DataFrame) -> pd.Series:
+    """
+    extract_year_from_row over a frame. Its title fallback is skipped:
+    re.findall returns the captured century ("19"/"20"), which is never a
+    valid year, so it cannot change the result.
+    """
+    hi = datetime.datetime.now().year + 2
+    if 'year' not in df.columns:
+        return pd.Series(np.nan, index=df.index)
+    raw = df['year']
+    if pd.api.types.is_numeric_dtype(raw) and not pd.api.types.is_bool_dtype(raw):
+        years = np.trunc(raw.astype(float))
+    else:
+        is_str = _string_mask(raw)
+        int_text = raw.where(is_str).str.fullmatch(_INT_LITERAL_RE).fillna(False).astype(bool)
+        from_text = pd.to_numeric(raw.where(int_text).str.strip(), errors='coerce')
+        numeric = pd.to_numeric(raw.astype(object).where(~is_str), errors='coerce').astype(float)
+        years = from_text.where(is_str, np.trunc(numeric))
+    years = years.where(years.between(1900, hi))
+    return years.astype('int64') if years.notna().all() and len(years) else years
+
+def era_cohorts(years: pd.Series) -> pd.Series:
+    """era_cohort over a column."""
+    return pd.Series(np.select(
+        [years.isna(), years < 1970, years < 2000, years < 2015],
+        ['Unknown', 'Pre-1970', '1970–1999', '2000–2014'],
+        default='2015+',
+    ), index=years.index)
+
+class VariantRules:
+    """
+    Variant rules compiled for column-at-a-time use.
+
+    Family rules are tried in order against each distinct model. Generation
+    rules are indexed by (make prefix, family): each key gets an id and its
+    year intervals are laid out as id * YEAR_SPAN + year, sorted, so every
+    row finds its interval with one np.searchsorted over all rules (an
+    interval join) whatever the number of rules.
+    """
+    YEAR_SPAN = 10000
+
+    def __init__(self, rules):
+        self.rules = rules
+        self.families = [(r['contains'].upper(), r['family']) for r in rules.get('families', [])]
+        self.other = rules.get('other', 'GEN_OTHER')
+        self.unknown = rules.get('unknown', 'GEN_UNKNOWN')
+
+        self.keys = {}   # (make prefix, family) -> id
+        intervals = []
+        for r in rules.get('generations', []):
+            key = self.keys.setdefault((r['make'], r['family']), len(self.keys))
+            lo = r.get('from') if r.get('from') is not None else 0
+            hi = r.get('to') if r.get('to') is not None else self.YEAR_SPAN - 1
+            if not 0 <= lo <= hi < self.YEAR_SPAN:
+                raise ValueError(f"bad year range in generation rule {r}")
+            intervals.append((key, lo, hi, r['generation']))
+        intervals.sort()
+        for prev, cur in zip(intervals, intervals[1:]):
+            if prev[0] == cur[0] and cur[1] <= prev[2]:
+                raise ValueError(f"overlapping generation rules: {prev[3]} and {cur[3]}")
+        self.starts = np.array([k * self.YEAR_SPAN + lo for k, lo, _, _ in intervals], dtype=float)
+        self.ends = np.array([k * self.YEAR_SPAN + hi for k, _, hi, _ in intervals], dtype=float)
+        self.labels = np.array([g for *_, g in intervals], dtype=object)
+        # Longest prefix first, so a family's 'Mercedes-Benz' rules win over its 'Mercedes' ones
+        self.makes = sorted({make for make, _ in self.keys}, key=len, reverse=True)
+
+    @classmethod
+    def load(cls, path=VARIANT_RULES_FILE):
+        """Rules from the JSON file at `path`, or DEFAULT_VARIANT_RULES when there is none."""
+        if path and os.path.exists(path):
+            with open(path) as f:
+                return cls(json.load(f))
+        return cls(DEFAULT_VARIANT_RULES)
+
+    def fingerprint(self, part=None):
+        """Hash of the rules (or of one part, e.g. 'families')."""
+        rules = self.rules if part is None else self.rules.get(part)
+        return hashlib.sha1(json.dumps(rules, sort_keys=True).encode()).hexdigest()
+
+    def model_families(self, models: pd.Series) -> pd.Series:
+        """Family per model: the first family rule it matches, else the model upper-cased."""
+        codes, uniques = pd.factorize(models.astype(str).str.upper(), use_na_sentinel=False)
+        uniques = pd.Series(uniques, dtype=object)
+        families = uniques.to_numpy(copy=True)
+        done = np.zeros(len(uniques), dtype=bool)
+        for pattern, family in self.families:
+            hit = ~done & uniques.str.contains(pattern, regex=False).fillna(False).to_numpy(dtype=bool)
+            families[hit] = family
+            done |= hit
+        return pd.Series(families[codes], index=models.index)
+
+    def generations(self, makes: pd.Series, families: pd.Series, years: pd.Series) -> pd.Series:
+        """Generation per row from its make, family and year: a rule's label, `other` or `unknown`."""
+        yr = pd.to_numeric(years, errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+        out = np.full(len(yr), self.other, dtype=object)
+        if self.keys:
+            # Key id per distinct (make, family) pair: the longest rule make
+            # prefix that has rules for that family
+            make_codes, make_uniques = pd.factorize(makes, use_na_sentinel=False)
+            make_text = ['nan' if pd.isna(u) else str(u) for u in make_uniques]
+            prefixes = [[m for m in self.makes if u.startswith(m)] for u in make_text]
+            fam_codes, fam_uniques = pd.factorize(families.astype(object), use_na_sentinel=False)
+            n_fam = len(fam_uniques)
+            pairs, inverse = np.unique(make_codes.astype(np.int64) * n_fam + fam_codes, return_inverse=True)
+            pair_ids = np.array([next((self.keys[(m, fam_uniques[p % n_fam])] for m in prefixes[p // n_fam]
+                                       if (m, fam_uniques[p % n_fam]) in self.keys), -1)
+                                 for p in pairs], dtype=np.int64)
+            ids = pair_ids[inverse.reshape(-1)]
+
+            # Interval join: last interval starting at or before the row's id * YEAR_SPAN + year
+            ok = (ids >= 0) & ~np.isnan(yr)
+            q = ids[ok] * self.YEAR_SPAN + yr[ok]
+            pos = np.searchsorted(self.starts, q, side='right') - 1
+            hit = (pos >= 0) & (q <= self.ends[np.maximum(pos, 0)])
+            rows = np.flatnonzero(ok)[hit]
+            out[rows] = self.labels[pos[hit]]
+        out[np.isnan(yr)] = self.unknown
+        return pd.Series(out, index=years.index)
+
+_variant_rules = None
+
+def variant_rules() -> VariantRules:
+    """The VariantRules in use, loaded from VARIANT_RULES_FILE on first call."""
+    global _variant_rules
+    if _variant_rules is None:
+        _variant_rules = VariantRules.load()
+    return _variant_rules
+
+def model_families(models: pd.Series) -> pd.Series:
+    """Family used for variant splitting (the family rules of variant_rules())."""
+    return variant_rules().model_families(models)
+
+def generations(df: pd.DataFrame) -> pd.Series:
+    """Generation per row from make, model_family and year (the generation rules of variant_rules())."""
+    makes = df['make'] if 'make' in df.columns else pd.Series(np.nan, index=df.index)
+    years = df['year'] if 'year' in df.columns else pd.Series(np.nan, index=df.index)
+    return variant_rules().generations(makes, df['model_family'], years)
+
+def clean_and_process_data(df, engine='vectorized', model_cache=None, verbose=True, compact=True):
+    """
+    Normalize raw auctions: model names, numeric views/bids/comments/sale
+    amount, quarter, year/age/cohort and variant_id; drops rows without a
+    model and CNB listings under 50 views.
+
+    Model names are normalized once per distinct title, reusing
+    `model_cache` (a ModelNameCache) when given. The row filters are worked
+    out first and applied once, so the raw frame is copied once (kept rows
+    only); compact=True then shrinks the result with compact_dtypes.
+
+    engine='rowwise' runs the original per-row implementation
+    (clean_and_process_data_rowwise) for validation. verbose=False skips
+    the summary prints (chunked mode cleans many small frames).
+    """
+    if engine == 'rowwise':
+        return clean_and_process_data_rowwise(df)
+    # Required columns (added to the output below)
+    defaults = {'model': 'Unknown', 'views': 0, 'bids': 0, 'data_source': 'Unknown'}
+    def column(name):
+        return df[name] if name in df.columns else pd.Series(defaults[name], index=df.index)
+
+    # Rows to keep: a model, a valid quarter, not a CNB listing under 50 views
+    models, families, names = normalize_model_names(column('model'), model_cache)
+    if verbose:
+        print(f"🧠 Model names: {names['rows']:,} rows, {names['unique']:,} unique titles, "
+              f"{names['hits']:,} cached ({names['hit_rate']:.0%} hit rate), ~{names['est_saved_sec']:.2f}s saved")
+    quarters = assign_quarters(df)
+    valid = [q for q in quarters.unique() if validate_quarter(q)]
+    views = parse_counts(column('views'))
+    keep = (models.notna() & (models != '') & quarters.isin(valid)
+            & ~((column('data_source') == 'CNB') & (views < 50)))
+    rows = np.flatnonzero(keep.to_numpy(dtype=bool))
+    df = df.take(rows)
+    for col, default in defaults.items():
+        if col not in df.columns:
+            df[col] = default
+
+    # Normalize model text
+    df['model_original'] = df['model']
+    df['model'] = models.take(rows)
+
+    # Numeric transforms
+    df['views_numeric'] = views.take(rows)
+    df['bids_numeric'] = parse_counts(df['bids'])
+    df['comments_numeric'] = parse_counts(df['comments']) if 'comments' in df.columns else 0
+    df['sale_amount_numeric'] = clean_sale_amounts(df['sale_amount']) if 'sale_amount' in df.columns else 0
+
+    # Quarter from available dates
+    df['quarter'] = quarters.take(rows)
+
+    # Year / age / cohort
+    df['year'] = extract_years(df)
+    df['car_age'] = pd.Timestamp.now().year - pd.Series(df['year']).fillna(pd.Timestamp.now().year)
+    df['cohort'] = era_cohorts(df['year'])
+
+    # Variant splitting
+    df['model_family'] = families.take(rows)
+    df['generation']   = generations(df)
+    df['variant_id']   = (df.get('make','').astype(str) + ' '
+                          + df['model_family'].astype(str) + ' '
+                          + df['generation'].astype(str)).str.strip()
+
+    if compact:
+        df, _ = compact_dtypes(df)
+    if verbose:
+        print(f"✅ Cleaned: {len(df)} rows, {df['model'].nunique()} unique models")
+    return df
+
+def _smallest_int(s: pd.Series):
+    """s as the narrowest integer dtype holding it (nullable IntN when it has gaps), or None if not integral."""
+    values = s.to_numpy(dtype=float, na_value=np.nan)
+    present = values[~np.isnan(values)]
+    if not len(present) or not np.all(np.mod(present, 1) == 0):
+        return None
+    lo, hi = present.min(), present.max()
+    for bits in (8, 16, 32, 64):
+        info = np.iinfo(f'int{bits}')
+        if info.min <= lo and hi <= info.max:
+            if len(present) < len(values):
+                return s.astype(f'Int{bits}')
+            return s.astype(f'int{bits}')
+    return None
+
+def compact_dtypes(df: pd.DataFrame):
+    """
+    Shrinks a cleaned frame in place, one column at a time: string columns
+    with few distinct values become categoricals and COMPACT_INT_COLUMNS
+    the narrowest integer type that holds them. Returns (df, report), the
+    report giving each column's dtype and deep memory before and after.
+    """
+    report = []
+    for col in df.columns:
+        s = df[col]
+        before = s.memory_usage(index=False, deep=True)
+        new = None
+        if col in COMPACT_INT_COLUMNS and pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_bool_dtype(s):
+            new = _smallest_int(s)
+        elif not isinstance(s.dtype, pd.CategoricalDtype) and pd.api.types.infer_dtype(s, skipna=True) == 'string':
+            new = s.astype('category')
+            if len(new.cat.categories) > CATEGORY_MAX_UNIQUE_RATIO * len(s):
+                new = None
+        if new is not None:
+            df[col] = new
+        report.append({'column': col, 'dtype_before': str(s.dtype), 'dtype_after': str(df[col].dtype),
+                       'mb_before': before / 1e6, 'mb_after': df[col].memory_usage(index=False, deep=True) / 1e6})
+    report = pd.DataFrame(report).set_index('column')
+    report.loc['TOTAL'] = ['', '', report['mb_before'].sum(), report['mb_after'].sum()]
+    return df, report
+
 # ----------------- WINSORIZING / ROBUST Z ---------------------
 def winsorize_series(s: pd.Series, lower=WINSOR_LO, upper=WINSOR_HI) -> pd.Series:
     if s.empty:
@@ -324,12 +1012,48 @@ def winsorize_series(s: pd.Series, lower=WINSOR_LO, upper=WINSOR_HI) -> pd.Serie
     hi = s.quantile(upper)
     return s.clip(lower=lo, upper=hi)
 
+def _group_ids(df: pd.DataFrame, group_cols):
+    """
+    (ids, n_groups): each row's group number as groupby(group_cols) numbers
+    them, n_groups for rows with a missing key. Factorizing once lets every
+    grouped pass below group by a plain integer array.
+    """
+    ids = df.groupby(group_cols, observed=True).ngroup()
+    n_groups = int(ids.max()) + 1 if ids.notna().any() else 0
+    return ids.fillna(n_groups).to_numpy(dtype=np.intp), n_groups
+
+def _per_row(stats: pd.DataFrame, ids, n_groups) -> np.ndarray:
+    """Per-group rows of `stats` broadcast back to the rows (NaN for missing keys)."""
+    table = stats.reindex(range(n_groups)).to_numpy(dtype=float)
+    return np.vstack([table, np.full((1, table.shape[1]), np.nan)])[ids]
+
 def winsorize_by_groups(df: pd.DataFrame, group_cols, metric_cols, lower=WINSOR_LO, upper=WINSOR_HI):
-    df = df.copy()
-    for m in metric_cols:
-        df[m] = df.groupby(group_cols, group_keys=False)[m].apply(
-            lambda x: winsorize_series(x, lower, upper)
-        )
+    """
+    winsorize_series within each group, for all metrics in one grouped pass.
+    Rows with a missing group key are left as they are. Returns a frame with
+    the clipped metric columns; the caller's frame is left unchanged.
+    """
+    # Shallow: the other columns are shared, not copied. Only the new metric
+    # arrays are written, so the caller's frame (score_aggregates is run
+    # more than once on the same aggregate) keeps its own values.
+    df = df.copy(deep=False)
+    ids, n_groups = _group_ids(df, group_cols)
+    g = df[metric_cols].astype(float).groupby(ids)
+    lo = _per_row(g.quantile(lower), ids, n_groups)
+    hi = _per_row(g.quantile(upper), ids, n_groups)
+    v = df[metric_cols].to_numpy(dtype=float)
+    # Comparisons with NaN are False: NaN values and NaN bounds pass through
+    v = np.where(v < lo, lo, v)
+    v = np.where(v > hi, hi, v)
+    for i, m in enumerate(metric_cols):
+        # Like Series.clip, an integer column stays integer unless a bound
+        # made a value fractional (grouped quantiles can land a few ulps off
+        # the integer Series.quantile gives, hence the tolerance)
+        whole = np.round(v[:, i])
+        if pd.api.types.is_integer_dtype(df[m]) and np.allclose(v[:, i], whole, rtol=1e-12, atol=0):
+            df[m] = whole.astype(df[m].dtype)
+        else:
+            df[m] = v[:, i]
     return df
 
 def robust_z(series: pd.Series) -> pd.Series:
@@ -343,23 +1067,67 @@ def robust_z(series: pd.Series) -> pd.Series:
     z = (series - med) / mad
     return z
 
-# --------------------- CORE CALCULATION -----------------------
-def calculate_mii_scores(df):
-    print("\n🧮 Calculating MII scores (winsorized + robust z)…")
-    df = df.copy()
-
-    # Key to use for Instagram and grouping
-    entity_col = 'variant_id' if 'variant_id' in df.columns else 'model'
-
-    # Instagram estimates keyed by entity (variant if available)
-    all_keys = df[entity_col].unique()
-    ig_map = get_instagram_estimates(all_keys)
-    df['instagram_mentions'] = df[entity_col].map(ig_map).fillna(8000)
+def robust_z_by_groups(df: pd.DataFrame, group_cols, metric_cols, cap=Z_CAP) -> pd.DataFrame:
+    """
+    robust_z within each group for all metrics at once, clipped to ±cap:
+    (x - median) / MAD, or (x - mean) / std in groups whose MAD is 0.
+    Per-group centre and scale are reduced first, then applied to every row
+    in place. Returns z_<metric> columns aligned with df.
+    """
+    ids, n_groups = _group_ids(df, group_cols)
+    x = np.array(df[metric_cols].to_numpy(dtype=float), copy=True)
+    g = pd.DataFrame(x).groupby(ids)
+    med = g.median()
+    mad = pd.DataFrame(np.abs(x - _per_row(med, ids, n_groups))).groupby(ids).median()
+    std = g.std()
+    std = std.where(std != 0, 1)
+    robust = mad != 0  # NaN MAD (no values) stays on the median branch, giving NaN like robust_z
+    center = med.where(robust, g.mean())
+    scale = mad.where(robust, std)
+
+    x -= _per_row(center, ids, n_groups)
+    x /= _per_row(scale, ids, n_groups)
+    np.clip(x, -cap, cap, out=x)
+    return pd.DataFrame(x, index=df.index, columns=[f'z_{m}' for m in metric_cols])
+
+def index_by_group(scores: pd.Series, keys) -> pd.Series:
+    """Min-max scale scores to 0-100 within each group (50 when a group is flat)."""
+    g = scores.groupby(keys, observed=True)
+    mx, mn = g.transform('max'), g.transform('min')
+    return (100 * (scores - mn) / (mx - mn)).where(mx > mn, 50)
 
-    # Aggregate
+# --------------------- CORE CALCULATION -----------------------
+# Weights (aligned to report; IG slightly reduced)
+MII_WEIGHTS = {
+    'z_bids_numeric':          0.235,
+    'z_sale_amount_numeric':   0.206,
+    'z_views_numeric':         0.176,
+    'z_total_auctions':        0.118,
+    'z_instagram_mentions':    0.100,  # slight reduction from 0.118
+    'z_comments_numeric':      0.088,
+    'z_car_age':               0.059,
+}
+
+def _group_cols(df, entity_col):
     group_cols = [entity_col, 'quarter']
     if 'make' in df.columns:   group_cols.insert(0, 'make')
     if 'cohort' in df.columns: group_cols.append('cohort')
+    return group_cols
+
+def _add_instagram(grouped, entity_col):
+    # Instagram estimates keyed by entity (variant if available)
+    ig_map = get_instagram_estimates(grouped[entity_col].unique())
+    grouped['instagram_mentions'] = grouped[entity_col].astype(object).map(ig_map).fillna(8000)
+    return grouped
+
+def aggregate_auctions(df):
+    """
+    Cleaned auctions -> one row per (make x) entity x quarter (x cohort)
+    with mean views/bids/comments, mean positive sale amount, auction count,
+    first year/car_age and the Instagram estimate. Returns (grouped, entity_col).
+    """
+    # Key to use for Instagram and grouping
+    entity_col = 'variant_id' if 'variant_id' in df.columns else 'model'
 
     agg_dict = {
         'views_numeric': 'mean',
@@ -369,11 +1137,48 @@ def calculate_mii_scores(df):
         'data_source': 'count',
         'year': 'first',
         'car_age': 'first',
-        'instagram_mentions': 'first'
     }
-    grouped = df.groupby(group_cols).agg(agg_dict).reset_index()
+    grouped = df.groupby(_group_cols(df, entity_col), observed=True).agg(agg_dict).reset_index()
     grouped = grouped.rename(columns={'data_source': 'total_auctions'})
-
+    return _add_instagram(grouped, entity_col), entity_col
+
+def score_quarters(df, workers=None):
+    """
+    The part of the MII calculation that stays within a quarter: aggregate
+    to entity x quarter (x cohort), winsorize, robust z, MII_Score, MII_Index
+    and Quarter_Rank. No step looks across quarters, so scoring a subset of
+    quarters gives the same rows as scoring them with the rest, and the
+    quarters can be scored on `workers` processes (default SCORING_WORKERS).
+
+    Returns (grouped, entity_col).
+    """
+    grouped, entity_col = aggregate_auctions(df)
+    return score_aggregates_parallel(grouped, workers), entity_col
+
+def quarter_batches(grouped, n_batches):
+    """Sorted quarters split into up to n_batches contiguous runs of about equal row count."""
+    sizes = grouped['quarter'].value_counts(sort=False)
+    sizes = sizes[sizes > 0].sort_index()
+    edges = np.ceil(sizes.cumsum().to_numpy() / len(grouped) * n_batches)
+    return [list(sizes.index[edges == b]) for b in np.unique(edges)]
+
+def score_aggregates_parallel(grouped, workers=None):
+    """
+    score_aggregates with the quarters split across a pool of `workers`
+    processes (in this process when workers <= 1). Batches are contiguous
+    runs of sorted quarters and come back in order, so the concatenation
+    has the same rows, in the same order, as one score_aggregates call.
+    """
+    workers = SCORING_WORKERS if workers is None else workers
+    batches = quarter_batches(grouped, workers * 2) if workers > 1 else []
+    if len(batches) <= 1:
+        return score_aggregates(grouped)
+    parts = [grouped[grouped['quarter'].isin(quarters)] for quarters in batches]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return pd.concat(pool.map(score_aggregates, parts), sort=False)
+
+def score_aggregates(grouped):
+    """score_quarters from aggregate_auctions' output on."""
     # Winsorize per quarter (+ cohort if present)
     metrics_to_clip = [
         'views_numeric', 'bids_numeric', 'comments_numeric',
@@ -383,46 +1188,232 @@ def calculate_mii_scores(df):
     grouped = winsorize_by_groups(grouped, group_for_clip, metrics_to_clip, WINSOR_LO, WINSOR_HI)
 
     # Robust z by quarter (+ cohort)
-    def apply_robust_z(g):
-        for m in metrics_to_clip + ['total_auctions', 'car_age']:
-            zcol = f'z_{m}'
-            g[zcol] = robust_z(g[m]) if m in g.columns else 0
-            g[zcol] = g[zcol].clip(-Z_CAP, Z_CAP)
-        return g
-    grouped = grouped.groupby(group_for_clip, group_keys=False).apply(apply_robust_z)
-
-    # Weights (aligned to report; IG slightly reduced)
-    weights = {
-        'z_bids_numeric':          0.235,
-        'z_sale_amount_numeric':   0.206,
-        'z_views_numeric':         0.176,
-        'z_total_auctions':        0.118,
-        'z_instagram_mentions':    0.100,  # slight reduction from 0.118
-        'z_comments_numeric':      0.088,
-        'z_car_age':               0.059,
-    }
-    total_w = sum(weights.values())
+    z_metrics = [m for m in metrics_to_clip + ['total_auctions', 'car_age'] if m in grouped.columns]
+    z = robust_z_by_groups(grouped, group_for_clip, z_metrics, Z_CAP)
+    grouped = pd.concat([grouped, z], axis=1)
+    # Rows in group order, as the per-group apply used to return them (ties
+    # in the rank/sort steps below keep that order)
+    grouped = grouped.sort_values(group_for_clip, kind='stable')
+
+    total_w = sum(MII_WEIGHTS.values())
     grouped['MII_Score'] = 0.0
-    for col, w in weights.items():
+    for col, w in MII_WEIGHTS.items():
         grouped['MII_Score'] += grouped.get(col, 0) * w
     grouped['MII_Score'] /= total_w
 
     # Scale to index (0-100) within quarter
-    def to_index(g):
-        mx, mn = g['MII_Score'].max(), g['MII_Score'].min()
-        g['MII_Index'] = 100 * (g['MII_Score'] - mn) / (mx - mn) if mx > mn else 50
-        return g
-    grouped = grouped.groupby('quarter', group_keys=False).apply(to_index)
-
-    # Ranks, momentum, smoothing
-    grouped['Quarter_Rank'] = grouped.groupby('quarter')['MII_Index'].rank(ascending=False, method='min')
+    grouped['MII_Index'] = index_by_group(grouped['MII_Score'], grouped['quarter'])
+    grouped['Quarter_Rank'] = grouped.groupby('quarter', observed=True)['MII_Index'].rank(ascending=False, method='min')
+    return grouped
+
+def finish_mii_scores(grouped, entity_col):
+    """The cross-quarter steps (momentum, smoothing) and the output order."""
     grouped = grouped.sort_values([entity_col, 'quarter'])
-    grouped['MII_Momentum'] = grouped.groupby(entity_col)['MII_Index'].diff()
-    grouped['MII_Smoothed'] = grouped.groupby(entity_col)['MII_Index'].transform(lambda s: s.ewm(alpha=EMA_ALPHA, adjust=False).mean())
+    grouped['MII_Momentum'] = grouped.groupby(entity_col, observed=True)['MII_Index'].diff()
+    grouped['MII_Smoothed'] = grouped.groupby(entity_col, observed=True)['MII_Index'].transform(lambda s: s.ewm(alpha=EMA_ALPHA, adjust=False).mean())
 
     grouped['calculation_date'] = pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')
-    grouped = grouped.sort_values(['quarter', 'MII_Index'], ascending=[False, False])
+    return grouped.sort_values(['quarter', 'MII_Index'], ascending=[False, False])
+
+def calculate_mii_scores(df, workers=None):
+    print("\n🧮 Calculating MII scores (winsorized + robust z)…")
+    grouped, entity_col = score_quarters(df, workers)
+    grouped = finish_mii_scores(grouped, entity_col)
+    print(f"✅ Calculated MII for {len(grouped)} rows (entity={entity_col})")
+    return grouped
+
+# ------------------ INCREMENTAL BY QUARTER --------------------
+def scoring_fingerprint():
+    """Changes whenever a setting that affects score_quarters' output does."""
+    settings = [SCORING_VERSION, WINSOR_LO, WINSOR_HI, Z_CAP, MII_WEIGHTS]
+    return hashlib.sha1(json.dumps(settings, sort_keys=True).encode()).hexdigest()
+
+def quarter_fingerprints(df: pd.DataFrame, entity_col: str) -> dict:
+    """
+    {quarter: hash of its cleaned rows}, over the columns score_quarters
+    reads, in row order (the 'first' aggregations depend on it), plus each
+    row's Instagram estimate, so editing get_instagram_estimates rescores
+    the quarters whose entities it changes.
+    """
+    cols = [c for c in ['make', entity_col, 'quarter', 'cohort', 'views_numeric', 'bids_numeric',
+                        'comments_numeric', 'sale_amount_numeric', 'data_source', 'year', 'car_age']
+            if c in df.columns]
+    # Numbers hashed as float64 so compact_dtypes' int widths don't change the key
+    numeric = [c for c in cols if pd.api.types.is_numeric_dtype(df[c])]
+    hashed = df[cols].astype({c: 'float64' for c in numeric})
+    ig_map = get_instagram_estimates(df[entity_col].unique())
+    hashed['instagram_mentions'] = df[entity_col].astype(object).map(ig_map).fillna(8000).astype('float64')
+    row_hashes = pd.util.hash_pandas_object(hashed, index=False).to_numpy()
+    header = ('|'.join(hashed.columns) + '|').encode()
+    return {q: hashlib.sha1(header + row_hashes[pos].tobytes()).hexdigest()
+            for q, pos in sorted(df.groupby('quarter', observed=True).indices.items())}
+
+class QuarterStore:
+    """
+    score_quarters output kept on disk, one partition per quarter
+    (root/quarter=2025Q3/part.parquet, or part.csv without pyarrow), and a
+    manifest.json with the scoring fingerprint and, per quarter, the
+    fingerprint of the rows it was scored from.
+    """
+    def __init__(self, root):
+        self.root = root
+        self.ext = 'parquet' if HAS_PARQUET else 'csv'
+        self.manifest = {'scoring': None, 'quarters': {}}
+        path = os.path.join(root, 'manifest.json')
+        if os.path.exists(path):
+            try:
+                with open(path) as f:
+                    self.manifest = json.load(f)
+            except Exception as e:
+                print(f"⚠️  Could not read {path}: {e}")
+
+    def _path(self, quarter):
+        return os.path.join(self.root, f"quarter={quarter}", f"part.{self.ext}")
+
+    def load(self, quarter, fingerprint):
+        """The stored partition if it was scored from rows with `fingerprint`, else None."""
+        entry = self.manifest['quarters'].get(quarter)
+        if not entry or entry.get('rows') != fingerprint or entry.get('format') != self.ext:
+            return None
+        try:
+            if self.ext == 'parquet':
+                return pd.read_parquet(self._path(quarter))
+            return pd.read_csv(self._path(quarter))
+        except Exception as e:
+            print(f"⚠️  Could not read stored {quarter}: {e}")
+            return None
+
+    def save(self, quarter, part, fingerprint):
+        path = self._path(quarter)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if self.ext == 'parquet':
+            part.to_parquet(path, index=False)
+        else:
+            part.to_csv(path, index=False)
+        self.manifest['quarters'][quarter] = {'rows': fingerprint, 'format': self.ext}
+
+    def drop(self, quarter):
+        self.manifest['quarters'].pop(quarter, None)
+        try:
+            os.remove(self._path(quarter))
+        except OSError:
+            pass
+
+    def write_manifest(self):
+        os.makedirs(self.root, exist_ok=True)
+        path = os.path.join(self.root, 'manifest.json')
+        with open(f"{path}.tmp", 'w') as f:
+            json.dump(self.manifest, f, indent=1, sort_keys=True)
+        os.replace(f"{path}.tmp", path)
+
+def calculate_mii_scores_incremental(df, store_dir):
+    """
+    calculate_mii_scores, rescoring only the quarters whose cleaned rows,
+    Instagram estimates (or the scoring settings) changed since the last run
+    in `store_dir` and reusing the stored partitions for the rest; the
+    cross-quarter steps then run on everything.
+    """
+    print("\n🧮 Calculating MII scores (winsorized + robust z, incremental by quarter)…")
+    entity_col = 'variant_id' if 'variant_id' in df.columns else 'model'
+    store = QuarterStore(store_dir)
+    scoring = scoring_fingerprint()
+    if store.manifest.get('scoring') != scoring:
+        store.manifest = {'scoring': scoring, 'quarters': {}}
+
+    fingerprints = quarter_fingerprints(df, entity_col)
+    parts, stale = [], []
+    for quarter, fingerprint in fingerprints.items():
+        part = store.load(quarter, fingerprint)
+        if part is None:
+            stale.append(quarter)
+        else:
+            parts.append(part)
+
+    if stale:
+        fresh, _ = score_quarters(df[df['quarter'].isin(stale)])
+        for quarter, part in fresh.groupby('quarter', observed=True, sort=False):
+            store.save(quarter, part, fingerprints[quarter])
+        parts.append(fresh)
+    for quarter in set(store.manifest['quarters']) - set(fingerprints):
+        store.drop(quarter)
+    store.write_manifest()
+
+    group_for_clip = ['quarter'] + (['cohort'] if 'cohort' in df.columns else [])
+    grouped = pd.concat(parts, ignore_index=True).sort_values(group_for_clip, kind='stable')
+    grouped = finish_mii_scores(grouped, entity_col)
+    print(f"✅ Calculated MII for {len(grouped)} rows (entity={entity_col}): "
+          f"{len(stale)} of {len(fingerprints)} quarters rescored, {len(fingerprints) - len(stale)} reused")
+    return grouped
+
+# ------------------- CHUNKED (OUT-OF-CORE) ---------------------
+# Columns aggregate_auctions averages; partials carry their sums and counts
+MEAN_METRICS = ['views_numeric', 'bids_numeric', 'comments_numeric']
+PARTIAL_AGG = {**{f'{m}_{part}': 'sum' for m in MEAN_METRICS for part in ('sum', 'n')},
+               'sale_pos_sum': 'sum', 'sale_pos_n': 'sum', 'total_auctions': 'sum',
+               'year': 'first', 'car_age': 'first'}
+
+def partial_aggregates(df, entity_col):
+    """
+    One chunk of cleaned auctions reduced per group to sums and counts that
+    add up across chunks (merge_partial_aggregates); year/car_age keep the
+    chunk's first non-null value, which is what 'first' gives over all rows
+    when chunks are merged in order.
+    """
+    work = df[_group_cols(df, entity_col)].copy()
+    for m in MEAN_METRICS:
+        work[f'{m}_sum'] = df[m]
+        work[f'{m}_n'] = df[m].notna()
+    sale = df['sale_amount_numeric']
+    work['sale_pos_sum'] = sale.where(sale > 0)
+    work['sale_pos_n'] = sale > 0
+    work['total_auctions'] = df['data_source'].notna()
+    work['year'] = df['year']
+    work['car_age'] = df['car_age']
+    return work.groupby(_group_cols(df, entity_col), observed=True).agg(PARTIAL_AGG).reset_index()
+
+def merge_partial_aggregates(parts, entity_col):
+    """Partials of consecutive chunks, in chunk order, merged into one."""
+    merged = pd.concat(parts, ignore_index=True, sort=False)
+    return merged.groupby(_group_cols(merged, entity_col), observed=True).agg(PARTIAL_AGG).reset_index()
+
+def finish_partial_aggregates(partials, entity_col):
+    """Merged partials -> the frame aggregate_auctions builds from all rows at once."""
+    grouped = partials[_group_cols(partials, entity_col)].copy()
+    for m in MEAN_METRICS:
+        grouped[m] = partials[f'{m}_sum'] / partials[f'{m}_n'].where(partials[f'{m}_n'] > 0)
+    has_sale = partials['sale_pos_n'] > 0
+    grouped['sale_amount_numeric'] = (partials['sale_pos_sum'] / partials['sale_pos_n'].where(has_sale)).where(has_sale, 0)
+    for col in ['total_auctions', 'year', 'car_age']:
+        grouped[col] = partials[col]
+    return _add_instagram(grouped, entity_col)
+
+def calculate_mii_scores_chunked(chunks, model_cache=None, merge_every=16):
+    """
+    calculate_mii_scores over an iterable of raw auction frames (e.g.
+    iter_scraped_chunks) without holding all rows: each chunk is cleaned
+    and reduced to partial aggregates, partials are merged every
+    `merge_every` chunks, and scoring runs on the merged aggregates.
+    """
+    print("\n🧮 Calculating MII scores (winsorized + robust z, chunked)…")
+    parts, entity_col = [], None
+    n_chunks = raw_rows = clean_rows = 0
+    for raw in chunks:
+        clean = clean_and_process_data(raw, model_cache=model_cache, verbose=False)
+        n_chunks += 1
+        raw_rows += len(raw)
+        clean_rows += len(clean)
+        if clean.empty:
+            continue
+        entity_col = entity_col or ('variant_id' if 'variant_id' in clean.columns else 'model')
+        parts.append(partial_aggregates(clean, entity_col))
+        if len(parts) >= merge_every:
+            parts = [merge_partial_aggregates(parts, entity_col)]
+    print(f"🧩 {n_chunks} chunks: {raw_rows:,} raw rows, {clean_rows:,} cleaned")
+    if not parts:
+        return pd.DataFrame()
 
+    grouped = finish_partial_aggregates(merge_partial_aggregates(parts, entity_col), entity_col)
+    grouped = finish_mii_scores(score_aggregates_parallel(grouped), entity_col)
     print(f"✅ Calculated MII for {len(grouped)} rows (entity={entity_col})")
     return grouped
 
@@ -453,46 +1444,80 @@ def percent_change_table(mii_results, raw_df, q2_key=('2025Q2','Q2_2025'), q3_ke
     return merged
 
 # ----------------------------- MAIN ---------------------------
-def main():
+def main(quarter_store=QUARTER_STORE_DIR, model_cache_file=MODEL_CACHE_FILE):
     print("🚀 MII Calculator (Robust)")
     print(f"⏰ Started at: {datetime.datetime.now():%Y-%m-%d %H:%M:%S}")
 
-    # 1) Load raw auctions
-    raw = load_scraped_data()
-    if raw.empty:
-        print("❌ No data to process.")
-        return False
-
-    # 2) Clean/process
-    clean = clean_and_process_data(raw)
-    if clean.empty:
-        print("❌ No clean data.")
-        return False
-
-    # 3) Scores
-    mii = calculate_mii_scores(clean)
+    model_cache = ModelNameCache(model_cache_file)
+    if CHUNK_ROWS:
+        # 1-3) Load, clean and aggregate CHUNK_ROWS at a time, then score
+        mii = calculate_mii_scores_chunked(iter_scraped_chunks(CHUNK_ROWS), model_cache)
+        model_cache.save()
+        if mii.empty:
+            print("❌ No clean data.")
+            return False
+        keys = mii   # make/entity pairs for the % change table
+    else:
+        # 1) Load raw auctions
+        raw = load_scraped_data()
+        if raw.empty:
+            print("❌ No data to process.")
+            return False
+
+        # 2) Clean/process, then compact (categoricals, narrow ints)
+        clean = clean_and_process_data(raw, model_cache=model_cache, compact=False)
+        del raw
+        model_cache.save()
+        if clean.empty:
+            print("❌ No clean data.")
+            return False
+        clean, memory = compact_dtypes(clean)
+        print("\n📦 Cleaned frame memory (deep, MB):")
+        print(memory.round(2).to_string())
+
+        # 3) Scores
+        if quarter_store:
+            mii = calculate_mii_scores_incremental(clean, quarter_store)
+        else:
+            mii = calculate_mii_scores(clean)
+        keys = clean
 
     # 4) Insights: % change table example (Mercedes only)
-    pct = percent_change_table(mii, clean)
+    pct = percent_change_table(mii, keys)
     pct_mercedes = pct[pct['make'].str.contains('Mercedes', case=False, na=False)].sort_values('Pct_Change', ascending=False)
     print("\n🔺 Top Mercedes % Change (Q2→Q3) — after rules")
     print(pct_mercedes.head(15)[['make', mii.columns[0] if mii.columns[0] in ['variant_id','model'] else 'variant_id', 'MII_Q2', 'MII_Q3', 'Pct_Change']])
 
     # 5) Save
-    ts = datetime.datetime.now().strftime('%Y%m%d_%H%M')
-    out_csv = f"{OUTPUT_PREFIX}_{ts}.csv"
-    latest_csv = f"{OUTPUT_PREFIX}_latest.csv"
-    mii.to_csv(out_csv, index=False)
-    mii.to_csv(latest_csv, index=False)
-    print(f"💾 Saved: {out_csv} and {latest_csv}")
+    written = write_results(mii)
+    print(f"💾 Saved: {', '.join(written)}")
 
     # 6) Optional S3 upload
     if S3_BUCKET:
-        upload_to_s3(out_csv, S3_BUCKET, os.path.basename(out_csv))
-        upload_to_s3(latest_csv, S3_BUCKET, os.path.basename(latest_csv))
+        for path in written:
+            upload_to_s3(path, S3_BUCKET, os.path.basename(path))
 
+    peak = peak_rss_mb()
+    if peak is not None:
+        print(f"📈 Peak RSS: {peak:,.0f} MB")
     print("\n🎉 Done.")
     return True
 
 if __name__ == "__main__":
-    main()
+    # python updated_MII_Windsor.py --convert-csv bat.csv cnb.csv
+    if sys.argv[1:2] == ['--convert-csv']:
+        for path in sys.argv[2:]:
+            convert_csv_to_parquet(path)
+    else:
+        # python updated_MII_Windsor.py [--incremental [store_dir]] [--model-cache [cache_file]]
+        args = sys.argv[1:]
+
+        def option(flag, default):
+            """The value after `flag` (or `default` when none follows), None without the flag."""
+            if flag not in args:
+                return None
+            i = args.index(flag) + 1
+            return args[i] if i < len(args) and not args[i].startswith('--') else default
+
+        main(quarter_store=option('--incremental', "mii_quarters"),
+             model_cache_file=option('--model-cache', "mii_model_cache.json"))